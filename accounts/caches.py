@@ -0,0 +1,175 @@
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.dispatch import Signal
+
+# 계좌 목록 캐시를 조회할 때마다 보내는 계측용 시그널입니다. (user_id, hit, elapsed)
+account_list_cache_accessed = Signal()
+
+
+class AccountListCache:
+    """
+    사용자별 계좌 목록 응답 캐시입니다. 계좌 목록으로 계산하는 순자산 요약도 같은 버전으로 함께 캐시합니다.
+
+    캐시 키에 사용자별 버전을 붙여두고, 계좌가 추가/수정/삭제되면 버전만 바꿔 이전 캐시를 한 번에 무효화합니다.
+    (이전 버전의 캐시는 timeout이 지나면 사라집니다.)
+    버전은 매번 새로 만든 uuid이므로, 버전 키가 캐시에서 밀려나도 이전 버전의 캐시가 다시 살아나지 않습니다.
+    거래 반영처럼 잔액만 바뀌는 경우에는 무효화하지 않고, 사용자별 잠금을 잡은 채로 캐시에 들어 있는 잔액만 고쳐줍니다.
+    """
+
+    timeout = 60 * 10
+    lock_timeout = 5  # 잠금을 잡은 프로세스가 죽어도 이 시간이 지나면 풀립니다.
+    lock_attempts = 20
+    lock_wait = 0.01
+
+    @staticmethod
+    def version_key(user_id):
+        return f"accounts:list:version:{user_id}"
+
+    @staticmethod
+    def data_key(user_id, version, name="list"):
+        return f"accounts:{name}:{user_id}:{version}"
+
+    @staticmethod
+    def lock_key(user_id):
+        return f"accounts:list:lock:{user_id}"
+
+    def get_version(self, user_id):
+        version = cache.get(self.version_key(user_id))
+        if version is None:
+            # 동시에 처음 조회한 요청들이 서로 다른 버전을 쓰지 않도록 add로 하나만 저장합니다.
+            cache.add(self.version_key(user_id), uuid.uuid4().hex, None)
+            version = cache.get(self.version_key(user_id))
+        return version
+
+    def get(self, user_id, version=None):
+        value = cache.get(self.data_key(user_id, version or self.get_version(user_id)))
+        return value["accounts"] if value is not None else None
+
+    def set(self, user_id, accounts, version=None):
+        # postings: 계좌별로 마지막으로 반영한 거래 id (늦게 도착한 이전 거래가 잔액을 덮어쓰지 않도록 사용합니다.)
+        cache.set(
+            self.data_key(user_id, version or self.get_version(user_id)),
+            {"accounts": accounts, "postings": {}},
+            self.timeout,
+        )
+
+    def get_net_worth(self, user_id):
+        return cache.get(self.data_key(user_id, self.get_version(user_id), "net_worth"))
+
+    def set_net_worth(self, user_id, net_worth):
+        cache.set(self.data_key(user_id, self.get_version(user_id), "net_worth"), net_worth, self.timeout)
+
+    def invalidate(self, user_id):
+        cache.set(self.version_key(user_id), uuid.uuid4().hex, None)
+
+    @contextmanager
+    def lock(self, user_id):
+        """
+        사용자의 캐시를 고치는 동안 잡는 잠금입니다. cache.add는 키가 없을 때만 저장하므로 한 곳에서만 잠금을 얻습니다.
+        정해진 횟수 안에 잠금을 얻지 못하면 False를 돌려줍니다.
+        """
+        key = self.lock_key(user_id)
+        token = uuid.uuid4().hex
+        for _ in range(self.lock_attempts):
+            if cache.add(key, token, self.lock_timeout):
+                break
+            time.sleep(self.lock_wait)
+        else:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            # 잠금이 만료되어 다른 곳에서 다시 잡았다면 그 잠금은 지우지 않습니다.
+            if cache.get(key) == token:
+                cache.delete(key)
+
+    def patch_balance(self, user_id, account_id, balance, posting_id):
+        """
+        거래가 반영된 계좌의 잔액만 캐시된 목록에서 고칩니다.
+        같은 계좌의 거래는 잔액을 반영한 순서대로 id가 커지므로, 이미 더 뒤의 거래가 반영되어 있으면 무시합니다.
+        읽고 고쳐 쓰는 동안 사용자별 잠금을 잡아, 동시에 반영된 거래끼리 서로의 수정을 덮어쓰지 않게 합니다.
+        잠금을 얻지 못하면 고치지 않고 캐시를 무효화합니다.
+        계좌의 사용자는 호출하는 쪽에서 계좌 행으로 찾아 넘겨줍니다. (따로 만료되는 캐시 키에 두면 그 키가 밀려났을 때
+        목록이 고쳐지지도 무효화되지도 않습니다.)
+        """
+        with self.lock(user_id) as locked:
+            if not locked:
+                self.invalidate(user_id)
+                return
+
+            version = self.get_version(user_id)
+            # 순자산 요약은 다음 조회 때 다시 집계합니다.
+            cache.delete(self.data_key(user_id, version, "net_worth"))
+
+            key = self.data_key(user_id, version)
+            value = cache.get(key)
+            if value is None or value["postings"].get(account_id, 0) >= posting_id:
+                return
+
+            for account in value["accounts"]:
+                if account["id"] == account_id:
+                    account["balance"] = balance
+            value["postings"][account_id] = posting_id
+            cache.set(key, value, self.timeout)
+
+    def get_or_render(self, user_id, render):
+        """
+        캐시된 계좌 목록을 반환하고, 없으면 render()로 만들어 캐시합니다.
+        적중 여부와 소요 시간은 account_list_cache_accessed 시그널로 보냅니다.
+        """
+        started = time.perf_counter()
+        # 목록을 만드는 동안 무효화되면 이전 버전에 저장되어 바로 버려지도록, 만들기 전에 읽은 버전으로 저장합니다.
+        version = self.get_version(user_id)
+        accounts = self.get(user_id, version)
+        hit = accounts is not None
+        if not hit:
+            accounts = render()
+            self.set(user_id, accounts, version)
+
+        account_list_cache_accessed.send(
+            sender=self.__class__, user_id=user_id, hit=hit, elapsed=time.perf_counter() - started
+        )
+        return accounts
+
+
+class AccountListCacheStats:
+    """
+    account_list_cache_accessed 시그널을 받아 캐시 적중률과 평균 응답 시간을 집계합니다.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.total_elapsed = 0.0
+
+    def __call__(self, sender, hit, elapsed, **kwargs):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.total_elapsed += elapsed
+
+    @property
+    def requests(self):
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self):
+        return self.hits / self.requests if self.requests else 0.0
+
+    @property
+    def average_latency(self):
+        return self.total_elapsed / self.requests if self.requests else 0.0
+
+
+account_list_cache = AccountListCache()
+account_list_cache_stats = AccountListCacheStats()
+account_list_cache_accessed.connect(account_list_cache_stats)
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from accounts.models import Account, DailyBalanceSnapshot
+from core.utils import run_in_chunks
+from transactions.models import SIGNED_AMOUNT, Transaction
+
+
+def backfill_accounts(account_ids):
+    """
+    계좌 묶음의 일자별 잔액 스냅샷을 거래내역으로부터 다시 만듭니다.
+    일자별 잔액 변동분은 DB에서 GROUP BY로 집계하고, 현재 계좌 잔액에서 거꾸로 거슬러 올라가며 시작/마감 잔액을 계산합니다.
+    """
+    daily_deltas = (
+        Transaction.objects.filter(account_id__in=account_ids)
+        .values_list("account_id", "trans_date")
+        .annotate(delta=Sum(SIGNED_AMOUNT))
+        .order_by("account_id", "-trans_date")
+    )
+
+    with transaction.atomic():
+        balances = dict(
+            Account.objects.select_for_update().filter(id__in=account_ids).order_by("id").values_list("id", "balance")
+        )
+        snapshots = []
+        for account_id, trans_date, delta in daily_deltas:
+            closing_balance = balances[account_id]
+            balances[account_id] = closing_balance - delta
+            snapshots.append(
+                DailyBalanceSnapshot(
+                    account_id=account_id,
+                    date=trans_date,
+                    opening_balance=closing_balance - delta,
+                    closing_balance=closing_balance,
+                )
+            )
+
+        DailyBalanceSnapshot.objects.filter(account_id__in=account_ids).delete()
+        DailyBalanceSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+
+    return len(account_ids), len(snapshots)
+
+
+class Command(BaseCommand):
+    help = "Django command to rebuild daily balance snapshots from transaction history"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="한 번에 처리할 계좌 수")
+        parser.add_argument("--workers", type=int, default=1, help="동시에 실행할 프로세스 수")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        account_ids = Account.objects.order_by("id").values_list("id", flat=True)
+
+        total_accounts = total_snapshots = 0
+        for accounts, snapshots in run_in_chunks(
+            backfill_accounts, account_ids, options["chunk_size"], options["workers"]
+        ):
+            total_accounts += accounts
+            total_snapshots += snapshots
+            self.stdout.write(f"{total_accounts} accounts, {total_snapshots} snapshots backfilled")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {total_snapshots} snapshots in {elapsed:.2f}s"))
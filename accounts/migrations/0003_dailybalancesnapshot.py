@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_rename_account_type_account_type"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyBalanceSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("opening_balance", models.IntegerField()),
+                ("closing_balance", models.IntegerField()),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_snapshots",
+                        to="accounts.account",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("account", "date"), name="unique_account_daily_balance_snapshot")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_dailybalancesnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountStatement",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("period_start", models.DateField()),
+                ("period_end", models.DateField()),
+                ("file_type", models.CharField(choices=[("csv", "CSV"), ("pdf", "PDF")], max_length=3)),
+                ("file", models.FileField(max_length=255, upload_to="statements/%Y/%m/")),
+                ("content_hash", models.CharField(max_length=64)),
+                ("size", models.PositiveIntegerField()),
+                ("transaction_count", models.PositiveIntegerField()),
+                ("opening_balance", models.IntegerField()),
+                ("closing_balance", models.IntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="statements", to="accounts.account"
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("account", "period_start", "file_type"), name="unique_account_statement_period"
+                    )
+                ],
+            },
+        ),
+    ]
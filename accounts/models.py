@@ -1,6 +1,35 @@
 from django.db import models
+from django.db.models import F
 
-from config.constants import ACCOUNT_TYPE, BANK_CODES
+from config.constants import ACCOUNT_TYPE, BANK_CODES, STATEMENT_FILE_TYPES
+
+
+def mask_account_num(account_num):
+    """
+    계좌번호의 마지막 자리 묶음을 *로 가립니다. (3333-54-1231231 -> 3333-54-*******)
+    """
+    head, separator, tail = account_num.rpartition("-")
+    return f"{head}{separator}{'*' * len(tail)}"
+
+
+class AccountManager(models.Manager):
+    def apply_balance_delta(self, account_id, delta):
+        """
+        계좌 잔액에 변동분(delta)을 데이터베이스에서 원자적으로 반영하고, 반영 후 잔액을 반환합니다.
+        출금(delta < 0)인 경우 잔액이 부족하면 UPDATE 문의 조건에 걸려 반영되지 않으므로,
+        동시에 여러 거래가 들어와도 잔액 유실이나 초과 출금이 발생하지 않습니다.
+        UPDATE가 잡은 행 잠금이 커밋 시점까지 유지되도록 transaction.atomic() 블록 안에서 호출해야 합니다.
+        """
+        queryset = self.filter(pk=account_id)
+        if delta < 0:
+            queryset = queryset.filter(balance__gte=-delta)
+
+        if not queryset.update(balance=F("balance") + delta):
+            if not self.filter(pk=account_id).exists():
+                raise self.model.DoesNotExist("존재하지 않는 계좌입니다.")
+            raise ValueError("계좌 잔액보다 큰 금액은 출금할 수 없습니다.")
+
+        return self.filter(pk=account_id).values_list("balance", flat=True).get()
 
 
 class Account(models.Model):
@@ -10,10 +39,156 @@ class Account(models.Model):
     type = models.CharField(choices=ACCOUNT_TYPE, max_length=20, default="CHECKING")
     balance = models.IntegerField(default=0)
 
+    objects = AccountManager()
+
     def __str__(self):
         return f"{self.get_bank_code_display()}: {self.account_num[-4:]}"
 
     def masking_account_num(self):
-        num_list = self.account_num.split("-")
-        num_list[-1] = "*" * len(num_list[-1])
-        return "-".join(num_list)
+        return mask_account_num(self.account_num)
+
+
+class DailyBalanceSnapshotManager(models.Manager):
+    def record(self, account_id, date, delta, balance):
+        """
+        date 일자에 잔액 변동분(delta)이 생겼음을 스냅샷에 반영합니다.
+        해당 일자의 마감 잔액과, 그 이후 일자들의 시작/마감 잔액이 모두 delta 만큼 바뀝니다.
+        balance는 delta가 반영된 계좌 잔액이며, 계좌에 스냅샷이 하나도 없을 때 시작 잔액을 구하는 데 사용합니다.
+        거래를 반영하면서 계좌 행 잠금을 잡고 있는 트랜잭션 안에서 호출해야 같은 계좌의 스냅샷이 꼬이지 않습니다.
+        """
+        if not self.filter(account_id=account_id, date=date).update(closing_balance=F("closing_balance") + delta):
+            opening_balance = self.get_opening_balance(account_id, date)
+            if opening_balance is None:
+                opening_balance = balance - delta
+            self.create(
+                account_id=account_id,
+                date=date,
+                opening_balance=opening_balance,
+                closing_balance=opening_balance + delta,
+            )
+
+        # 과거 일자의 거래가 뒤늦게 들어온 경우, 이후 일자들의 잔액도 함께 옮겨줍니다.
+        self.filter(account_id=account_id, date__gt=date).update(
+            opening_balance=F("opening_balance") + delta, closing_balance=F("closing_balance") + delta
+        )
+
+    def record_many(self, account_id, daily_deltas, balance):
+        """
+        여러 일자의 잔액 변동분({date: delta})을 한 계좌의 스냅샷에 한 번에 반영합니다. (일괄 등록용)
+        일자 수와 상관없이 조회 2번, 저장 2번으로 처리합니다.
+        balance는 모든 delta가 반영된 계좌 잔액입니다.
+        """
+        dates = sorted(daily_deltas)
+        previous = self.filter(account_id=account_id, date__lt=dates[0]).order_by("-date").first()
+        existing = {snapshot.date: snapshot for snapshot in self.filter(account_id=account_id, date__gte=dates[0])}
+
+        if previous:
+            carry = previous.closing_balance
+        elif existing:
+            carry = existing[min(existing)].opening_balance
+        else:
+            carry = balance - sum(daily_deltas.values())
+
+        shift = 0
+        created = []
+        for date in sorted(existing.keys() | daily_deltas.keys()):
+            delta = daily_deltas.get(date, 0)
+            snapshot = existing.get(date)
+            if snapshot:
+                snapshot.opening_balance += shift
+                snapshot.closing_balance += shift + delta
+            else:
+                snapshot = self.model(
+                    account_id=account_id, date=date, opening_balance=carry, closing_balance=carry + delta
+                )
+                created.append(snapshot)
+            shift += delta
+            carry = snapshot.closing_balance
+
+        self.bulk_update(existing.values(), ["opening_balance", "closing_balance"], batch_size=1000)
+        self.bulk_create(created, batch_size=1000)
+
+    def get_opening_balance(self, account_id, date):
+        """
+        스냅샷이 없는 date 일자의 시작 잔액을 주변 스냅샷에서 구합니다. 주변 스냅샷이 없으면 None을 반환합니다.
+        """
+        previous = self.filter(account_id=account_id, date__lt=date).order_by("-date").first()
+        if previous:
+            return previous.closing_balance
+
+        following = self.filter(account_id=account_id, date__gt=date).order_by("date").first()
+        if following:
+            return following.opening_balance
+
+        return None
+
+    def get_balances_at(self, accounts, date):
+        """
+        date 일자 마감 기준 계좌별 잔액을 {account_id: balance} 형태로 반환합니다.
+        거래내역은 읽지 않고 스냅샷만 읽으며, 계좌 수와 상관없이 쿼리 2번으로 처리합니다.
+        """
+        balances = {account.id: account.balance for account in accounts}
+
+        # 이후 스냅샷이 있다면 그 시작 잔액이 date 일자 마감 잔액입니다.
+        following = (
+            self.filter(account_id__in=balances, date__gt=date)
+            .order_by("account_id", "date")
+            .distinct("account_id")
+            .values_list("account_id", "opening_balance")
+        )
+        balances.update(following)
+
+        # date 이전(당일 포함) 스냅샷이 있다면 그 마감 잔액이 더 정확한 값입니다.
+        previous = (
+            self.filter(account_id__in=balances, date__lte=date)
+            .order_by("account_id", "-date")
+            .distinct("account_id")
+            .values_list("account_id", "closing_balance")
+        )
+        balances.update(previous)
+        return balances
+
+
+class DailyBalanceSnapshot(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="balance_snapshots")
+    date = models.DateField()
+    opening_balance = models.IntegerField()
+    closing_balance = models.IntegerField()
+
+    objects = DailyBalanceSnapshotManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["account", "date"], name="unique_account_daily_balance_snapshot"),
+        ]
+
+    def __str__(self):
+        return f"{self.account} - {self.date.strftime('%Y-%m-%d')} 마감 잔액 {self.closing_balance}원"
+
+
+class AccountStatement(models.Model):
+    """
+    계좌별 월간 거래내역서 파일입니다. (accounts.statements.StatementGenerator가 매월 1일에 만듭니다.)
+    """
+
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="statements")
+    period_start = models.DateField()
+    period_end = models.DateField()
+    file_type = models.CharField(choices=STATEMENT_FILE_TYPES, max_length=3)
+    file = models.FileField(upload_to="statements/%Y/%m/", max_length=255)
+    content_hash = models.CharField(max_length=64)  # 파일 내용의 SHA-256
+    size = models.PositiveIntegerField()
+    transaction_count = models.PositiveIntegerField()
+    opening_balance = models.IntegerField()
+    closing_balance = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "period_start", "file_type"], name="unique_account_statement_period"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.account} - {self.period_start.strftime('%Y-%m')} 거래내역서 ({self.file_type})"
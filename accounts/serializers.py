@@ -1,7 +1,15 @@
+from urllib.parse import urlencode
+
+from django.db.models import Q, Sum
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework import serializers
 
-from accounts.models import Account
-from transactions.serializers import TransactionSerializer
+from accounts.models import Account, AccountStatement, mask_account_num
+from analysis.models import DailySpendingRollup
+from config.constants import ACCOUNT_TYPE_LABELS, BANK_CODE_LABELS
+from transactions.paginations import TransactionCursorPagination
+from transactions.serializers import TransactionValuesSerializer
 
 
 class AccountSerializer(serializers.ModelSerializer):
@@ -18,13 +26,96 @@ class AccountSerializer(serializers.ModelSerializer):
         return data
 
 
+class AccountValuesSerializer(serializers.BaseSerializer):
+    """
+    계좌 목록 조회용 읽기 전용 시리얼라이저입니다.
+    .values(*value_fields)로 읽은 dict를 AccountSerializer와 같은 형태로 바로 변환합니다.
+    """
+
+    value_fields = ("id", "user_id", "account_num", "bank_code", "type", "balance")
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "user": row["user_id"],
+            "account_num": mask_account_num(row["account_num"]),
+            "bank_code": row["bank_code"],
+            "type": ACCOUNT_TYPE_LABELS.get(row["type"], row["type"]),
+            "balance": row["balance"],
+            "bank_name": BANK_CODE_LABELS.get(row["bank_code"], row["bank_code"]),
+        }
+
+
 class AccountDetailSerializer(AccountSerializer):
-    transactions = serializers.SerializerMethodField()
+    """
+    계좌 상세 시리얼라이저입니다.
+    전체 거래내역 대신 최근 거래 transactions_limit건과 다음 거래를 이어서 조회할 커서 URL,
+    그리고 이번 달 입금/출금 합계와 전체 거래 건수를 일자별 거래 합계에서 읽어 함께 내려줍니다.
+    거래내역이 아무리 많아도 쿼리 수는 (최근 거래 조회 1회 + 집계 1회)로 일정합니다.
+    """
+
+    transactions_limit = 20
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+
+        # 다음 거래가 있는지 확인하기 위해 한 건 더 가져옵니다.
+        transactions = list(
+            instance.transactions.order_by(*TransactionCursorPagination.ordering).values(
+                *TransactionValuesSerializer.value_fields
+            )[: self.transactions_limit + 1]
+        )
+        data["transactions"] = TransactionValuesSerializer(transactions[: self.transactions_limit], many=True).data
+        data["transactions_next"] = (
+            self.get_transactions_next(instance, transactions[self.transactions_limit - 1])
+            if len(transactions) > self.transactions_limit
+            else None
+        )
+        data["summary"] = self.get_summary(instance)
+        return data
+
+    def get_transactions_next(self, instance, last_transaction):
+        """
+        거래내역 목록 API에서 이 계좌의 다음 거래들을 이어서 조회할 수 있는 URL을 반환합니다.
+        """
+        cursor = TransactionCursorPagination.encode_cursor(TransactionCursorPagination.get_position(last_transaction))
+        url = f"{reverse('transaction-list')}?{urlencode({'account': instance.id, 'cursor': cursor})}"
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    @staticmethod
+    def get_summary(instance):
+        """
+        거래내역 대신 계좌별 일자별 거래 합계(DailySpendingRollup)를 더하므로, 비용이 거래 건수가 아니라 합계 행 수에 비례합니다.
+        """
+        month_start = timezone.localdate().replace(day=1)
+        return DailySpendingRollup.objects.filter(account_id=instance.id).aggregate(
+            transaction_count=Sum("transaction_count", default=0),
+            month_deposit=Sum("total_amount", filter=Q(trans_type="DEPOSIT", date__gte=month_start), default=0),
+            month_withdraw=Sum("total_amount", filter=Q(trans_type="WITHDRAW", date__gte=month_start), default=0),
+        )
+
+
+class AccountStatementSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AccountStatement
+        exclude = ("account",)
+
 
-    def get_transactions(self, obj):
-        transactions = obj.transactions.all()
+class AccountBalanceQuerySerializer(serializers.Serializer):
+    """
+    특정 일자(date) 또는 기간(start ~ end)의 잔액 조회 조건을 검증하는 시리얼라이저입니다.
+    """
 
-        if not transactions.exists():
-            return []
+    date = serializers.DateField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
 
-        return TransactionSerializer(transactions, many=True).data
+    def validate(self, attrs):
+        if "date" in attrs:
+            return attrs
+        if "start" not in attrs or "end" not in attrs:
+            raise serializers.ValidationError("date 또는 start, end를 전달해주세요.")
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"end": "end는 start보다 크거나 같아야 합니다."})
+        return attrs
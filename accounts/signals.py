@@ -0,0 +1,39 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.caches import account_list_cache
+from accounts.models import Account
+from transactions.models import Transaction
+
+# 캐시는 커밋된 내용만 반영하도록 모두 transaction.on_commit으로 처리합니다.
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_account_list_cache(sender, instance, **kwargs):
+    transaction.on_commit(partial(account_list_cache.invalidate, instance.user_id))
+
+
+@receiver(post_save, sender=Transaction)
+def patch_account_list_cache_balance(sender, instance, created, **kwargs):
+    # 계좌의 사용자는 계좌 행에서 읽습니다. (뷰와 이체에서는 이미 불러온 계좌를 쓰므로 쿼리가 늘지 않습니다.)
+    user_id = instance.account.user_id
+    if created:
+        transaction.on_commit(
+            partial(account_list_cache.patch_balance, user_id, instance.account_id, instance.after_balance, instance.pk)
+        )
+        return
+
+    # 수정된 거래는 반영 순서를 알 수 없으므로 캐시를 무효화합니다.
+    transaction.on_commit(partial(account_list_cache.invalidate, user_id))
+
+
+@receiver(post_delete, sender=Transaction)
+def invalidate_account_list_cache_on_transaction_delete(sender, instance, origin=None, **kwargs):
+    # 계좌를 지우면서 함께 지워지는 거래는 계좌 삭제 시그널이 캐시를 무효화하므로 거래마다 계좌를 읽지 않습니다.
+    if isinstance(origin, Account) or getattr(origin, "model", None) is Account:
+        return
+    transaction.on_commit(partial(account_list_cache.invalidate, instance.account.user_id))
@@ -0,0 +1,161 @@
+import hashlib
+import tempfile
+from datetime import timedelta
+from functools import partial
+from itertools import batched
+
+from dateutil.relativedelta import relativedelta
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Count
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from accounts.models import Account, AccountStatement, DailyBalanceSnapshot
+from transactions.exporters import TransactionExporter
+from transactions.models import Transaction
+
+
+class StatementGenerator:
+    """
+    계좌별 월간 거래내역서(CSV, PDF)를 만들어 저장하는 클래스입니다.
+
+    거래내역은 서버 측 커서로 조금씩 읽어 임시 파일에 바로 써 내려가고, PDF도 한 페이지 분량만 메모리에 올리므로
+    계좌의 거래 건수와 상관없이 메모리 사용량이 일정합니다.
+    같은 계좌/기간/형식의 거래내역서가 이미 있으면 새로 만든 파일로 바꿉니다.
+    """
+
+    file_types = ("csv", "pdf")
+    rows_per_page = 40
+    hash_block_size = 1024 * 1024
+
+    def __init__(self, period_start):
+        self.period_start = period_start.replace(day=1)
+        self.period_end = self.period_start + relativedelta(months=1) - timedelta(days=1)
+
+    def generate(self, account_ids):
+        """
+        계좌 묶음의 거래내역서를 만들고, 만든 파일 수를 반환합니다.
+        시작/마감 잔액과 거래 건수는 계좌마다가 아니라 묶음 전체를 한 번에 조회합니다.
+        """
+        accounts = list(Account.objects.filter(id__in=account_ids).order_by("id"))
+        opening_balances = DailyBalanceSnapshot.objects.get_balances_at(accounts, self.period_start - timedelta(days=1))
+        closing_balances = DailyBalanceSnapshot.objects.get_balances_at(accounts, self.period_end)
+        transaction_counts = dict(
+            self.get_transactions(account_ids)
+            .values_list("account_id")
+            .annotate(count=Count("id"))
+            .order_by("account_id")
+        )
+
+        generated = 0
+        for account in accounts:
+            for file_type in self.file_types:
+                self.build(
+                    account,
+                    file_type,
+                    opening_balances[account.id],
+                    closing_balances[account.id],
+                    transaction_counts.get(account.id, 0),
+                )
+                generated += 1
+        return generated
+
+    def get_transactions(self, account_ids):
+        return Transaction.objects.filter(
+            account_id__in=account_ids, trans_date__range=[self.period_start, self.period_end]
+        )
+
+    def build(self, account, file_type, opening_balance, closing_balance, transaction_count):
+        exporter = TransactionExporter(self.get_transactions([account.id]), file_type)
+
+        with tempfile.TemporaryFile() as output:
+            if file_type == "csv":
+                for chunk in exporter.stream():
+                    output.write(chunk.encode())
+            else:
+                self.write_pdf(output, account, exporter.iter_rows(), opening_balance, closing_balance)
+
+            output.seek(0)
+            content_hash, size = self.hash_file(output)
+            output.seek(0)
+
+            # 새 파일을 먼저 저장하고, 행이 새 파일을 가리키도록 커밋된 뒤에만 이전 파일을 지웁니다.
+            # 중간에 실패해도 행이 이미 지워진 파일을 가리키는 일이 없습니다.
+            storage = AccountStatement.file.field.storage
+            file_name = storage.save(
+                AccountStatement.file.field.generate_filename(
+                    None, f"{account.id}_{self.period_start.strftime('%Y%m')}.{file_type}"
+                ),
+                File(output),
+                max_length=AccountStatement.file.field.max_length,
+            )
+
+        statement_key = {"account": account, "period_start": self.period_start, "file_type": file_type}
+        try:
+            with transaction.atomic():
+                # 이전 파일 이름을 읽는 동안 다른 워커가 같은 행을 바꾸지 못하도록 잠급니다.
+                previous_file = (
+                    AccountStatement.objects.select_for_update()
+                    .filter(**statement_key)
+                    .values_list("file", flat=True)
+                    .first()
+                )
+                statement, _ = AccountStatement.objects.update_or_create(
+                    **statement_key,
+                    defaults={
+                        "period_end": self.period_end,
+                        "file": file_name,
+                        "content_hash": content_hash,
+                        "size": size,
+                        "transaction_count": transaction_count,
+                        "opening_balance": opening_balance,
+                        "closing_balance": closing_balance,
+                    },
+                )
+                if previous_file:
+                    transaction.on_commit(partial(storage.delete, previous_file))
+        except Exception:
+            storage.delete(file_name)
+            raise
+        return statement
+
+    def write_pdf(self, output, account, rows, opening_balance, closing_balance):
+        columns = ("일자", "시간", "구분", "거래방법", "금액", "잔액", "내용")
+        title = (
+            f"{account.masking_account_num()}  {self.period_start.strftime('%Y-%m')} 거래내역서  "
+            f"(시작 잔액 {opening_balance:,}원 / 마감 잔액 {closing_balance:,}원)"
+        )
+
+        with PdfPages(output) as pdf:
+            pages = 0
+            for page_rows in batched(rows, self.rows_per_page):
+                cells = [
+                    [trans_date, trans_time[:8], trans_type, trans_method, f"{amount:,}", f"{balance:,}", content]
+                    for _, _, trans_date, trans_time, trans_type, trans_method, amount, balance, content in page_rows
+                ]
+                pdf.savefig(self.render_page(title, columns, cells))
+                pages += 1
+
+            if not pages:
+                pdf.savefig(self.render_page(title, columns, [["-"] * len(columns)]))
+
+    @staticmethod
+    def render_page(title, columns, cells):
+        # pyplot을 거치지 않고 Figure를 직접 만들면 전역 상태가 남지 않아 워커에서 메모리가 쌓이지 않습니다.
+        figure = Figure(figsize=(8.27, 11.69))
+        figure.suptitle(title, fontsize=9)
+        ax = figure.add_subplot()
+        ax.axis("off")
+        table = ax.table(cellText=cells, colLabels=columns, loc="upper center", cellLoc="center")
+        table.auto_set_font_size(False)
+        table.set_fontsize(7)
+        return figure
+
+    def hash_file(self, output):
+        content_hash = hashlib.sha256()
+        size = 0
+        while block := output.read(self.hash_block_size):
+            content_hash.update(block)
+            size += len(block)
+        return content_hash.hexdigest(), size
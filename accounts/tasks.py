@@ -0,0 +1,28 @@
+from datetime import date
+
+from celery import shared_task
+from dateutil.relativedelta import relativedelta
+from django.utils import timezone
+
+from accounts.models import Account
+from accounts.statements import StatementGenerator
+from core.utils import split_chunks
+
+
+@shared_task
+def generate_monthly_statements(period_start=None, chunk_size=500):
+    """
+    모든 계좌의 월간 거래내역서(기본값: 지난달)를 만듭니다.
+    계좌를 chunk_size 개씩 나눠 여러 워커가 나눠서 처리하도록 작업을 등록합니다.
+    """
+    if period_start is None:
+        period_start = (timezone.localdate().replace(day=1) - relativedelta(months=1)).isoformat()
+
+    account_ids = Account.objects.order_by("id").values_list("id", flat=True)
+    for chunk in split_chunks(account_ids, chunk_size):
+        generate_statements_for_accounts.delay(chunk, period_start)
+
+
+@shared_task
+def generate_statements_for_accounts(account_ids, period_start):
+    return StatementGenerator(date.fromisoformat(period_start)).generate(account_ids)
@@ -1,13 +1,29 @@
+import hashlib
+import os
 import random
-from datetime import datetime
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from accounts.models import Account
+from accounts.caches import account_list_cache, account_list_cache_stats
+from accounts.models import Account, AccountStatement, DailyBalanceSnapshot
+from accounts.serializers import AccountSerializer, AccountValuesSerializer
+from accounts.tasks import generate_statements_for_accounts
+from analysis.management.commands.backfill_spending_rollups import backfill_users
 from transactions.models import Transaction
 
 
@@ -75,6 +91,15 @@ class AccountModelTestCases(TestCase):
 
         self.assertEqual(account.masking_account_num(), "3333-54-*******")
 
+    def test_account_values_serializer_matches_account_serializer(self):
+        Account.objects.create(**self.account_data)
+        Account.objects.create(**{**self.account_data, "account_num": "1002-123-456789", "type": "SAVING"})
+
+        queryset = Account.objects.order_by("id")
+        values = AccountValuesSerializer(queryset.values(*AccountValuesSerializer.value_fields), many=True).data
+
+        self.assertEqual(values, AccountSerializer(queryset, many=True).data)
+
 
 class AccountViewTestCase(APITestCase):
     def setUp(self):
@@ -146,6 +171,96 @@ class AccountViewTestCase(APITestCase):
         self.assertEqual(response.data["balance"], account.balance)
         self.assertEqual(response.data["type"], account.get_type_display())
         self.assertEqual(len(response.data["transactions"]), account.transactions.count())
+        self.assertIsNone(response.data["transactions_next"])
+        self.assertEqual(response.data["summary"], {"transaction_count": 0, "month_deposit": 0, "month_withdraw": 0})
+
+    def create_transactions(self, account, count):
+        today = timezone.localdate()
+        Transaction.objects.bulk_create(
+            Transaction(
+                account=account,
+                trans_amount=1000,
+                after_balance=1000000,
+                print_content=f"{i}. 거래",
+                trans_type="DEPOSIT" if i % 2 else "WITHDRAW",
+                trans_method="CARD",
+                # 지난달 거래도 섞이도록 매달 1일 기준으로 40일에 걸쳐 만듭니다.
+                trans_date=today.replace(day=1) - timedelta(days=i % 40 - 20),
+                trans_time=datetime(2024, 1, 1, i % 24).time(),
+            )
+            for i in range(count)
+        )
+        # bulk_create는 일자별 거래 합계를 갱신하지 않으므로 한 번에 만들어 줍니다.
+        backfill_users([account.user_id])
+
+    def test_account_detail_view_embeds_latest_transactions_with_cursor(self):
+        account = Account.objects.create(user_id=self.user.id, account_num="3333-54-1231231", balance=1000000)
+        self.create_transactions(account, 25)
+        url = reverse("account-detail", kwargs={"pk": account.id})
+
+        response = self.client.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["transactions"]), 20)
+        ordering = ("-trans_date", "-trans_time", "-id")
+        latest_ids = list(account.transactions.order_by(*ordering).values_list("id", flat=True))
+        self.assertEqual([row["id"] for row in response.data["transactions"]], latest_ids[:20])
+
+        # 커서 URL로 나머지 거래를 이어서 조회할 수 있어야 합니다.
+        response = self.client.get(
+            response.data["transactions_next"], headers={"Authorization": f"Bearer {self.access_token}"}
+        )
+        self.assertEqual([row["id"] for row in response.data["results"]], latest_ids[20:])
+
+    def test_account_detail_view_summary(self):
+        account = Account.objects.create(user_id=self.user.id, account_num="3333-54-1231231", balance=1000000)
+        self.create_transactions(account, 40)
+        month_start = timezone.localdate().replace(day=1)
+        this_month = account.transactions.filter(trans_date__gte=month_start)
+        url = reverse("account-detail", kwargs={"pk": account.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
+
+        # 거래내역은 최근 거래를 읽을 때만 조회하고, 요약은 일자별 거래 합계에서 읽습니다.
+        self.assertEqual(len([query for query in queries if Transaction._meta.db_table in query["sql"]]), 1)
+        self.assertEqual(
+            response.data["summary"],
+            {
+                "transaction_count": 40,
+                "month_deposit": this_month.filter(trans_type="DEPOSIT").count() * 1000,
+                "month_withdraw": this_month.filter(trans_type="WITHDRAW").count() * 1000,
+            },
+        )
+
+    def test_account_detail_view_query_count_does_not_grow_with_history(self):
+        for count in (5, 500):
+            account = Account.objects.create(user_id=self.user.id, account_num=f"3333-54-{count:07d}", balance=0)
+            self.create_transactions(account, count)
+            url = reverse("account-detail", kwargs={"pk": account.id})
+
+            # 사용자 인증, 계좌 조회, 최근 거래 조회, 집계
+            with self.assertNumQueries(4):
+                self.client.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
+
+    def test_account_detail_view_of_other_users_account(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword1234",
+            nickname="other",
+            name="김철수",
+            phone="010-3333-4444",
+        )
+        account = Account.objects.create(user_id=other_user.id, account_num="1111-11-1111111", balance=1000000)
+        self.create_transactions(account, 5)
+        url = reverse("account-detail", kwargs={"pk": account.id})
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+
+        self.assertEqual(self.client.get(url, headers=headers).status_code, 404)
+        self.assertEqual(self.client.patch(url, {"balance": 0}, headers=headers).status_code, 404)
+        self.assertEqual(self.client.delete(url, headers=headers).status_code, 404)
+        account.refresh_from_db()
+        self.assertEqual((account.user_id, account.balance), (other_user.id, 1000000))
 
     def test_account_update_view(self):
         account = Account.objects.create(
@@ -180,3 +295,499 @@ class AccountViewTestCase(APITestCase):
 
         self.assertEqual(response.status_code, 204)
         self.assertFalse(Account.objects.filter(id=account.id).exists())
+
+
+class AccountListCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        account_list_cache_stats.reset()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        self.account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=100000, type="CHECKING"
+        )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.url = reverse("account-list")
+
+    def get_list(self):
+        return self.client.get(self.url, headers={"Authorization": f"Bearer {self.access_token}"})
+
+    def test_account_list_only_returns_own_accounts(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword1234",
+            nickname="other",
+            name="김철수",
+            phone="010-3333-4444",
+        )
+        Account.objects.create(user_id=other_user.id, account_num="1111-11-1111111", balance=0)
+
+        response = self.get_list()
+
+        self.assertEqual([account["id"] for account in response.data], [self.account.id])
+
+    def test_cached_account_list_skips_database(self):
+        self.get_list()
+
+        # 사용자 인증 조회만 실행되어야 합니다.
+        with self.assertNumQueries(1):
+            response = self.get_list()
+
+        self.assertEqual(response.data[0]["balance"], 100000)
+        self.assertEqual((account_list_cache_stats.hits, account_list_cache_stats.misses), (1, 1))
+        self.assertEqual(account_list_cache_stats.hit_ratio, 0.5)
+        self.assertGreater(account_list_cache_stats.average_latency, 0)
+
+    def test_account_create_invalidates_cached_list(self):
+        self.get_list()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                self.url,
+                {"account_num": "3333-54-7777777", "bank_code": "090", "balance": 0, "type": "SAVING"},
+                headers={"Authorization": f"Bearer {self.access_token}"},
+            )
+        response = self.get_list()
+
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(account_list_cache_stats.misses, 2)
+
+    def test_transaction_posting_patches_cached_balance(self):
+        self.get_list()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                account=self.account,
+                trans_amount=30000,
+                print_content="출금 Test",
+                trans_type="WITHDRAW",
+                trans_method="CARD",
+                trans_date=date(2024, 9, 1),
+                trans_time=datetime(2024, 9, 1, 12).time(),
+            )
+        response = self.get_list()
+
+        self.assertEqual(response.data[0]["balance"], 70000)
+        self.assertEqual(account_list_cache_stats.hits, 1)
+
+    def test_stale_balance_patch_is_ignored(self):
+        self.get_list()
+
+        account_list_cache.patch_balance(self.user.id, self.account.id, 90000, posting_id=2)
+        account_list_cache.patch_balance(self.user.id, self.account.id, 95000, posting_id=1)
+
+        self.assertEqual(account_list_cache.get(self.user.id)[0]["balance"], 90000)
+
+    def test_balance_patch_waits_for_lock_or_invalidates(self):
+        self.get_list()
+        cache.set(account_list_cache.lock_key(self.user.id), "other", account_list_cache.lock_timeout)
+
+        # 다른 곳에서 잠금을 잡고 있으면 고치지 않고 캐시를 무효화합니다.
+        with patch.object(account_list_cache, "lock_wait", 0):
+            account_list_cache.patch_balance(self.user.id, self.account.id, 90000, posting_id=2)
+
+        self.assertIsNone(account_list_cache.get(self.user.id))
+        self.assertEqual(cache.get(account_list_cache.lock_key(self.user.id)), "other")
+
+        cache.delete(account_list_cache.lock_key(self.user.id))
+        self.get_list()
+        account_list_cache.patch_balance(self.user.id, self.account.id, 90000, posting_id=2)
+
+        self.assertEqual(account_list_cache.get(self.user.id)[0]["balance"], 90000)
+        self.assertIsNone(cache.get(account_list_cache.lock_key(self.user.id)))
+
+    def test_balance_patches_keep_cached_list_fresh_past_first_timeout(self):
+        def post(trans_amount):
+            with self.captureOnCommitCallbacks(execute=True):
+                Transaction.objects.create(
+                    account=self.account,
+                    trans_amount=trans_amount,
+                    print_content="출금 Test",
+                    trans_type="WITHDRAW",
+                    trans_method="CARD",
+                    trans_date=date(2024, 9, 1),
+                    trans_time=datetime(2024, 9, 1, 12).time(),
+                )
+
+        now = time.time()
+        with patch("django.core.cache.backends.locmem.time.time") as clock:
+            clock.return_value = now
+            self.get_list()
+            # 처음 캐시한 뒤 timeout(600초)이 지나도 고쳐 쓴 목록에는 이후 거래가 계속 반영되어야 합니다.
+            clock.return_value = now + 500
+            post(10000)
+            clock.return_value = now + 700
+            post(20000)
+
+            self.assertEqual(account_list_cache.get(self.user.id)[0]["balance"], 70000)
+
+    def test_evicted_version_does_not_revive_old_list(self):
+        self.get_list()
+        old_version = account_list_cache.get_version(self.user.id)
+        cache.delete(account_list_cache.version_key(self.user.id))
+
+        self.assertIsNone(account_list_cache.get(self.user.id))
+        self.assertNotEqual(account_list_cache.get_version(self.user.id), old_version)
+
+
+class AccountNetWorthViewTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        for i, (bank_code, account_type, balance) in enumerate(
+            [
+                ("090", "CHECKING", 100000),
+                ("090", "CHECKING", 50000),
+                ("090", "SAVING", 300000),
+                ("004", "CHECKING", 20000),
+                ("004", "LOAN", 1000000),
+            ]
+        ):
+            Account.objects.create(
+                user_id=self.user.id,
+                account_num=f"3333-54-000000{i}",
+                bank_code=bank_code,
+                type=account_type,
+                balance=balance,
+            )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.url = reverse("account-net-worth")
+
+    def get_net_worth(self):
+        return self.client.get(self.url, headers={"Authorization": f"Bearer {self.access_token}"})
+
+    def test_net_worth_grouped_by_bank_and_type(self):
+        response = self.get_net_worth()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["assets"], 470000)
+        self.assertEqual(response.data["liabilities"], 1000000)
+        self.assertEqual(response.data["net_worth"], -530000)
+        self.assertEqual(
+            [(g["bank_code"], g["type"], g["account_count"], g["total"]) for g in response.data["groups"]],
+            [
+                ("004", "CHECKING", 1, 20000),
+                ("004", "LOAN", 1, 1000000),
+                ("090", "CHECKING", 2, 150000),
+                ("090", "SAVING", 1, 300000),
+            ],
+        )
+        self.assertEqual(response.data["groups"][1]["type_name"], "대출")
+        self.assertTrue(response.data["groups"][1]["is_liability"])
+
+    def test_net_worth_is_cached(self):
+        with self.assertNumQueries(2):
+            self.get_net_worth()
+
+        # 사용자 인증 조회만 실행되어야 합니다.
+        with self.assertNumQueries(1):
+            self.get_net_worth()
+
+    def test_net_worth_cache_invalidated_on_balance_change(self):
+        self.get_net_worth()
+        account = Account.objects.get(user=self.user, type="SAVING")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                account=account,
+                trans_amount=100000,
+                print_content="출금 Test",
+                trans_type="WITHDRAW",
+                trans_method="CARD",
+                trans_date=date(2024, 9, 1),
+                trans_time=datetime(2024, 9, 1, 12).time(),
+            )
+        response = self.get_net_worth()
+
+        self.assertEqual(response.data["assets"], 370000)
+
+    def test_net_worth_cache_invalidated_on_account_create(self):
+        self.get_net_worth()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Account.objects.create(user_id=self.user.id, account_num="3333-54-7777777", type="LOAN", balance=5000)
+        response = self.get_net_worth()
+
+        self.assertEqual(response.data["liabilities"], 1005000)
+
+
+class AccountStatementTestCase(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        self.account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=100000, type="CHECKING"
+        )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        for trans_type, trans_amount, trans_date in [
+            ("DEPOSIT", 20000, date(2024, 8, 20)),
+            ("WITHDRAW", 5000, date(2024, 9, 1)),
+            ("DEPOSIT", 30000, date(2024, 9, 15)),
+            ("WITHDRAW", 1000, date(2024, 10, 1)),
+        ]:
+            Transaction.objects.create(
+                account=self.account,
+                trans_amount=trans_amount,
+                print_content=f"{trans_type} Test",
+                trans_type=trans_type,
+                trans_method="CARD",
+                trans_date=trans_date,
+                trans_time=datetime(2024, 9, 1, 12).time(),
+            )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_generate_monthly_statements(self):
+        generated = generate_statements_for_accounts([self.account.id], "2024-09-01")
+
+        self.assertEqual(generated, 2)
+        csv_statement = AccountStatement.objects.get(account=self.account, file_type="csv")
+        self.assertEqual(csv_statement.period_start, date(2024, 9, 1))
+        self.assertEqual(csv_statement.period_end, date(2024, 9, 30))
+        self.assertEqual(csv_statement.transaction_count, 2)
+        self.assertEqual((csv_statement.opening_balance, csv_statement.closing_balance), (120000, 145000))
+
+        with csv_statement.file.open("rb") as f:
+            content = f.read()
+        self.assertEqual(csv_statement.content_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(csv_statement.size, len(content))
+        lines = content.decode("utf-8-sig").splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn("2024-09-01", lines[1])
+
+        pdf_statement = AccountStatement.objects.get(account=self.account, file_type="pdf")
+        with pdf_statement.file.open("rb") as f:
+            self.assertEqual(f.read(4), b"%PDF")
+
+    def test_regenerate_replaces_statement(self):
+        generate_statements_for_accounts([self.account.id], "2024-09-01")
+        Transaction.objects.create(
+            account=self.account,
+            trans_amount=1000,
+            print_content="추가 거래",
+            trans_type="DEPOSIT",
+            trans_method="CARD",
+            trans_date=date(2024, 9, 30),
+            trans_time=datetime(2024, 9, 1, 12).time(),
+        )
+
+        generate_statements_for_accounts([self.account.id], "2024-09-01")
+
+        self.assertEqual(AccountStatement.objects.count(), 2)
+        self.assertEqual(AccountStatement.objects.get(file_type="csv").transaction_count, 3)
+
+    def test_regenerate_deletes_previous_file_after_commit(self):
+        generate_statements_for_accounts([self.account.id], "2024-09-01")
+        previous = AccountStatement.objects.get(file_type="csv").file
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            generate_statements_for_accounts([self.account.id], "2024-09-01")
+            # 커밋되기 전에는 이전 파일이 그대로 남아 있어야 합니다.
+            self.assertTrue(previous.storage.exists(previous.name))
+
+        self.assertEqual(len(callbacks), 2)
+        for callback in callbacks:
+            callback()
+        statement = AccountStatement.objects.get(file_type="csv")
+        self.assertNotEqual(statement.file.name, previous.name)
+        self.assertFalse(previous.storage.exists(previous.name))
+        self.assertTrue(statement.file.storage.exists(statement.file.name))
+
+    def test_failed_regenerate_keeps_previous_statement(self):
+        generate_statements_for_accounts([self.account.id], "2024-09-01")
+        previous = AccountStatement.objects.get(file_type="csv")
+
+        with patch.object(AccountStatement.objects, "update_or_create", side_effect=DatabaseError), self.assertRaises(
+            DatabaseError
+        ):
+            generate_statements_for_accounts([self.account.id], "2024-09-01")
+
+        statement = AccountStatement.objects.get(file_type="csv")
+        self.assertEqual(statement.file.name, previous.file.name)
+        self.assertTrue(statement.file.storage.exists(statement.file.name))
+        # 저장하지 못한 새 파일은 남기지 않습니다.
+        self.assertEqual(len(os.listdir(os.path.dirname(statement.file.path))), 2)
+
+    def test_statement_list_view(self):
+        generate_statements_for_accounts([self.account.id], "2024-09-01")
+        generate_statements_for_accounts([self.account.id], "2024-08-01")
+        url = reverse("account-statements", kwargs={"pk": self.account.id})
+
+        response = self.client.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["period_start"], row["file_type"]) for row in response.data],
+            [("2024-09-01", "csv"), ("2024-09-01", "pdf"), ("2024-08-01", "csv"), ("2024-08-01", "pdf")],
+        )
+        self.assertTrue(response.data[0]["file"].endswith(".csv"))
+
+    def test_statement_list_view_other_users_account(self):
+        generate_statements_for_accounts([self.account.id], "2024-09-01")
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword1234",
+            nickname="other",
+            name="김철수",
+            phone="010-3333-4444",
+            is_active=True,
+        )
+        url = reverse("account-statements", kwargs={"pk": self.account.id})
+
+        response = self.client.get(
+            url, headers={"Authorization": f"Bearer {RefreshToken.for_user(other_user).access_token}"}
+        )
+
+        self.assertEqual(response.data, [])
+
+
+class DailyBalanceSnapshotTestCase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        self.account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=100000, type="CHECKING"
+        )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+
+    def post(self, trans_type, trans_amount, trans_date):
+        return Transaction.objects.create(
+            account_id=self.account.id,
+            trans_amount=trans_amount,
+            print_content=f"{trans_type} Test",
+            trans_type=trans_type,
+            trans_method="TRANSFER",
+            trans_date=trans_date,
+            trans_time=datetime(2024, 9, 1, 12).time(),
+        )
+
+    def get_snapshots(self):
+        return list(
+            DailyBalanceSnapshot.objects.filter(account=self.account)
+            .order_by("date")
+            .values_list("date", "opening_balance", "closing_balance")
+        )
+
+    def test_snapshot_recorded_when_transaction_posted(self):
+        self.post("DEPOSIT", 20000, date(2024, 9, 1))
+        self.post("WITHDRAW", 5000, date(2024, 9, 1))
+        self.post("WITHDRAW", 10000, date(2024, 9, 3))
+
+        self.assertEqual(
+            self.get_snapshots(),
+            [(date(2024, 9, 1), 100000, 115000), (date(2024, 9, 3), 115000, 105000)],
+        )
+
+    def test_backdated_transaction_shifts_later_snapshots(self):
+        self.post("WITHDRAW", 10000, date(2024, 9, 3))
+        self.post("DEPOSIT", 20000, date(2024, 9, 1))
+
+        self.assertEqual(
+            self.get_snapshots(),
+            [(date(2024, 9, 1), 100000, 120000), (date(2024, 9, 3), 120000, 110000)],
+        )
+
+    def test_balance_at_date_view(self):
+        self.post("DEPOSIT", 20000, date(2024, 9, 1))
+        self.post("WITHDRAW", 10000, date(2024, 9, 3))
+        url = reverse("account-balances")
+
+        balances = {}
+        for day in ("2024-08-31", "2024-09-01", "2024-09-02", "2024-09-03", "2024-09-30"):
+            # 인증 1 + 계좌 1 + 스냅샷 2
+            with self.assertNumQueries(4):
+                response = self.client.get(url, {"date": day}, headers={"Authorization": f"Bearer {self.access_token}"})
+            self.assertEqual(response.status_code, 200)
+            balances[day] = response.data["total_balance"]
+
+        self.assertEqual(
+            balances,
+            {
+                "2024-08-31": 100000,
+                "2024-09-01": 120000,
+                "2024-09-02": 120000,
+                "2024-09-03": 110000,
+                "2024-09-30": 110000,
+            },
+        )
+
+    def test_balance_range_view(self):
+        self.post("DEPOSIT", 20000, date(2024, 9, 1))
+        self.post("WITHDRAW", 10000, date(2024, 9, 3))
+        self.post("WITHDRAW", 10000, date(2024, 9, 10))
+        url = reverse("account-balances")
+
+        response = self.client.get(
+            url, {"start": "2024-09-02", "end": "2024-09-05"}, headers={"Authorization": f"Bearer {self.access_token}"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["accounts"][0]["start_balance"], 120000)
+        self.assertEqual(len(response.data["accounts"][0]["snapshots"]), 1)
+        self.assertEqual(response.data["accounts"][0]["snapshots"][0]["closing_balance"], 110000)
+
+    def test_balance_view_without_params(self):
+        response = self.client.get(
+            reverse("account-balances"), headers={"Authorization": f"Bearer {self.access_token}"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_backfill_balance_snapshots_command(self):
+        self.post("DEPOSIT", 20000, date(2024, 9, 1))
+        self.post("WITHDRAW", 5000, date(2024, 9, 1))
+        self.post("WITHDRAW", 10000, date(2024, 9, 3))
+        expected = self.get_snapshots()
+        DailyBalanceSnapshot.objects.all().delete()
+
+        call_command("backfill_balance_snapshots", stdout=StringIO())
+
+        self.assertEqual(self.get_snapshots(), expected)
+
+    def test_record_many_merges_with_existing_snapshots(self):
+        self.post("DEPOSIT", 20000, date(2024, 9, 1))
+        self.post("WITHDRAW", 10000, date(2024, 9, 5))
+
+        DailyBalanceSnapshot.objects.record_many(
+            self.account.id, {date(2024, 8, 30): 1000, date(2024, 9, 1): 2000, date(2024, 9, 3): 3000}, 116000
+        )
+
+        self.assertEqual(
+            self.get_snapshots(),
+            [
+                (date(2024, 8, 30), 100000, 101000),
+                (date(2024, 9, 1), 101000, 123000),
+                (date(2024, 9, 3), 123000, 126000),
+                (date(2024, 9, 5), 126000, 116000),
+            ],
+        )
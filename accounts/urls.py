@@ -4,5 +4,8 @@ from accounts import views as account_views
 
 urlpatterns = [
     path("", account_views.AccountListCreateView.as_view(), name="account-list"),
+    path("net-worth/", account_views.AccountNetWorthView.as_view(), name="account-net-worth"),
+    path("balances/", account_views.AccountBalanceView.as_view(), name="account-balances"),
     path("<int:pk>/", account_views.AccountDetailView.as_view(), name="account-detail"),
+    path("<int:pk>/statements/", account_views.AccountStatementListView.as_view(), name="account-statements"),
 ]
@@ -1,13 +1,55 @@
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from datetime import timedelta
 
-from accounts.models import Account
-from accounts.serializers import AccountDetailSerializer, AccountSerializer
+from django.db.models import Count, Sum
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.generics import (
+    ListAPIView,
+    ListCreateAPIView,
+    RetrieveUpdateDestroyAPIView,
+)
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.caches import account_list_cache
+from accounts.models import Account, AccountStatement, DailyBalanceSnapshot
+from accounts.serializers import (
+    AccountBalanceQuerySerializer,
+    AccountDetailSerializer,
+    AccountSerializer,
+    AccountStatementSerializer,
+    AccountValuesSerializer,
+)
+from config.constants import (
+    ACCOUNT_TYPE_LABELS,
+    BANK_CODE_LABELS,
+    LIABILITY_ACCOUNT_TYPES,
+)
 
 
 class AccountListCreateView(ListCreateAPIView):
     queryset = Account.objects.all()
     serializer_class = AccountSerializer
 
+    def get_serializer_class(self):
+        # 목록 조회는 모델 객체를 만들지 않는 읽기 전용 시리얼라이저를 사용합니다.
+        if self.request.method == "GET":
+            return AccountValuesSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(user=self.request.user)
+        if self.request.method == "GET":
+            return queryset.order_by("id").values(*AccountValuesSerializer.value_fields)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        # 계좌 목록은 거의 바뀌지 않으므로 사용자별로 캐시합니다. (accounts.caches.AccountListCache)
+        accounts = account_list_cache.get_or_render(
+            request.user.id, lambda: list(self.get_serializer(self.get_queryset(), many=True).data)
+        )
+        return Response(accounts)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -16,5 +58,134 @@ class AccountDetailView(RetrieveUpdateDestroyAPIView):
     queryset = Account.objects.all()
     serializer_class = AccountDetailSerializer
 
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
     def perform_update(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class AccountStatementListView(ListAPIView):
+    """
+    계좌의 월간 거래내역서 목록 API입니다. 파일은 매월 1일에 미리 만들어 두므로 목록만 조회합니다.
+    """
+
+    queryset = AccountStatement.objects.all()
+    serializer_class = AccountStatementSerializer
+
+    @swagger_auto_schema(
+        manual_parameters=[openapi.Parameter("id", openapi.IN_PATH, "계좌 id", type=openapi.TYPE_INTEGER)]
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        # API 문서를 만들 때는 URL의 계좌 id와 요청한 사용자가 없으므로 빈 쿼리셋을 반환합니다.
+        if getattr(self, "swagger_fake_view", False):
+            return AccountStatement.objects.none()
+        return (
+            super()
+            .get_queryset()
+            .filter(account_id=self.kwargs["pk"], account__user=self.request.user)
+            .order_by("-period_start", "file_type")
+        )
+
+
+class AccountNetWorthView(APIView):
+    """
+    은행/계좌 종류별 잔액 합계와 순자산(자산 - 부채)을 조회하는 API입니다.
+    DB에서 GROUP BY 한 번으로 집계하고 사용자별로 캐시합니다. (대출 계좌는 부채로 계산합니다.)
+    """
+
+    def get(self, request, *args, **kwargs):
+        net_worth = account_list_cache.get_net_worth(request.user.id)
+        if net_worth is None:
+            net_worth = self.aggregate(request.user)
+        return Response(net_worth)
+
+    @staticmethod
+    def aggregate(user):
+        rows = (
+            Account.objects.filter(user=user)
+            .values("bank_code", "type")
+            .annotate(total=Sum("balance"), account_count=Count("id"))
+            .order_by("bank_code", "type")
+        )
+
+        groups = []
+        assets = liabilities = 0
+        for row in rows:
+            is_liability = row["type"] in LIABILITY_ACCOUNT_TYPES
+            if is_liability:
+                liabilities += row["total"]
+            else:
+                assets += row["total"]
+            groups.append(
+                {
+                    "bank_code": row["bank_code"],
+                    "bank_name": BANK_CODE_LABELS.get(row["bank_code"], row["bank_code"]),
+                    "type": row["type"],
+                    "type_name": ACCOUNT_TYPE_LABELS.get(row["type"], row["type"]),
+                    "is_liability": is_liability,
+                    "account_count": row["account_count"],
+                    "total": row["total"],
+                }
+            )
+
+        net_worth = {"assets": assets, "liabilities": liabilities, "net_worth": assets - liabilities, "groups": groups}
+        # 계좌 잔액이 바뀌면 AccountListCache.patch_balance가 함께 지웁니다.
+        account_list_cache.set_net_worth(user.id, net_worth)
+        return net_worth
+
+
+class AccountBalanceView(APIView):
+    """
+    특정 일자 마감 기준 잔액(?date=) 또는 기간별 일자 잔액(?start=&end=)을 조회하는 API입니다.
+    거래내역은 읽지 않고 일자별 잔액 스냅샷만 읽습니다.
+    """
+
+    def get(self, request, *args, **kwargs):
+        serializer = AccountBalanceQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+        accounts = list(Account.objects.filter(user=request.user).order_by("id"))
+
+        if "date" in query:
+            balances = DailyBalanceSnapshot.objects.get_balances_at(accounts, query["date"])
+            return Response(
+                {
+                    "date": query["date"],
+                    "total_balance": sum(balances.values()),
+                    "accounts": [
+                        {"account": account_id, "balance": balance} for account_id, balance in balances.items()
+                    ],
+                }
+            )
+
+        start_balances = DailyBalanceSnapshot.objects.get_balances_at(accounts, query["start"] - timedelta(days=1))
+        snapshots = {account.id: [] for account in accounts}
+        for snapshot in DailyBalanceSnapshot.objects.filter(
+            account__in=accounts, date__range=[query["start"], query["end"]]
+        ).order_by("account_id", "date"):
+            snapshots[snapshot.account_id].append(
+                {
+                    "date": snapshot.date,
+                    "opening_balance": snapshot.opening_balance,
+                    "closing_balance": snapshot.closing_balance,
+                }
+            )
+
+        return Response(
+            {
+                "start": query["start"],
+                "end": query["end"],
+                "accounts": [
+                    {
+                        "account": account.id,
+                        "start_balance": start_balances[account.id],
+                        "snapshots": snapshots[account.id],
+                    }
+                    for account in accounts
+                ],
+            }
+        )
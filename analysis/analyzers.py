@@ -1,25 +1,31 @@
-import os
+import json
+from collections import defaultdict
+from functools import partial
 
-import matplotlib.font_manager as fm
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
 
+from analysis.breakdowns import SpendingBreakdown
+from analysis.comparisons import PeriodComparison
 from analysis.models import Analysis
 from analysis.utils import DateUtils
+from config.constants import SPENDING_BREAKDOWN_ABOUT
 from transactions.models import Transaction
 
 User = get_user_model()
 
-plt.rcParams["font.family"] = "AppleGothic"
+# 분석 종류별로 비교하는 두 기간 (DateUtils.get_period의 이름)
+COMPARISON_PERIODS = {
+    "WEEKLY": ("this_week", "last_week"),
+    "MONTHLY": ("this_month", "last_month"),
+}
 
 
 class SpendingAnalyzer(DateUtils):
-    def __init__(self, user_id):
+    def __init__(self, user_id=None, user=None):
         super().__init__()
-        self.user = User.objects.get(id=user_id)
+        self.user = user or User.objects.get(id=user_id)
         self.queryset = Transaction.objects.filter(account__user=self.user, trans_type="WITHDRAW")
 
     def get_this_week_transactions(self):
@@ -34,109 +40,205 @@ class SpendingAnalyzer(DateUtils):
     def get_last_month_transactions(self):
         return self.queryset.filter(trans_date__range=[self.get_last_month_start(), self.get_last_month_end()])
 
-    def analyze_total_spending(self, transactions):
-        # DataFrame으로 변환하여 분석
-        transactions_df = pd.DataFrame(list(transactions.values("trans_date", "trans_amount", "trans_type")))
-        # 소비 분석
-        spending_analysis = transactions_df.groupby("trans_type")["trans_amount"].sum()
-
-        return spending_analysis
-
-    def make_matplot_weekly_spending(self):
-        this_week_transactions = self.get_this_week_transactions()
-        last_week_transactions = self.get_last_week_transactions()
-        if this_week_transactions.count() == 0 or last_week_transactions.count() == 0:
-            raise ValueError("No enough transactions data available.")
-        this_weekly_spending_analysis = self.analyze_total_spending(this_week_transactions)
-        last_weekly_spending_analysis = self.analyze_total_spending(last_week_transactions)
-
-        categories = this_weekly_spending_analysis.index
-        this_week_values = this_weekly_spending_analysis.values
-        last_week_values = last_weekly_spending_analysis.reindex(categories, fill_value=0).values
-
-        fig, ax = plt.subplots()
-
-        # 막대 위치 설정
-        x = np.arange(len(categories))  # x 좌표
-        width = 0.4  # 막대 너비
-
-        # 막대 그래프 그리기
-        ax.bar(x - width / 2, this_week_values, width, color="green", alpha=0.7, label="이번 주")
-        ax.bar(x + width / 2, last_week_values, width, color="red", alpha=0.7, label="지난 주")
-
-        # 그래프 레이블 및 제목 설정
-        ax.set_ylabel("지출 금액")
-        ax.set_xlabel("주간별")
-        ax.set_title("지난 주 - 이번 주 주간 총 지출금액 비교")
-        ax.set_xticks(x)
-        ax.legend()
-
-        # 그래프의 레이아웃 자동 조정
-        plt.tight_layout()
-
-        plot_image = self.save_plot_image(plt, "weekly")
-
-        Analysis.objects.create(
-            user=self.user,
-            period_start=self.get_last_week_start(),
-            period_end=self.get_this_week_end(),
+    @staticmethod
+    def aggregate_total_spending(this_start, this_end, last_start, last_end, user_ids=None):
+        """
+        사용자별 이번 기간/지난 기간 총 지출금액을 {user_id: (이번 기간, 지난 기간)} 형태로 반환합니다.
+        한 번의 GROUP BY 쿼리로 모든 사용자의 합계를 함께 구합니다.
+        """
+        comparison = PeriodComparison((this_start, this_end), (last_start, last_end))
+        return {
+            row["user"]: (row["this_total"], row["last_total"])
+            for row in comparison.compare(("user",), user_ids=user_ids)
+        }
+
+    def compare_spending(self, this_period, last_period, dimensions=()):
+        """
+        DateUtils의 두 기간(this_week, last_month, this_year 등)의 지출금액을 dimensions 기준별로 비교합니다.
+        """
+        comparison = PeriodComparison(self.get_period(this_period), self.get_period(last_period))
+        return comparison.compare(dimensions, user_ids=[self.user.id])
+
+    @staticmethod
+    def get_periods(analysis_type):
+        """
+        분석 종류(WEEKLY, MONTHLY)에 맞는 (이번 기간 시작, 이번 기간 끝, 지난 기간 시작, 지난 기간 끝)을 반환합니다.
+        """
+        dates = DateUtils()
+        this_period, last_period = COMPARISON_PERIODS[analysis_type]
+        return (*dates.get_period(this_period), *dates.get_period(last_period))
+
+    @classmethod
+    def analyze_users(cls, analysis_type, totals):
+        """
+        미리 집계한 지출 합계({user_id: (이번 기간, 지난 기간)})로 사용자들의 분석 결과를 만듭니다.
+        사용자와 이미 저장된 같은 기간의 분석 결과는 한 번에 불러오고, 한 사용자의 분석이 실패해도 나머지 사용자는 계속 분석합니다.
+        """
+        _, this_end, last_start, _ = cls.get_periods(analysis_type)
+        saved_analyses = Analysis.objects.filter(
+            user=OuterRef("pk"),
             about="TOTAL_SPENDING",
-            type="WEEKLY",
-            result_image=plot_image,
+            type=analysis_type,
+            period_start=last_start.date(),
+            period_end=this_end.date(),
+        )
+        users = (
+            User.objects.filter(id__in=totals)
+            .annotate(
+                saved_analysis_id=Subquery(saved_analyses.values("id")),
+                saved_fingerprint=Subquery(saved_analyses.values("fingerprint")),
+                saved_result_image=Subquery(saved_analyses.values("result_image")),
+            )
+            .order_by("id")
         )
 
-    def make_matplot_monthly_spending(self):
-        this_monthly_spending_analysis = self.analyze_total_spending(self.get_this_month_transactions())
-        if this_monthly_spending_analysis.empty:
-            raise ValueError("No this_monthly_spending_analysis data available.")
+        succeeded = 0
+        unchanged = 0
+        failed = []
+        for user in users:
+            analyzer = cls(user=user)
+            saved = None
+            if user.saved_analysis_id:
+                saved = {
+                    "id": user.saved_analysis_id,
+                    "fingerprint": user.saved_fingerprint,
+                    "result_image": user.saved_result_image,
+                }
+            try:
+                if analysis_type == "WEEKLY":
+                    changed = analyzer.make_matplot_weekly_spending(totals[user.id], saved)
+                else:
+                    changed = analyzer.make_matplot_monthly_spending(totals[user.id], saved)
+            except Exception as e:
+                failed.append({"user": user.id, "error": str(e)})
+            else:
+                if changed:
+                    succeeded += 1
+                else:
+                    unchanged += 1
+        return {"succeeded": succeeded, "unchanged": unchanged, "failed": failed}
+
+    def make_matplot_weekly_spending(self, totals=None, saved=None):
+        """
+        주간 총 지출 분석 결과를 저장하고, 새로 만들거나 고쳤으면 True를 반환합니다.
+        totals(이번 주, 지난 주 합계)를 넘길 때는 이미 저장된 분석 결과(saved)도 함께 넘겨야 하며,
+        넘기지 않으면 둘 다 직접 조회합니다.
+        """
+        if totals is None:
+            (row,) = self.compare_spending(*COMPARISON_PERIODS["WEEKLY"])
+            totals = row["this_total"], row["last_total"]
+            saved = self.get_saved_analysis("WEEKLY")
+        this_week_total, last_week_total = totals
+        if not this_week_total or not last_week_total:
+            raise ValueError("No enough transactions data available.")
 
-        last_monthly_spending_analysis = self.analyze_total_spending(self.get_last_month_transactions())
-        if last_monthly_spending_analysis.empty:
+        return self.save_total_spending_analysis("WEEKLY", this_week_total, last_week_total, saved)
+
+    def make_matplot_monthly_spending(self, totals=None, saved=None):
+        """
+        월간 총 지출 분석 결과를 저장하고, 새로 만들거나 고쳤으면 True를 반환합니다. (totals, saved는 주간과 같습니다.)
+        """
+        if totals is None:
+            (row,) = self.compare_spending(*COMPARISON_PERIODS["MONTHLY"])
+            totals = row["this_total"], row["last_total"]
+            saved = self.get_saved_analysis("MONTHLY")
+        this_month_total, last_month_total = totals
+        if not this_month_total:
+            raise ValueError("No this_monthly_spending_analysis data available.")
+        if not last_month_total:
             raise ValueError("No last_monthly_spending_analysis data available.")
 
-        categories = this_monthly_spending_analysis.index
-        this_month_values = this_monthly_spending_analysis.values
-        last_month_values = last_monthly_spending_analysis.reindex(categories, fill_value=0).values
-
-        fig, ax = plt.subplots()
-
-        # 막대 위치 설정
-        x = np.arange(len(categories))  # x 좌표
-        width = 0.4  # 막대 너비
-
-        # 막대 그래프 그리기
-        ax.bar(x - width / 2, this_month_values, width, color="green", alpha=0.7, label="이번 달")
-        ax.bar(x + width / 2, last_month_values, width, color="red", alpha=0.7, label="지난 달")
-
-        # 그래프 레이블 및 제목 설정
-        ax.set_ylabel("지출 금액")
-        ax.set_xlabel("월별")
-        ax.set_title("저번 달 - 이번 달 월간 총 지출금액 비교")
-        ax.set_xticks(x)
-        ax.legend()
-
-        # 그래프의 레이아웃 자동 조정
-        plt.tight_layout()
-
-        plot_image = self.save_plot_image(plt, "monthly")
-
-        Analysis.objects.create(
-            user=self.user,
-            about="TOTAL_SPENDING",
-            period_start=self.get_last_month_start(),
-            period_end=self.get_this_month_end(),
-            type="MONTHLY",
-            result_image=plot_image,
+        return self.save_total_spending_analysis("MONTHLY", this_month_total, last_month_total, saved)
+
+    @classmethod
+    def analyze_breakdowns(cls, analysis_type, user_ids):
+        """
+        사용자들의 기준별 지출 분석(SPENDING_BREAKDOWN_ABOUT) 결과를 만듭니다.
+        사용자와 이미 저장된 분석 결과는 한 번에 불러오고, 지출 내역은 사용자마다 한 번만 읽습니다.
+        """
+        _, this_end, last_start, _ = cls.get_periods(analysis_type)
+        saved_analyses = defaultdict(dict)
+        for saved in Analysis.objects.filter(
+            user_id__in=user_ids,
+            about__in=SPENDING_BREAKDOWN_ABOUT,
+            type=analysis_type,
+            period_start=last_start.date(),
+            period_end=this_end.date(),
+        ).values("user_id", "about", "id", "fingerprint", "result_image"):
+            saved_analyses[saved["user_id"]][saved["about"]] = saved
+
+        succeeded = 0
+        unchanged = 0
+        failed = []
+        for user in User.objects.filter(id__in=user_ids).order_by("id"):
+            try:
+                changed = cls(user=user).make_breakdown_analyses(analysis_type, saved_analyses[user.id])
+            except Exception as e:
+                failed.append({"user": user.id, "error": str(e)})
+            else:
+                if changed:
+                    succeeded += 1
+                else:
+                    unchanged += 1
+        return {"succeeded": succeeded, "unchanged": unchanged, "failed": failed}
+
+    def make_breakdown_analyses(self, analysis_type, saved=None):
+        """
+        두 기간의 지출을 거래 방법별, 계좌별, 요일×시간대별, 사용처별로 나눠 분석 결과를 저장하고, 새로 만들거나 고친 개수를 반환합니다.
+        saved는 이미 저장된 분석 결과({about: 분석 결과})이며, 넘기지 않으면 직접 조회합니다.
+        """
+        if saved is None:
+            saved = {about: self.get_saved_analysis(analysis_type, about) for about in SPENDING_BREAKDOWN_ABOUT}
+        this_period, last_period = COMPARISON_PERIODS[analysis_type]
+        breakdowns = SpendingBreakdown(self.user, self.get_period(this_period), self.get_period(last_period)).compute()
+
+        changed = 0
+        for about, chart_data in breakdowns.items():
+            fingerprint = Analysis.make_fingerprint(json.dumps(chart_data, sort_keys=True, ensure_ascii=False))
+            changed += self.save_analysis(analysis_type, about, chart_data, fingerprint, saved.get(about))
+        return changed
+
+    def get_analysis_key(self, analysis_type, about="TOTAL_SPENDING"):
+        # 분석 결과는 (사용자, 분석 대상, 종류, 기간)마다 하나만 저장합니다.
+        _, this_end, last_start, _ = self.get_periods(analysis_type)
+        return {
+            "user": self.user,
+            "about": about,
+            "type": analysis_type,
+            "period_start": last_start.date(),
+            "period_end": this_end.date(),
+        }
+
+    def get_saved_analysis(self, analysis_type, about="TOTAL_SPENDING"):
+        return (
+            Analysis.objects.filter(**self.get_analysis_key(analysis_type, about))
+            .values("id", "fingerprint", "result_image")
+            .first()
         )
 
-    def save_plot_image(self, plot, prefix):
-        # 이미지 파일을 static 경로에 저장
-        today = self.today.strftime("%Y-%m-%d")
-        static_dir = os.path.join(settings.BASE_DIR, "media", f"analysis/total_spending/{today}")
-        os.makedirs(static_dir, exist_ok=True)
-
-        filename = f"{prefix}_total_spending_{self.user.id}.png"
-        filepath = os.path.join(static_dir, filename)
-        plot.savefig(filepath)
-
-        return filepath
+    def save_total_spending_analysis(self, analysis_type, this_total, last_total, saved):
+        chart_data = {"labels": ["총 지출"], "this_period": [this_total], "last_period": [last_total]}
+        fingerprint = Analysis.make_fingerprint(this_total, last_total)
+        return self.save_analysis(analysis_type, "TOTAL_SPENDING", chart_data, fingerprint, saved)
+
+    def save_analysis(self, analysis_type, about, chart_data, fingerprint, saved):
+        """
+        지문(fingerprint)이 저장된 분석 결과와 같으면 아무것도 하지 않고 False를 반환합니다.
+        다르면 그래프 데이터를 저장된 행에 그 자리에서 고치고, 저장된 행이 없을 때만 새로 만듭니다.
+        그래프 이미지는 여기서 그리지 않고 처음 요청될 때 그리므로, 바뀐 분석 결과의 이전 이미지는 지웁니다.
+        """
+        if saved and saved["fingerprint"] == fingerprint:
+            return False
+
+        analysis = Analysis(
+            **self.get_analysis_key(analysis_type, about), fingerprint=fingerprint, chart_data=chart_data
+        )
+        if not saved:
+            analysis.save()
+            return True
+
+        analysis.id = saved["id"]
+        analysis.save(update_fields=["fingerprint", "chart_data", "result_image", "updated_at"])
+        if saved["result_image"]:
+            transaction.on_commit(partial(Analysis.result_image.field.storage.delete, saved["result_image"]))
+        return True
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from datetime import datetime
+
+from django.db import connection
+
+from accounts.models import Account, mask_account_num
+from analysis.models import DailyMerchantRollup, DailySpendingRollup
+from config.constants import (
+    BANK_CODE_LABELS,
+    TRANSACTION_METHOD,
+    TRANSACTION_METHOD_LABELS,
+)
+
+WEEKDAY_LABELS = ["월", "화", "수", "목", "금", "토", "일"]
+TRANSACTION_METHOD_INDEX = {code: i for i, (code, _) in enumerate(TRANSACTION_METHOD)}
+
+# 기준마다 (계좌, 거래 방법, 요일×시간대) 합계를 GROUPING SETS로 한 번에 묶고, 상위 사용처를 UNION ALL로 붙입니다.
+# 행마다 첫 열이 어느 기준의 합계인지 나타내며, bigint의 SUM은 numeric이므로 다시 bigint로 돌려받습니다.
+BREAKDOWN_SQL = """
+SELECT CASE
+           WHEN GROUPING(spending.account_id) = 0 THEN 'account'
+           WHEN GROUPING(spending.trans_method) = 0 THEN 'method'
+           ELSE 'heatmap'
+       END,
+       spending.account_id, account.bank_code, account.account_num, spending.trans_method,
+       spending.weekday, spending.hour, NULL,
+       COALESCE(SUM(spending.total_amount) FILTER (WHERE spending.this_period), 0)::bigint,
+       COALESCE(SUM(spending.total_amount) FILTER (WHERE NOT spending.this_period), 0)::bigint
+FROM (
+    SELECT rollup.account_id, rollup.trans_method, rollup.hour, rollup.total_amount,
+           EXTRACT(ISODOW FROM rollup.date)::integer - 1 AS weekday,
+           rollup.date BETWEEN %(this_start)s AND %(this_end)s AS this_period
+    FROM {spending_table} rollup
+    WHERE rollup.user_id = %(user_id)s AND rollup.trans_type = 'WITHDRAW' AND rollup.transaction_count > 0
+      AND (rollup.date BETWEEN %(this_start)s AND %(this_end)s OR rollup.date BETWEEN %(last_start)s AND %(last_end)s)
+) spending
+JOIN {account_table} account ON account.id = spending.account_id
+GROUP BY GROUPING SETS (
+    (spending.account_id, account.bank_code, account.account_num),
+    (spending.trans_method),
+    (spending.weekday, spending.hour)
+)
+UNION ALL
+SELECT 'merchant', NULL, NULL, NULL, NULL, NULL, NULL, merchant.print_content, merchant.this_total, merchant.last_total
+FROM (
+    SELECT rollup.print_content,
+           SUM(rollup.total_amount) FILTER (WHERE rollup.date BETWEEN %(this_start)s AND %(this_end)s)::bigint
+               AS this_total,
+           COALESCE(SUM(rollup.total_amount) FILTER (WHERE rollup.date BETWEEN %(last_start)s AND %(last_end)s), 0)::bigint
+               AS last_total
+    FROM {merchant_table} rollup
+    WHERE rollup.user_id = %(user_id)s AND rollup.trans_type = 'WITHDRAW' AND rollup.transaction_count > 0
+      AND (rollup.date BETWEEN %(this_start)s AND %(this_end)s OR rollup.date BETWEEN %(last_start)s AND %(last_end)s)
+    GROUP BY rollup.print_content
+    HAVING SUM(rollup.total_amount) FILTER (WHERE rollup.date BETWEEN %(this_start)s AND %(this_end)s) > 0
+    ORDER BY this_total DESC, rollup.print_content
+    LIMIT %(top_merchants)s
+) merchant
+"""
+
+
+def as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+class SpendingBreakdown:
+    """
+    한 사용자의 두 기간 지출을 거래 방법별, 계좌(은행)별, 요일×시간대별, 사용처(print_content)별로 나눠 집계합니다.
+
+    거래내역 대신 일자별 거래 합계(DailySpendingRollup)와 사용처별 거래 합계(DailyMerchantRollup)를 읽고,
+    모든 기준의 합계를 DB에서 쿼리 한 번(GROUPING SETS)으로 구합니다.
+    받아오는 행은 계좌 수 + 거래 방법 수 + 7×24 + 상위 사용처 수를 넘지 않으므로, 비용은 거래 수가 아니라
+    기간 안의 합계 행 수에 비례합니다.
+    결과는 ANALYSIS_ABOUT 종류별 그래프 데이터({"labels", "this_period", "last_period"})입니다.
+    """
+
+    top_merchants = 10
+
+    def __init__(self, user, this_period, last_period):
+        self.user = user
+        self.this_period = this_period
+        self.last_period = last_period
+
+    def compute(self):
+        sql = BREAKDOWN_SQL.format(
+            spending_table=DailySpendingRollup._meta.db_table,
+            merchant_table=DailyMerchantRollup._meta.db_table,
+            account_table=Account._meta.db_table,
+        )
+        params = {
+            "user_id": self.user.id,
+            "this_start": as_date(self.this_period[0]),
+            "this_end": as_date(self.this_period[1]),
+            "last_start": as_date(self.last_period[0]),
+            "last_end": as_date(self.last_period[1]),
+            "top_merchants": self.top_merchants,
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        if not rows:
+            return {}
+
+        groups = defaultdict(list)
+        for dimension, *row in rows:
+            groups[dimension].append(row)
+
+        return {
+            "SPENDING_BY_METHOD": self.by_method(groups["method"]),
+            "SPENDING_BY_ACCOUNT": self.by_account(groups["account"]),
+            "SPENDING_HEATMAP": self.heatmap(groups["heatmap"]),
+            "TOP_MERCHANTS": self.by_merchant(groups["merchant"]),
+        }
+
+    @staticmethod
+    def to_chart_data(rows):
+        # rows: (라벨, 이번 기간 합계, 지난 기간 합계) 목록
+        labels, this_totals, last_totals = zip(*rows) if rows else ((), (), ())
+        return {"labels": list(labels), "this_period": list(this_totals), "last_period": list(last_totals)}
+
+    def by_method(self, rows):
+        # TRANSACTION_METHOD에 정의된 순서대로 보여주고, 정의되지 않은 거래 방법은 코드 그대로 맨 뒤에 둡니다.
+        rows = sorted(
+            ((method, this_total, last_total) for _, _, _, method, _, _, _, this_total, last_total in rows),
+            key=lambda row: (TRANSACTION_METHOD_INDEX.get(row[0], len(TRANSACTION_METHOD)), row[0]),
+        )
+        return self.to_chart_data(
+            [
+                (TRANSACTION_METHOD_LABELS.get(method, method), this_total, last_total)
+                for method, this_total, last_total in rows
+            ]
+        )
+
+    def by_account(self, rows):
+        # 이번 기간 지출이 많은 계좌부터 보여줍니다.
+        rows = sorted(rows, key=lambda row: (-row[7], -row[8], row[0]))
+        return self.to_chart_data(
+            [
+                (
+                    f"{BANK_CODE_LABELS.get(bank_code, bank_code)} {mask_account_num(account_num)}",
+                    this_total,
+                    last_total,
+                )
+                for _, bank_code, account_num, _, _, _, _, this_total, last_total in rows
+            ]
+        )
+
+    @staticmethod
+    def heatmap(rows):
+        totals = {"this_period": [[0] * 24 for _ in WEEKDAY_LABELS], "last_period": [[0] * 24 for _ in WEEKDAY_LABELS]}
+        for _, _, _, _, weekday, hour, _, this_total, last_total in rows:
+            totals["this_period"][weekday][hour] = this_total
+            totals["last_period"][weekday][hour] = last_total
+        return {"labels": WEEKDAY_LABELS, "columns": list(range(24)), **totals}
+
+    def by_merchant(self, rows):
+        # DB에서 이번 기간 지출이 많은 top_merchants 곳만 골라 받아오며, UNION ALL은 순서를 보장하지 않으므로 다시 정렬합니다.
+        rows = sorted(rows, key=lambda row: (-row[7], row[6]))
+        return self.to_chart_data([(content, this_total, last_total) for *_, content, this_total, last_total in rows])
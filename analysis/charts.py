@@ -0,0 +1,129 @@
+import threading
+from functools import cache
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+matplotlib.rcParams["font.family"] = "AppleGothic"
+
+# 차트 종류별 범례, x축 이름, 제목
+SPENDING_CHARTS = {
+    "weekly": {
+        "labels": ("이번 주", "지난 주"),
+        "xlabel": "주간별",
+        "title": "지난 주 - 이번 주 주간 총 지출금액 비교",
+    },
+    "monthly": {
+        "labels": ("이번 달", "지난 달"),
+        "xlabel": "월별",
+        "title": "저번 달 - 이번 달 월간 총 지출금액 비교",
+    },
+}
+
+
+class SpendingComparisonChart:
+    """
+    이번 기간/지난 기간 총 지출금액을 비교하는 막대 그래프 템플릿입니다.
+
+    pyplot의 전역 상태를 쓰지 않고 Agg 캔버스에 붙인 Figure를 직접 만듭니다.
+    차트 종류마다 한 번만 만들어 두고 막대 높이만 바꿔 다시 그리므로,
+    분석하는 사용자 수가 늘어도 워커 프로세스에 Figure가 쌓이지 않습니다.
+    """
+
+    width = 0.4  # 막대 너비
+
+    def __init__(self, labels, xlabel, title):
+        self.lock = threading.Lock()
+        self.figure = Figure(layout="tight")
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+
+        (self.this_bar,) = self.ax.bar(-self.width / 2, 0, self.width, color="green", alpha=0.7, label=labels[0])
+        (self.last_bar,) = self.ax.bar(self.width / 2, 0, self.width, color="red", alpha=0.7, label=labels[1])
+
+        self.ax.set_ylabel("지출 금액")
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_title(title)
+        self.ax.set_xticks([0])
+        self.ax.legend()
+
+    def render(self, this_total, last_total, output):
+        """
+        막대 높이를 바꿔 output(파일 경로 또는 파일 객체)에 PNG로 저장합니다.
+        같은 Figure를 함께 쓰므로 스레드 풀에서 실행되더라도 한 번에 하나씩만 그립니다.
+        """
+        with self.lock:
+            self.this_bar.set_height(this_total)
+            self.last_bar.set_height(last_total)
+            self.ax.relim()
+            self.ax.autoscale_view()
+            self.figure.savefig(output, format="png")
+
+
+@cache
+def get_spending_chart(chart_type):
+    return SpendingComparisonChart(**SPENDING_CHARTS[chart_type])
+
+
+def render_breakdown_chart(labels, chart_data, title, output):
+    """
+    기준값(거래 방법, 계좌, 사용처)별 이번 기간/지난 기간 지출금액을 묶은 막대 그래프로 그립니다.
+    기준값 수가 분석마다 달라 템플릿을 두지 않고 pyplot 없이 Figure를 그때그때 만듭니다.
+    """
+    figure = Figure(figsize=(max(6.4, len(chart_data["labels"]) * 0.8), 4.8), layout="tight")
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    positions = np.arange(len(chart_data["labels"]))
+    width = SpendingComparisonChart.width
+    ax.bar(positions - width / 2, chart_data["this_period"], width, color="green", alpha=0.7, label=labels[0])
+    ax.bar(positions + width / 2, chart_data["last_period"], width, color="red", alpha=0.7, label=labels[1])
+
+    ax.set_ylabel("지출 금액")
+    ax.set_title(title)
+    ax.set_xticks(positions, chart_data["labels"], rotation=30, ha="right")
+    ax.legend()
+    figure.savefig(output, format="png")
+
+
+def render_heatmap_chart(labels, chart_data, title, output):
+    """
+    요일×시간대별 지출금액을 이번 기간/지난 기간 히트맵 두 개로 그립니다.
+    두 기간을 같은 색 범위로 그려 바로 비교할 수 있게 합니다.
+    """
+    figure = Figure(figsize=(10, 6), layout="tight")
+    FigureCanvasAgg(figure)
+    figure.suptitle(title)
+
+    periods = (np.array(chart_data["this_period"]), np.array(chart_data["last_period"]))
+    vmax = max(max(period.max() for period in periods), 1)
+    for index, (label, totals) in enumerate(zip(labels, periods), start=1):
+        ax = figure.add_subplot(2, 1, index)
+        image = ax.imshow(totals, cmap="Reds", aspect="auto", vmin=0, vmax=vmax)
+        ax.set_title(label)
+        ax.set_yticks(range(len(chart_data["labels"])), chart_data["labels"])
+        ax.set_xticks(chart_data["columns"])
+        figure.colorbar(image, ax=ax)
+    figure.savefig(output, format="png")
+
+
+# 기준별 지출 분석(SPENDING_BREAKDOWN_ABOUT)의 그래프 제목과 그리는 함수
+BREAKDOWN_CHARTS = {
+    "SPENDING_BY_METHOD": ("거래 방법별 지출금액 비교", render_breakdown_chart),
+    "SPENDING_BY_ACCOUNT": ("계좌별 지출금액 비교", render_breakdown_chart),
+    "SPENDING_HEATMAP": ("요일/시간대별 지출금액", render_heatmap_chart),
+    "TOP_MERCHANTS": ("주요 사용처 지출금액 비교", render_breakdown_chart),
+}
+
+
+def render_chart_data(about, chart_type, chart_data, output):
+    """
+    분석 결과에 저장된 그래프 데이터(chart_data)로 그래프를 그려 output에 PNG로 저장합니다.
+    """
+    if about in BREAKDOWN_CHARTS:
+        title, render = BREAKDOWN_CHARTS[about]
+        render(SPENDING_CHARTS[chart_type]["labels"], chart_data, title, output)
+        return
+    get_spending_chart(chart_type).render(chart_data["this_period"][0], chart_data["last_period"][0], output)
@@ -0,0 +1,63 @@
+from django.db.models import Q, Sum
+
+from analysis.models import DailySpendingRollup
+
+# 비교 결과를 나눌 수 있는 기준과 그 기준에 해당하는 일자별 거래 합계(DailySpendingRollup)의 필드
+COMPARISON_DIMENSIONS = {
+    "user": "user",
+    "account": "account",
+    "bank_code": "account__bank_code",
+    "trans_type": "trans_type",
+    "trans_method": "trans_method",
+}
+
+
+class PeriodComparison:
+    """
+    두 기간의 거래 합계를 요청한 기준별로 나눠 비교합니다.
+
+    두 기간의 행을 한 번에 읽고 기간마다 조건부 Sum을 두므로, 기준이 몇 개이든 쿼리는 한 번만 실행됩니다.
+    거래내역 대신 일자별 거래 합계(DailySpendingRollup)를 읽으므로, 비용이 거래 수가 아니라 기간의 일수에 비례합니다.
+    기간은 DateUtils.get_period()가 반환하는 것과 같은 (시작, 끝)이면 되고, 두 기간이 이어져 있지 않아도 됩니다.
+    """
+
+    def __init__(self, this_period, last_period, trans_type="WITHDRAW"):
+        self.this_period = this_period
+        self.last_period = last_period
+        self.trans_type = trans_type  # None이면 입금/출금을 모두 합칩니다.
+
+    def compare(self, dimensions=("user",), user_ids=None):
+        """
+        기준별 두 기간의 합계를 [{기준: 값, ..., "this_total": 이번 기간, "last_total": 지난 기간}] 형태로 반환합니다.
+        기준이 없으면 전체 합계 한 줄을 반환합니다.
+        """
+        unknown = set(dimensions) - COMPARISON_DIMENSIONS.keys()
+        if unknown:
+            raise ValueError(f"Unknown comparison dimensions: {', '.join(sorted(unknown))}")
+
+        this_period = Q(date__range=self.this_period)
+        last_period = Q(date__range=self.last_period)
+
+        queryset = DailySpendingRollup.objects.filter(this_period | last_period)
+        if self.trans_type is not None:
+            queryset = queryset.filter(trans_type=self.trans_type)
+        if user_ids is not None:
+            queryset = queryset.filter(user_id__in=user_ids)
+
+        totals = {
+            "this_total": Sum("total_amount", filter=this_period, default=0),
+            "last_total": Sum("total_amount", filter=last_period, default=0),
+        }
+        if not dimensions:
+            return [queryset.aggregate(**totals)]
+
+        fields = [COMPARISON_DIMENSIONS[dimension] for dimension in dimensions]
+        rows = queryset.values(*fields).annotate(**totals).order_by(*fields)
+        return [
+            {
+                **{dimension: row[field] for dimension, field in zip(dimensions, fields)},
+                "this_total": row["this_total"],
+                "last_total": row["last_total"],
+            }
+            for row in rows
+        ]
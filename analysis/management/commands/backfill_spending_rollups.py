@@ -0,0 +1,74 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractHour
+
+from accounts.models import Account
+from analysis.models import DailyMerchantRollup, DailySpendingRollup
+from core.utils import run_in_chunks
+from transactions.models import Transaction
+
+User = get_user_model()
+
+# 합계 키 중 거래내역의 필드 이름이 다른 것
+ROLLUP_SOURCE_FIELDS = {"date": "trans_date"}
+
+
+def backfill_users(user_ids):
+    """
+    사용자 묶음의 일자별/사용처별 거래 합계를 거래내역으로부터 다시 만들고, (사용자 수, 만든 합계 수)를 반환합니다.
+    사용자들의 계좌 행을 잠가 두고 집계하므로, 그동안 들어오는 거래는 잠금이 풀린 뒤 새 합계에 더해집니다.
+    """
+    with transaction.atomic():
+        list(Account.objects.select_for_update().filter(user_id__in=user_ids).order_by("id").values_list("id"))
+        transactions = Transaction.objects.filter(account__user_id__in=user_ids).annotate(
+            hour=ExtractHour("trans_time")
+        )
+
+        rollups = 0
+        for model in (DailySpendingRollup, DailyMerchantRollup):
+            keys = ["account__user", "account", *model.rollup_key]
+            totals = (
+                transactions.values_list(*[ROLLUP_SOURCE_FIELDS.get(key, key) for key in keys])
+                .annotate(total=Sum("trans_amount"), count=Count("id"))
+                .order_by()
+            )
+            objs = [
+                model(
+                    user_id=user_id,
+                    account_id=account_id,
+                    **dict(zip(model.rollup_key, key)),
+                    total_amount=total,
+                    transaction_count=count,
+                )
+                for user_id, account_id, *key, total, count in totals
+            ]
+            model.objects.filter(user_id__in=user_ids).delete()
+            model.objects.bulk_create(objs, batch_size=1000)
+            rollups += len(objs)
+
+    return len(user_ids), rollups
+
+
+class Command(BaseCommand):
+    help = "Django command to rebuild daily spending rollups from transaction history"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="한 번에 처리할 사용자 수")
+        parser.add_argument("--workers", type=int, default=1, help="동시에 실행할 프로세스 수")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        user_ids = User.objects.order_by("id").values_list("id", flat=True)
+
+        total_users = total_rollups = 0
+        for users, rollups in run_in_chunks(backfill_users, user_ids, options["chunk_size"], options["workers"]):
+            total_users += users
+            total_rollups += rollups
+            self.stdout.write(f"{total_users} users, {total_rollups} rollups backfilled")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {total_rollups} rollups in {elapsed:.2f}s"))
@@ -0,0 +1,121 @@
+import time
+import tracemalloc
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import Account
+from analysis.analyzers import SpendingAnalyzer
+from analysis.management.commands.backfill_spending_rollups import backfill_users
+from transactions.models import Transaction
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Django command to compare latency/memory of the pandas round-trip and the rollup Sum for weekly spending"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--transactions", type=int, nargs="+", default=[100, 10000, 100000], help="사용자 한 명의 출금 거래 수"
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수 (가장 빠른 값을 사용합니다.)")
+
+    def handle(self, *args, **options):
+        for count in options["transactions"]:
+            # 벤치마크용 데이터는 측정이 끝나면 트랜잭션을 롤백해 남기지 않습니다.
+            try:
+                with transaction.atomic():
+                    self.run(count, options["repeat"])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def run(self, count, repeat):
+        user = User.objects.create_user(
+            email=f"benchmark-{time.time_ns()}@example.com",
+            password=None,
+            nickname="benchmark",
+            name="benchmark",
+            phone="000-0000-0000",
+        )
+        account = Account.objects.create(user=user, account_num=f"0000-00-{time.time_ns() % 10**7:07d}")
+        analyzer = SpendingAnalyzer(user=user)
+        periods = SpendingAnalyzer.get_periods("WEEKLY")
+
+        # 잔액 계산은 측정 대상이 아니므로 save()를 거치지 않고 지난 주~이번 주에 고르게 나눠 넣습니다.
+        now = datetime.now()
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    account=account,
+                    trans_amount=1000 + i % 50,
+                    after_balance=0,
+                    print_content="benchmark",
+                    trans_type="WITHDRAW",
+                    trans_method="CARD",
+                    trans_date=(periods[2] + (periods[1] - periods[2]) * (i / count)).date(),
+                    trans_time=now.time(),
+                )
+                for i in range(count)
+            ),
+            batch_size=5000,
+        )
+        # bulk_create는 일자별 거래 합계를 갱신하지 않으므로 한 번에 만들어 줍니다.
+        backfill_users([user.id])
+
+        pandas_elapsed, pandas_peak, pandas_totals = self.measure(
+            lambda: (
+                self.pandas_total_spending(analyzer.get_this_week_transactions()),
+                self.pandas_total_spending(analyzer.get_last_week_transactions()),
+            ),
+            repeat,
+        )
+        sum_elapsed, sum_peak, sum_totals = self.measure(
+            lambda: SpendingAnalyzer.aggregate_total_spending(*periods, user_ids=[user.id])[user.id], repeat
+        )
+
+        self.stdout.write(
+            f"transactions x {count}: "
+            f"pandas {pandas_elapsed * 1000:.1f}ms / {pandas_peak / 1024:,.0f}KB, "
+            f"rollup Sum {sum_elapsed * 1000:.1f}ms / {sum_peak / 1024:,.0f}KB "
+            f"({pandas_elapsed / sum_elapsed:.1f}x faster, {pandas_peak / max(sum_peak, 1):.1f}x less memory)"
+        )
+        if tuple(pandas_totals) != tuple(sum_totals):
+            self.stdout.write(self.style.ERROR(f"Totals differ: pandas {pandas_totals}, rollup Sum {sum_totals}"))
+
+    @staticmethod
+    def pandas_total_spending(transactions):
+        # 기존 analyze_total_spending과 같은 방식: 모든 행을 DataFrame으로 읽어 trans_type별 합계를 구합니다.
+        # pandas는 이 비교에만 쓰므로 실행할 때만 불러옵니다.
+        import pandas as pd
+
+        transactions_df = pd.DataFrame(list(transactions.values("trans_date", "trans_amount", "trans_type")))
+        if transactions_df.empty:
+            return 0
+        return int(transactions_df.groupby("trans_type")["trans_amount"].sum().sum())
+
+    @staticmethod
+    def measure(func, repeat):
+        """
+        (가장 빠른 실행 시간, 한 번 실행할 때 Python이 할당한 최대 메모리, 결과)를 반환합니다.
+        모듈 import 같은 첫 실행 비용이 섞이지 않도록 한 번 먼저 실행한 뒤 측정합니다.
+        """
+        func()
+        tracemalloc.start()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        elapsed = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed.append(time.perf_counter() - started)
+        return min(elapsed), peak, result
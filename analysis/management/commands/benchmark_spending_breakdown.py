@@ -0,0 +1,101 @@
+import time
+from datetime import time as dt_time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q, Sum
+
+from accounts.models import Account
+from analysis.analyzers import COMPARISON_PERIODS, SpendingAnalyzer
+from analysis.breakdowns import SpendingBreakdown
+from analysis.management.commands import benchmark_spending_analysis
+from analysis.management.commands.backfill_spending_rollups import backfill_users
+from analysis.models import DailyMerchantRollup, DailySpendingRollup
+from config.constants import TRANSACTION_METHOD
+from transactions.models import Transaction
+
+User = get_user_model()
+
+
+class Command(benchmark_spending_analysis.Command):
+    help = "Django command to compare the full spending breakdown with the single weekly spending total query"
+
+    accounts_per_user = 3
+    merchants = 500
+
+    def run(self, count, repeat):
+        user = User.objects.create_user(
+            email=f"benchmark-{time.time_ns()}@example.com",
+            password=None,
+            nickname="benchmark",
+            name="benchmark",
+            phone="000-0000-0000",
+        )
+        accounts = [
+            Account.objects.create(user=user, account_num=f"0000-{i:02d}-{time.time_ns() % 10**7:07d}")
+            for i in range(self.accounts_per_user)
+        ]
+        analyzer = SpendingAnalyzer(user=user)
+        periods = SpendingAnalyzer.get_periods("WEEKLY")
+        this_period, last_period = (analyzer.get_period(name) for name in COMPARISON_PERIODS["WEEKLY"])
+
+        # 기준마다 값이 고르게 나오도록 계좌, 거래 방법, 사용처, 시간을 돌려가며 지난 주~이번 주에 나눠 넣습니다.
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    account=accounts[i % len(accounts)],
+                    trans_amount=1000 + i % 50,
+                    after_balance=0,
+                    print_content=f"merchant-{i % self.merchants}",
+                    trans_type="WITHDRAW",
+                    trans_method=TRANSACTION_METHOD[i % len(TRANSACTION_METHOD)][0],
+                    trans_date=(periods[2] + (periods[1] - periods[2]) * (i / count)).date(),
+                    trans_time=dt_time(hour=i % 24, minute=i % 60),
+                )
+                for i in range(count)
+            ),
+            batch_size=5000,
+        )
+        backfill_users([user.id])
+        # 방금 넣은 행의 통계가 없으면 실제 운영 테이블과 다른 실행 계획이 나오므로 통계를 먼저 갱신합니다.
+        with connection.cursor() as cursor:
+            tables = (Account, Transaction, DailySpendingRollup, DailyMerchantRollup)
+            cursor.execute(f"ANALYZE {', '.join(model._meta.db_table for model in tables)}")
+
+        breakdown_elapsed, breakdown_peak, breakdowns = self.measure(
+            SpendingBreakdown(user, this_period, last_period).compute, repeat
+        )
+        # 지금 분석 작업이 쓰는 단일 합계 쿼리(일자별 거래 합계의 Sum)가 기준입니다.
+        total_elapsed, total_peak, totals = self.measure(
+            lambda: SpendingAnalyzer.aggregate_total_spending(*periods, user_ids=[user.id])[user.id], repeat
+        )
+        # 참고용: 같은 기간의 거래 행을 DB에서 바로 더하는 쿼리
+        scan_elapsed, _, scan_totals = self.measure(
+            lambda: self.transaction_total_spending(user, this_period, last_period), repeat
+        )
+
+        # 두 쿼리 모두 기간 안의 일자별 합계 행을 읽으므로, 거래 수가 늘어도 비율이 크게 변하지 않는지 봅니다.
+        self.stdout.write(
+            f"transactions x {count}: "
+            f"breakdown {breakdown_elapsed * 1000:.1f}ms / {breakdown_peak / 1024:,.0f}KB, "
+            f"rollup total {total_elapsed * 1000:.1f}ms / {total_peak / 1024:,.0f}KB "
+            f"({breakdown_elapsed / total_elapsed:.2f}x the single-total query), "
+            f"transaction Sum {scan_elapsed * 1000:.1f}ms"
+        )
+
+        # 거래 방법별 합계를 더하면 두 기간의 총 지출과 같아야 합니다.
+        by_method = breakdowns["SPENDING_BY_METHOD"]
+        breakdown_totals = (sum(by_method["this_period"]), sum(by_method["last_period"]))
+        if not breakdown_totals == tuple(totals) == scan_totals:
+            self.stdout.write(
+                self.style.ERROR(f"Totals differ: breakdown {breakdown_totals}, rollup {totals}, Sum {scan_totals}")
+            )
+
+    @staticmethod
+    def transaction_total_spending(user, this_period, last_period):
+        # 일자별 합계 없이 같은 거래 행을 DB에서 바로 더하는 단일 합계 쿼리입니다.
+        totals = Transaction.objects.filter(account__user=user, trans_type="WITHDRAW").aggregate(
+            this_total=Sum("trans_amount", filter=Q(trans_date__range=this_period), default=0),
+            last_total=Sum("trans_amount", filter=Q(trans_date__range=last_period), default=0),
+        )
+        return totals["this_total"], totals["last_total"]
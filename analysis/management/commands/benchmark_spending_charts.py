@@ -0,0 +1,57 @@
+import io
+import os
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.charts import SPENDING_CHARTS, get_spending_chart
+
+
+class Command(BaseCommand):
+    help = "Django command to render many spending charts and check that the worker's current RSS stays flat"
+
+    warm_up = 20
+
+    def add_arguments(self, parser):
+        parser.add_argument("--renders", type=int, default=10000, help="그릴 차트 수")
+        parser.add_argument("--chart-type", choices=list(SPENDING_CHARTS), default="monthly", help="차트 종류")
+        parser.add_argument("--report-every", type=int, default=1000, help="RSS를 출력할 간격 (차트 수)")
+        parser.add_argument("--max-growth", type=float, default=10, help="허용하는 RSS 증가량 (MB)")
+
+    def handle(self, *args, **options):
+        if not os.path.exists("/proc/self/statm"):
+            raise CommandError("현재 RSS는 /proc/self/statm에서 읽으므로 Linux에서만 측정할 수 있습니다.")
+
+        chart = get_spending_chart(options["chart_type"])
+        # 폰트, 글자 배치 캐시가 채워지도록 먼저 몇 장 그린 뒤의 RSS를 기준으로 합니다.
+        for i in range(self.warm_up):
+            chart.render(1000 * (i + 1), 500 * (i + 1), io.BytesIO())
+        baseline = self.current_rss()
+
+        started = time.perf_counter()
+        for i in range(1, options["renders"] + 1):
+            chart.render(random.randint(10, 10**9), random.randint(10, 10**9), io.BytesIO())
+            if i % options["report_every"] == 0:
+                self.stdout.write(f"renders x {i}: RSS {self.current_rss() / 1024**2:,.1f}MB")
+        elapsed = time.perf_counter() - started
+
+        growth = (self.current_rss() - baseline) / 1024**2
+        style = self.style.SUCCESS if growth <= options["max_growth"] else self.style.ERROR
+        self.stdout.write(
+            style(
+                f"{options['chart_type']} chart x {options['renders']}: "
+                f"{elapsed / max(options['renders'], 1) * 1000:.1f}ms per chart, "
+                f"RSS {baseline / 1024**2:,.1f}MB -> {self.current_rss() / 1024**2:,.1f}MB ({growth:+.1f}MB)"
+            )
+        )
+
+    @staticmethod
+    def current_rss():
+        """
+        현재 RSS(바이트)를 반환합니다.
+        ru_maxrss는 프로세스가 지금까지 쓴 최대값이라 늘어난 메모리가 해제되었는지 알 수 없으므로 쓰지 않습니다.
+        """
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
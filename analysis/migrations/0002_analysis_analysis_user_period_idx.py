@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="analysis",
+            index=models.Index(fields=["user", "type", "period_start"], name="analysis_user_period_idx"),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0002_analysis_analysis_user_period_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySpendingRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("trans_type", models.CharField(choices=[("DEPOSIT", "입금"), ("WITHDRAW", "출금")], max_length=20)),
+                (
+                    "trans_method",
+                    models.CharField(
+                        choices=[
+                            ("ATM", "ATM 거래"),
+                            ("TRANSFER", "계좌이체"),
+                            ("AUTOMATIC_TRANSFER", "자동이체"),
+                            ("CARD", "카드결제"),
+                            ("INTEREST", "이자"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("total_amount", models.BigIntegerField(default=0)),
+                ("transaction_count", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="spending_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "date", "trans_type", "trans_method"), name="unique_user_daily_spending_rollup"
+                    )
+                ],
+            },
+        ),
+    ]
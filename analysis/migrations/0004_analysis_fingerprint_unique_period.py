@@ -0,0 +1,43 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:54
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def remove_duplicate_analyses(apps, schema_editor):
+    # 같은 사용자/분석 대상/종류/기간의 분석 결과는 가장 최근에 만든 것만 남깁니다.
+    Analysis = apps.get_model("analysis", "Analysis")
+    latest_ids = (
+        Analysis.objects.values("user", "about", "type", "period_start", "period_end")
+        .annotate(latest_id=Max("id"))
+        .values("latest_id")
+    )
+    Analysis.objects.exclude(id__in=latest_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0003_dailyspendingrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysis",
+            name="fingerprint",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.RunPython(remove_duplicate_analyses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="analysis",
+            constraint=models.UniqueConstraint(
+                fields=("user", "type", "period_start", "period_end", "about"), name="unique_user_analysis_period"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="analysis",
+            name="analysis_user_period_idx",
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0004_analysis_fingerprint_unique_period"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysis",
+            name="chart_data",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0005_analysis_chart_data"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="analysis",
+            name="about",
+            field=models.CharField(
+                choices=[
+                    ("TOTAL_SPENDING", "총 지출"),
+                    ("TOTAL_INCOME", "총 수입"),
+                    ("SPENDING_BY_METHOD", "거래 방법별 지출"),
+                    ("SPENDING_BY_ACCOUNT", "계좌별 지출"),
+                    ("SPENDING_HEATMAP", "요일/시간대별 지출"),
+                    ("TOP_MERCHANTS", "주요 사용처"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
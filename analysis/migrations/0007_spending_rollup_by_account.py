@@ -0,0 +1,118 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractHour
+
+
+def clear_spending_rollups(apps, schema_editor):
+    # 기존 합계는 계좌/시간대로 나눌 수 없으므로 지우고, 컬럼을 추가한 뒤 거래내역으로부터 다시 만듭니다.
+    apps.get_model("analysis", "DailySpendingRollup").objects.all().delete()
+
+
+def rebuild_rollups(apps, schema_editor):
+    Transaction = apps.get_model("transactions", "Transaction")
+    transactions = Transaction.objects.annotate(hour=ExtractHour("trans_time"))
+    for model_name, keys in (
+        ("DailySpendingRollup", ("trans_date", "hour", "trans_type", "trans_method")),
+        ("DailyMerchantRollup", ("trans_date", "trans_type", "print_content")),
+    ):
+        model = apps.get_model("analysis", model_name)
+        fields = [field.replace("trans_date", "date") for field in keys]
+        totals = (
+            transactions.values_list("account__user", "account", *keys)
+            .annotate(total=Sum("trans_amount"), count=Count("id"))
+            .order_by()
+        )
+        model.objects.bulk_create(
+            (
+                model(
+                    user_id=user_id,
+                    account_id=account_id,
+                    **dict(zip(fields, key)),
+                    total_amount=total,
+                    transaction_count=count,
+                )
+                for user_id, account_id, *key, total, count in totals.iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_accountstatement"),
+        ("analysis", "0006_analysis_breakdown_about"),
+        ("transactions", "0007_idempotencykey"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_spending_rollups, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="DailyMerchantRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("trans_type", models.CharField(choices=[("DEPOSIT", "입금"), ("WITHDRAW", "출금")], max_length=20)),
+                ("print_content", models.CharField(max_length=100)),
+                ("total_amount", models.BigIntegerField(default=0)),
+                ("transaction_count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name="dailyspendingrollup",
+            name="unique_user_daily_spending_rollup",
+        ),
+        migrations.AddField(
+            model_name="dailyspendingrollup",
+            name="account",
+            field=models.ForeignKey(
+                default=0,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="spending_rollups",
+                to="accounts.account",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="dailyspendingrollup",
+            name="hour",
+            field=models.PositiveSmallIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddConstraint(
+            model_name="dailyspendingrollup",
+            constraint=models.UniqueConstraint(
+                fields=("user", "date", "account", "hour", "trans_type", "trans_method"),
+                name="unique_account_daily_spending_rollup",
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailymerchantrollup",
+            name="account",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, related_name="merchant_rollups", to="accounts.account"
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailymerchantrollup",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="merchant_rollups",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailymerchantrollup",
+            constraint=models.UniqueConstraint(
+                fields=("user", "date", "account", "trans_type", "print_content"),
+                name="unique_account_daily_merchant_rollup",
+            ),
+        ),
+        migrations.RunPython(rebuild_rollups, migrations.RunPython.noop),
+    ]
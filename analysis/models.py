@@ -1,6 +1,14 @@
-from django.db import models
+import hashlib
 
-from config.constants import ANALYSIS_ABOUT, ANALYSIS_TYPES
+from django.db import connection, models
+
+from accounts.models import Account
+from config.constants import (
+    ANALYSIS_ABOUT,
+    ANALYSIS_TYPES,
+    TRANSACTION_METHOD,
+    TRANSACTION_TYPE,
+)
 
 
 class Analysis(models.Model):
@@ -10,9 +18,126 @@ class Analysis(models.Model):
     period_start = models.DateField()
     period_end = models.DateField()
     description = models.TextField()
+    # 그래프를 그리는 데 쓰는 값 ({"labels": [...], "this_period": [...], "last_period": [...]})
+    chart_data = models.JSONField(default=dict, blank=True)
+    # 그래프 이미지는 처음 요청될 때 chart_data로 그려 저장합니다. (AnalysisImageView)
     result_image = models.ImageField(upload_to="analysis/", null=True, blank=True, max_length=255)
+    fingerprint = models.CharField(
+        max_length=64, blank=True
+    )  # 분석에 사용한 데이터의 지문 (같으면 다시 만들지 않습니다.)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # (user, type, period_start)로 시작하므로 사용자의 기간별 분석 결과 조회에도 이 인덱스를 사용합니다.
+            models.UniqueConstraint(
+                fields=["user", "type", "period_start", "period_end", "about"], name="unique_user_analysis_period"
+            ),
+        ]
+
+    @staticmethod
+    def make_fingerprint(*values):
+        return hashlib.sha256(":".join(map(str, values)).encode()).hexdigest()
+
     def __str__(self):
         return f"{self.period_start.strftime('%Y-%m-%d')} ~ {self.period_end.strftime('%Y-%m-%d')} 기간의 {self.get_type_display()} {self.get_about_display()} 분석 결과"
+
+
+class SpendingRollupManager(models.Manager):
+    def record(self, account_id, deltas):
+        """
+        account_id 계좌의 합계에 변동분을 더합니다.
+        deltas는 (모델의 rollup_key 순서의 값..., 금액 변동분, 건수 변동분) 목록이며, 같은 키는 합쳐서 반영합니다.
+        INSERT ... ON CONFLICT DO UPDATE 한 번으로 처리하므로 동시에 여러 거래가 들어와도 변동분이 유실되지 않습니다.
+        """
+        merged = {}
+        for *key, amount, count in deltas:
+            total = merged.get(tuple(key), (0, 0))
+            merged[tuple(key)] = (total[0] + amount, total[1] + count)
+        rows = [(*key, amount, count) for key, (amount, count) in merged.items() if amount or count]
+        if not rows:
+            return
+
+        table = self.model._meta.db_table
+        account_table = Account._meta.db_table
+        key_columns = ", ".join(self.model._meta.get_field(name).column for name in self.model.rollup_key)
+        values = ", ".join([f"({', '.join(['%s'] * len(rows[0]))})"] * len(rows))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (user_id, account_id, {key_columns}, total_amount, transaction_count)
+                SELECT account.user_id, account.id, delta.*
+                FROM {account_table} account, (VALUES {values}) AS delta
+                WHERE account.id = %s
+                ON CONFLICT (user_id, account_id, {key_columns}) DO UPDATE
+                SET total_amount = {table}.total_amount + EXCLUDED.total_amount,
+                    transaction_count = {table}.transaction_count + EXCLUDED.transaction_count
+                """,
+                [value for row in rows for value in row] + [account_id],
+            )
+
+
+class DailySpendingRollup(models.Model):
+    """
+    계좌의 일자/시간대/거래 유형/거래 방법별 거래 합계와 건수입니다.
+    거래가 등록/수정/삭제될 때마다 변동분만 더해 최신 상태로 유지하므로,
+    기간 분석은 거래내역 대신 이 테이블을 읽어 거래 수가 아니라 기간의 일수에 비례하는 비용으로 끝납니다.
+    계좌를 지우면 거래내역과 함께 이 합계도 지워집니다.
+    """
+
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="spending_rollups")
+    account = models.ForeignKey("accounts.Account", on_delete=models.CASCADE, related_name="spending_rollups")
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    trans_type = models.CharField(choices=TRANSACTION_TYPE, max_length=20)
+    trans_method = models.CharField(choices=TRANSACTION_METHOD, max_length=20)
+    total_amount = models.BigIntegerField(default=0)
+    transaction_count = models.IntegerField(default=0)
+
+    objects = SpendingRollupManager()
+
+    # 합계를 나누는 키 (user, account 다음 순서이며, 변동분도 이 순서로 넘깁니다.)
+    rollup_key = ("date", "hour", "trans_type", "trans_method")
+
+    class Meta:
+        constraints = [
+            # (user, date)로 시작하므로 사용자의 기간별 합계 조회에도 이 인덱스를 사용합니다.
+            models.UniqueConstraint(
+                fields=["user", "date", "account", "hour", "trans_type", "trans_method"],
+                name="unique_account_daily_spending_rollup",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date.strftime('%Y-%m-%d')} {self.hour}시 {self.get_trans_type_display()}({self.get_trans_method_display()}) {self.total_amount}원"
+
+
+class DailyMerchantRollup(models.Model):
+    """
+    계좌의 일자/거래 유형/사용처(print_content)별 거래 합계와 건수입니다. (주요 사용처 분석에 사용합니다.)
+    DailySpendingRollup과 같은 방식으로 거래가 바뀔 때마다 변동분만 더합니다.
+    """
+
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="merchant_rollups")
+    account = models.ForeignKey("accounts.Account", on_delete=models.CASCADE, related_name="merchant_rollups")
+    date = models.DateField()
+    trans_type = models.CharField(choices=TRANSACTION_TYPE, max_length=20)
+    print_content = models.CharField(max_length=100)
+    total_amount = models.BigIntegerField(default=0)
+    transaction_count = models.IntegerField(default=0)
+
+    objects = SpendingRollupManager()
+
+    rollup_key = ("date", "trans_type", "print_content")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "date", "account", "trans_type", "print_content"],
+                name="unique_account_daily_merchant_rollup",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date.strftime('%Y-%m-%d')} {self.print_content} {self.get_trans_type_display()} {self.total_amount}원"
@@ -1,9 +1,31 @@
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 
 from analysis.models import Analysis
 
 
 class AnalysisSerializer(serializers.ModelSerializer):
+    """
+    분석 결과 시리얼라이저입니다. 클라이언트가 직접 그래프를 그릴 수 있도록 그래프 데이터(chart_data)를 그대로 보내고,
+    이미지는 필요할 때만 받아갈 수 있도록 이미지 API 주소만 알려줍니다.
+    """
+
+    image = serializers.SerializerMethodField()
+
     class Meta:
         model = Analysis
-        fields = "__all__"
+        fields = (
+            "id",
+            "about",
+            "type",
+            "period_start",
+            "period_end",
+            "description",
+            "chart_data",
+            "image",
+            "created_at",
+            "updated_at",
+        )
+
+    def get_image(self, obj):
+        return reverse("analysis-image", kwargs={"pk": obj.pk}, request=self.context.get("request"))
@@ -1,25 +1,85 @@
-from celery import shared_task
-from django.contrib.auth import get_user_model
+from celery import chord, group, shared_task
 
 from analysis.analyzers import SpendingAnalyzer
+from core.utils import split_chunks
 
-User = get_user_model()
 Analyzer = SpendingAnalyzer
 
 
+def dispatch_analysis(analysis_type, chunk_size):
+    """
+    모든 사용자의 지출 합계를 한 번에 집계한 뒤, 사용자를 chunk_size 명씩 나눠 여러 워커에서 동시에 분석합니다.
+    묶음별 결과는 마지막에 summarize_analysis에서 모아 성공/변경 없음/건너뜀/실패 건수로 정리하며, 그 작업의 결과를 반환합니다.
+    """
+    totals = Analyzer.aggregate_total_spending(*Analyzer.get_periods(analysis_type))
+    # 두 기간 모두 지출이 있는 사용자만 비교할 수 있습니다.
+    targets = sorted(
+        [user_id, this_total, last_total]
+        for user_id, (this_total, last_total) in totals.items()
+        if this_total and last_total
+    )
+    skipped = len(totals) - len(targets)
+
+    chunks = split_chunks(targets, chunk_size)
+    if not chunks:
+        return summarize_analysis.delay([], analysis_type, skipped)
+    return chord(group(analyze_users_chunk.s(analysis_type, chunk) for chunk in chunks))(
+        summarize_analysis.s(analysis_type, skipped)
+    )
+
+
 @shared_task
-def weekly_analyze_and_notify_user():
-    users = User.objects.all()
+def analyze_users_chunk(analysis_type, targets):
+    # 작업 인자는 JSON으로 전달되므로 [user_id, 이번 기간 합계, 지난 기간 합계] 목록으로 받습니다.
+    totals = {user_id: (this_total, last_total) for user_id, this_total, last_total in targets}
+    return Analyzer.analyze_users(analysis_type, totals)
+
+
+def dispatch_breakdown_analysis(analysis_type, chunk_size):
+    """
+    두 기간 중 한 번이라도 지출이 있는 사용자의 기준별 지출 분석을 chunk_size 명씩 나눠 여러 워커에서 동시에 만듭니다.
+    """
+    user_ids = sorted(Analyzer.aggregate_total_spending(*Analyzer.get_periods(analysis_type)))
 
-    for user in users:
-        analyzer = Analyzer(user.id)
-        analyzer.make_matplot_weekly_spending()
+    chunks = split_chunks(user_ids, chunk_size)
+    if not chunks:
+        return summarize_analysis.delay([], analysis_type, 0)
+    return chord(group(analyze_breakdowns_chunk.s(analysis_type, chunk) for chunk in chunks))(
+        summarize_analysis.s(analysis_type, 0)
+    )
 
 
 @shared_task
-def monthly_analyze_and_notify_user():
-    users = User.objects.all()
+def analyze_breakdowns_chunk(analysis_type, user_ids):
+    return Analyzer.analyze_breakdowns(analysis_type, user_ids)
 
-    for user in users:
-        analyzer = Analyzer(user.id)
-        analyzer.make_matplot_monthly_spending()
+
+@shared_task
+def summarize_analysis(results, analysis_type, skipped):
+    return {
+        "type": analysis_type,
+        "succeeded": sum(result["succeeded"] for result in results),
+        "unchanged": sum(result["unchanged"] for result in results),
+        "skipped": skipped,
+        "failed": [failure for result in results for failure in result["failed"]],
+    }
+
+
+@shared_task
+def weekly_analyze_and_notify_user(chunk_size=200):
+    return dispatch_analysis("WEEKLY", chunk_size).id
+
+
+@shared_task
+def monthly_analyze_and_notify_user(chunk_size=200):
+    return dispatch_analysis("MONTHLY", chunk_size).id
+
+
+@shared_task
+def weekly_analyze_spending_breakdown(chunk_size=200):
+    return dispatch_breakdown_analysis("WEEKLY", chunk_size).id
+
+
+@shared_task
+def monthly_analyze_spending_breakdown(chunk_size=200):
+    return dispatch_breakdown_analysis("MONTHLY", chunk_size).id
@@ -1,15 +1,37 @@
+import io
+import os
 import random
-from datetime import datetime, timedelta
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
 
+import matplotlib.pyplot as plt
+import numpy as np
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractHour
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 
 from accounts.models import Account
 from analysis.analyzers import SpendingAnalyzer
-from analysis.models import Analysis
+from analysis.breakdowns import WEEKDAY_LABELS, SpendingBreakdown
+from analysis.charts import get_spending_chart
+from analysis.comparisons import PeriodComparison
+from analysis.management.commands.backfill_spending_rollups import backfill_users
+from analysis.models import Analysis, DailyMerchantRollup, DailySpendingRollup
+from analysis.tasks import dispatch_analysis, dispatch_breakdown_analysis
 from analysis.utils import DateUtils
+from config import celery_app
+from config.constants import SPENDING_BREAKDOWN_ABOUT
+from notifications.models import Notification
+from transactions.importers import TransactionBulkImporter
 from transactions.models import Transaction
 
 User = get_user_model()
@@ -87,9 +109,602 @@ class SpendingAnalyzerTestCase(TestCase):
             "Monthly spending analysis was not saved in the database.",
         )
 
+    def test_rerun_keeps_one_analysis_per_period(self):
+        for trans_date in (datetime_utils.get_last_week_start(), datetime_utils.get_this_week_start()):
+            Transaction.objects.create(
+                account_id=self.account.id,
+                trans_amount=10000,
+                print_content="출금",
+                trans_type="WITHDRAW",
+                trans_method="CARD",
+                trans_date=trans_date.date(),
+                trans_time=datetime_utils.today.time(),
+            )
+
+        self.assertTrue(self.analyzer.make_matplot_weekly_spending())
+        # 합계 조회 1번 + 저장된 분석 결과 조회 1번으로 끝납니다.
+        with self.assertNumQueries(2):
+            self.assertFalse(self.analyzer.make_matplot_weekly_spending())
+
+        self.assertEqual(Analysis.objects.filter(user=self.user, type="WEEKLY").count(), 1)
+
+
+class SpendingBatchAnalysisTestCase(TestCase):
+    def setUp(self):
+        # 브로커 없이 chord를 현재 프로세스에서 바로 실행합니다.
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+        self.users = []
+        for i in range(4):
+            user = get_user_model().objects.create_user(
+                email=f"test{i}@example.com",
+                password="testpassword1234",
+                nickname=f"testuser{i}",
+                name="홍길동",
+                phone="010-1111-2222",
+            )
+            account = Account.objects.create(user_id=user.id, account_num=f"3333-54-000000{i}", balance=1000000)
+            trans_dates = [datetime_utils.get_this_week_start(), datetime_utils.get_this_week_start()]
+            # 마지막 사용자는 지난주 지출이 없어 비교 분석 대상이 아닙니다.
+            if i < 3:
+                trans_dates.append(datetime_utils.get_last_week_start())
+            for trans_date in trans_dates:
+                Transaction.objects.create(
+                    account_id=account.id,
+                    trans_amount=10000 * (i + 1),
+                    print_content="출금",
+                    trans_type="WITHDRAW",
+                    trans_method="CARD",
+                    trans_date=trans_date.date(),
+                    trans_time=datetime_utils.today.time(),
+                )
+            self.users.append(user)
+
+    def test_aggregate_total_spending(self):
+        totals = SpendingAnalyzer.aggregate_total_spending(
+            datetime_utils.get_this_week_start(),
+            datetime_utils.get_this_week_end(),
+            datetime_utils.get_last_week_start(),
+            datetime_utils.get_last_week_end(),
+        )
+
+        self.assertEqual(
+            totals,
+            {
+                self.users[0].id: (20000, 10000),
+                self.users[1].id: (40000, 20000),
+                self.users[2].id: (60000, 30000),
+                self.users[3].id: (80000, 0),
+            },
+        )
+
+    def test_dispatch_analysis_reads_in_constant_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            summary = dispatch_analysis("WEEKLY", chunk_size=2).get()
+
+        self.assertEqual(summary, {"type": "WEEKLY", "succeeded": 3, "unchanged": 0, "skipped": 1, "failed": []})
+        self.assertEqual(Analysis.objects.filter(type="WEEKLY").count(), 3)
+        self.assertFalse(Analysis.objects.filter(user=self.users[3]).exists())
+        # 사용자별로는 분석 결과 저장(과 알림 생성)만 실행되고, 조회는 집계 1번 + 사용자 묶음마다 1번뿐입니다.
+        selects = [query for query in queries.captured_queries if query["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), 3)
+
+    def test_rerun_without_changes_is_a_no_op(self):
+        dispatch_analysis("WEEKLY", chunk_size=2).get()
+        analyses = {analysis.user_id: analysis for analysis in Analysis.objects.all()}
+        notification_count = Notification.objects.count()
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = dispatch_analysis("WEEKLY", chunk_size=2).get()
+
+        self.assertEqual(summary, {"type": "WEEKLY", "succeeded": 0, "unchanged": 3, "skipped": 1, "failed": []})
+        # 집계 1번 + 사용자 묶음마다 1번 조회만 하고, 그래프를 다시 그리거나 저장하지 않습니다.
+        self.assertEqual([query["sql"].split()[0] for query in queries.captured_queries], ["SELECT"] * 3)
+        self.assertEqual(Notification.objects.count(), notification_count)
+
+        Transaction.objects.create(
+            account=self.users[0].accounts.get(),
+            trans_amount=5000,
+            print_content="추가 출금",
+            trans_type="WITHDRAW",
+            trans_method="CARD",
+            trans_date=datetime_utils.get_this_week_start().date(),
+            trans_time=datetime_utils.today.time(),
+        )
+        summary = dispatch_analysis("WEEKLY", chunk_size=2).get()
+
+        self.assertEqual(summary, {"type": "WEEKLY", "succeeded": 1, "unchanged": 2, "skipped": 1, "failed": []})
+        # 데이터가 바뀐 사용자의 분석 결과만 그 자리에서 고쳐집니다.
+        self.assertEqual(Analysis.objects.count(), 3)
+        updated = Analysis.objects.get(user=self.users[0])
+        self.assertEqual(updated.id, analyses[self.users[0].id].id)
+        self.assertNotEqual(updated.fingerprint, analyses[self.users[0].id].fingerprint)
+        self.assertEqual(Analysis.objects.get(user=self.users[1]).updated_at, analyses[self.users[1].id].updated_at)
+        self.assertEqual(Notification.objects.count(), notification_count + 1)
+
+    def test_dispatch_breakdown_analysis_saves_each_about_once(self):
+        summary = dispatch_breakdown_analysis("WEEKLY", chunk_size=2).get()
+
+        self.assertEqual(summary, {"type": "WEEKLY", "succeeded": 4, "unchanged": 0, "skipped": 0, "failed": []})
+        self.assertEqual(
+            Analysis.objects.filter(user=self.users[0], type="WEEKLY").get(about="SPENDING_BY_METHOD").chart_data,
+            {"labels": ["카드결제"], "this_period": [20000], "last_period": [10000]},
+        )
+        for user in self.users:
+            self.assertCountEqual(
+                Analysis.objects.filter(user=user).values_list("about", flat=True), SPENDING_BREAKDOWN_ABOUT
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = dispatch_breakdown_analysis("WEEKLY", chunk_size=2).get()
+
+        self.assertEqual(summary, {"type": "WEEKLY", "succeeded": 0, "unchanged": 4, "skipped": 0, "failed": []})
+        self.assertEqual({query["sql"].split()[0] for query in queries.captured_queries}, {"SELECT"})
+        self.assertEqual(Analysis.objects.count(), 4 * len(SPENDING_BREAKDOWN_ABOUT))
+
+    def test_failed_user_does_not_abort_other_users(self):
+        totals = {user.id: (10000, 0 if i == 1 else 10000) for i, user in enumerate(self.users[:3])}
+
+        result = SpendingAnalyzer.analyze_users("WEEKLY", totals)
+
+        self.assertEqual(result["succeeded"], 2)
+        self.assertEqual(result["unchanged"], 0)
+        self.assertEqual(
+            result["failed"], [{"user": self.users[1].id, "error": "No enough transactions data available."}]
+        )
+        self.assertEqual(Analysis.objects.count(), 2)
+
+
+class PeriodComparisonTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword1234",
+            nickname="otheruser",
+            name="김철수",
+            phone="010-3333-4444",
+        )
+        self.checking = Account.objects.create(user=self.user, account_num="3333-54-0000001", bank_code="090")
+        self.saving = Account.objects.create(user=self.user, account_num="3333-54-0000002", bank_code="004")
+        other_account = Account.objects.create(user=self.other_user, account_num="3333-54-0000003", bank_code="090")
+
+        this_week = datetime_utils.get_this_week_start().date()
+        last_week = datetime_utils.get_last_week_start().date()
+        # 잔액 계산은 확인 대상이 아니므로 bulk_create로 바로 넣고, 일자별 거래 합계는 backfill로 만듭니다.
+        Transaction.objects.bulk_create(
+            [
+                self.make_transaction(self.checking, 10000, "CARD", this_week),
+                self.make_transaction(self.checking, 20000, "CARD", this_week),
+                self.make_transaction(self.saving, 5000, "AUTOMATIC_TRANSFER", this_week),
+                self.make_transaction(self.checking, 7000, "CARD", last_week),
+                self.make_transaction(self.saving, 3000, "AUTOMATIC_TRANSFER", last_week),
+                self.make_transaction(self.checking, 100000, "CASH", this_week, trans_type="DEPOSIT"),
+                self.make_transaction(other_account, 90000, "CARD", this_week),
+            ]
+        )
+        backfill_users([self.user.id, self.other_user.id])
+
+    @staticmethod
+    def make_transaction(account, amount, method, trans_date, trans_type="WITHDRAW"):
+        return Transaction(
+            account=account,
+            trans_amount=amount,
+            after_balance=0,
+            print_content="비교",
+            trans_type=trans_type,
+            trans_method=method,
+            trans_date=trans_date,
+            trans_time=datetime_utils.today.time(),
+        )
+
+    def test_compare_spending_by_dimensions_in_one_query(self):
+        analyzer = SpendingAnalyzer(user=self.user)
+
+        with self.assertNumQueries(1):
+            by_method = analyzer.compare_spending("this_week", "last_week", ("trans_method",))
+        with self.assertNumQueries(1):
+            by_bank = analyzer.compare_spending("this_week", "last_week", ("bank_code", "trans_method"))
+
+        self.assertEqual(
+            by_method,
+            [
+                {"trans_method": "AUTOMATIC_TRANSFER", "this_total": 5000, "last_total": 3000},
+                {"trans_method": "CARD", "this_total": 30000, "last_total": 7000},
+            ],
+        )
+        self.assertEqual(
+            by_bank,
+            [
+                {"bank_code": "004", "trans_method": "AUTOMATIC_TRANSFER", "this_total": 5000, "last_total": 3000},
+                {"bank_code": "090", "trans_method": "CARD", "this_total": 30000, "last_total": 7000},
+            ],
+        )
+
+    def test_compare_spending_totals(self):
+        analyzer = SpendingAnalyzer(user=self.user)
+
+        with self.assertNumQueries(1):
+            totals = analyzer.compare_spending("this_week", "last_week")
+
+        self.assertEqual(totals, [{"this_total": 35000, "last_total": 10000}])
+
+    def test_compare_periods_that_are_not_adjacent(self):
+        this_week = datetime_utils.get_period("this_week")
+        # 지난 주를 비워 두고 그 전 주와 비교합니다.
+        two_weeks_ago = (this_week[0] - timedelta(weeks=2), this_week[1] - timedelta(weeks=2))
+        Transaction.objects.bulk_create([self.make_transaction(self.checking, 4000, "CARD", two_weeks_ago[0].date())])
+        backfill_users([self.user.id])
+
+        rows = PeriodComparison(this_week, two_weeks_ago).compare(("user",))
+
+        self.assertEqual(
+            rows,
+            [
+                {"user": self.user.id, "this_total": 35000, "last_total": 4000},
+                {"user": self.other_user.id, "this_total": 90000, "last_total": 0},
+            ],
+        )
+
+    def test_unknown_dimension(self):
+        comparison = PeriodComparison(datetime_utils.get_period("this_week"), datetime_utils.get_period("last_week"))
+
+        with self.assertRaises(ValueError):
+            comparison.compare(("category",))
+
+    def test_per_user_comparison_query_count_and_latency(self):
+        this_week = datetime_utils.get_this_week_start().date()
+        Transaction.objects.bulk_create(
+            self.make_transaction(self.checking, 1000, "CARD", this_week - timedelta(days=i % 14)) for i in range(2000)
+        )
+        backfill_users([self.user.id])
+
+        for user in (self.user, self.other_user):
+            analyzer = SpendingAnalyzer(user=user)
+            started = time.perf_counter()
+            with self.assertNumQueries(1):
+                analyzer.compare_spending("this_week", "last_week", ("account", "trans_method"))
+            self.assertLess(time.perf_counter() - started, 0.5)
+
+
+class SpendingBreakdownTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+        )
+        self.checking = Account.objects.create(
+            user=self.user, account_num="3333-54-0000001", bank_code="090", balance=1000000
+        )
+        self.saving = Account.objects.create(user=self.user, account_num="3333-54-0000002", bank_code="004")
+
+        self.this_week = datetime_utils.get_this_week_start().date()
+        self.last_week = datetime_utils.get_last_week_start().date()
+        Transaction.objects.bulk_create(
+            [
+                self.make_transaction(self.checking, 10000, "CARD", self.this_week, 9, "편의점"),
+                self.make_transaction(self.checking, 20000, "CARD", self.this_week, 9, "마트"),
+                self.make_transaction(self.saving, 5000, "AUTOMATIC_TRANSFER", self.this_week, 0, "보험료"),
+                self.make_transaction(self.checking, 7000, "CARD", self.last_week + timedelta(days=1), 21, "편의점"),
+                self.make_transaction(self.saving, 3000, "AUTOMATIC_TRANSFER", self.last_week, 0, "보험료"),
+                self.make_transaction(self.checking, 100000, "CARD", self.this_week, 9, "월급", "DEPOSIT"),
+            ]
+        )
+        backfill_users([self.user.id])
+        self.breakdown = SpendingBreakdown(
+            self.user, datetime_utils.get_period("this_week"), datetime_utils.get_period("last_week")
+        )
+
+    @staticmethod
+    def make_transaction(account, amount, method, trans_date, hour, content, trans_type="WITHDRAW"):
+        return Transaction(
+            account=account,
+            trans_amount=amount,
+            after_balance=0,
+            print_content=content,
+            trans_type=trans_type,
+            trans_method=method,
+            trans_date=trans_date,
+            trans_time=f"{hour:02d}:30:00",
+        )
+
+    def test_compute_every_breakdown(self):
+        # 모든 기준의 합계를 일자별/사용처별 거래 합계에서 쿼리 한 번으로 구합니다. (거래내역은 읽지 않습니다.)
+        with CaptureQueriesContext(connection) as queries:
+            breakdowns = self.breakdown.compute()
+
+        self.assertEqual(len(queries), 1)
+        self.assertFalse([query for query in queries.captured_queries if Transaction._meta.db_table in query["sql"]])
+        self.assertEqual(list(breakdowns), list(SPENDING_BREAKDOWN_ABOUT))
+        self.assertEqual(
+            breakdowns["SPENDING_BY_METHOD"],
+            {"labels": ["자동이체", "카드결제"], "this_period": [5000, 30000], "last_period": [3000, 7000]},
+        )
+        self.assertEqual(
+            breakdowns["SPENDING_BY_ACCOUNT"],
+            {
+                "labels": [self.account_name(self.checking), self.account_name(self.saving)],
+                "this_period": [30000, 5000],
+                "last_period": [7000, 3000],
+            },
+        )
+        self.assertEqual(
+            breakdowns["TOP_MERCHANTS"],
+            {
+                "labels": ["마트", "편의점", "보험료"],
+                "this_period": [20000, 10000, 5000],
+                "last_period": [0, 7000, 3000],
+            },
+        )
+
+        heatmap = breakdowns["SPENDING_HEATMAP"]
+        self.assertEqual(heatmap["labels"], WEEKDAY_LABELS)
+        self.assertEqual(heatmap["columns"], list(range(24)))
+        this_week = np.array(heatmap["this_period"])
+        last_week = np.array(heatmap["last_period"])
+        self.assertEqual(this_week.shape, (7, 24))
+        self.assertEqual(this_week[0, 9], 30000)
+        self.assertEqual(this_week[0, 0], 5000)
+        self.assertEqual(this_week.sum(), 35000)
+        self.assertEqual(last_week[1, 21], 7000)
+        self.assertEqual(last_week[0, 0], 3000)
+        self.assertEqual(last_week.sum(), 10000)
+
+    def test_top_merchants_are_limited(self):
+        self.breakdown.top_merchants = 2
+
+        self.assertEqual(self.breakdown.compute()["TOP_MERCHANTS"]["labels"], ["마트", "편의점"])
+
+    def test_no_spending(self):
+        Transaction.objects.filter(trans_type="WITHDRAW").delete()
+        backfill_users([self.user.id])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.breakdown.compute(), {})
+
+    def test_rerun_without_changes_is_a_no_op(self):
+        analyzer = SpendingAnalyzer(user=self.user)
+
+        self.assertEqual(analyzer.make_breakdown_analyses("WEEKLY"), len(SPENDING_BREAKDOWN_ABOUT))
+        self.assertEqual(analyzer.make_breakdown_analyses("WEEKLY"), 0)
+
+        Transaction.objects.create(
+            account=self.checking,
+            trans_amount=1000,
+            print_content="마트",
+            trans_type="WITHDRAW",
+            trans_method="CARD",
+            trans_date=self.this_week,
+            trans_time="10:00:00",
+        )
+
+        # 카드 결제 한 건은 거래 방법별, 계좌별, 시간대별, 사용처별 합계를 모두 바꿉니다.
+        self.assertEqual(analyzer.make_breakdown_analyses("WEEKLY"), 4)
+        self.assertEqual(Analysis.objects.filter(user=self.user).count(), len(SPENDING_BREAKDOWN_ABOUT))
+        self.assertEqual(
+            Analysis.objects.get(user=self.user, about="TOP_MERCHANTS").chart_data["this_period"][0], 21000
+        )
+
+    @staticmethod
+    def account_name(account):
+        return f"{account.get_bank_code_display()} {account.masking_account_num()}"
+
+
+class DailySpendingRollupTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+        )
+        self.account = Account.objects.create(user=self.user, account_num="3333-54-0000001", balance=1000000)
+        self.today = datetime_utils.today.date()
+
+    def create_transaction(self, amount, trans_type="WITHDRAW", trans_method="CARD", trans_date=None):
+        return Transaction.objects.create(
+            account=self.account,
+            trans_amount=amount,
+            print_content="합계",
+            trans_type=trans_type,
+            trans_method=trans_method,
+            trans_date=trans_date or self.today,
+            trans_time=datetime_utils.today.time(),
+        )
+
+    def get_rollups(self):
+        return set(
+            DailySpendingRollup.objects.filter(user=self.user)
+            .exclude(transaction_count=0)
+            .values_list("date", "trans_type", "trans_method", "total_amount", "transaction_count")
+        )
+
+    def assertRollupMatchesTransactions(self):
+        transactions = Transaction.objects.filter(account__user=self.user).annotate(hour=ExtractHour("trans_time"))
+        for model, source_fields in (
+            (DailySpendingRollup, ("account", "trans_date", "hour", "trans_type", "trans_method")),
+            (DailyMerchantRollup, ("account", "trans_date", "trans_type", "print_content")),
+        ):
+            expected = set(
+                transactions.values_list(*source_fields)
+                .annotate(total=Sum("trans_amount"), count=Count("id"))
+                .order_by()
+            )
+            rollups = set(
+                model.objects.filter(user=self.user)
+                .exclude(transaction_count=0)
+                .values_list("account", *model.rollup_key, "total_amount", "transaction_count")
+            )
+            self.assertEqual(rollups, expected)
+
+    def test_iso_string_date_and_time_are_recorded(self):
+        trans = Transaction.objects.create(
+            account=self.account,
+            trans_amount=10000,
+            print_content="합계",
+            trans_type="WITHDRAW",
+            trans_method="CARD",
+            trans_date="2024-09-01",
+            trans_time="12:00",
+        )
+        trans.trans_date = "2024-09-02"
+        trans.save()
+
+        self.assertEqual(self.get_rollups(), {(date(2024, 9, 2), "WITHDRAW", "CARD", 10000, 1)})
+        self.assertRollupMatchesTransactions()
+
+    def test_create_update_delete_keep_rollup_current(self):
+        yesterday = self.today - timedelta(days=1)
+        first = self.create_transaction(10000)
+        second = self.create_transaction(20000)
+        self.create_transaction(50000, trans_type="DEPOSIT", trans_method="ATM")
+        self.assertEqual(
+            self.get_rollups(),
+            {(self.today, "WITHDRAW", "CARD", 30000, 2), (self.today, "DEPOSIT", "ATM", 50000, 1)},
+        )
+
+        first.trans_amount = 15000
+        first.save()
+        self.assertRollupMatchesTransactions()
+
+        # 잔액에는 영향이 없는 거래 방법/일자 변경도 합계를 옮겨야 합니다.
+        first.trans_method = "AUTOMATIC_TRANSFER"
+        first.save()
+        self.assertRollupMatchesTransactions()
+
+        second.trans_date = yesterday
+        second.save()
+        self.assertRollupMatchesTransactions()
+
+        first.delete()
+        self.assertRollupMatchesTransactions()
+        self.assertEqual(
+            self.get_rollups(),
+            {(yesterday, "WITHDRAW", "CARD", 20000, 1), (self.today, "DEPOSIT", "ATM", 50000, 1)},
+        )
+
+    def test_bulk_import_and_transfer_update_rollup(self):
+        saving = Account.objects.create(user=self.user, account_num="3333-54-0000002")
+        rows = [
+            {
+                "account": self.account.id,
+                "trans_amount": 1000 * (i + 1),
+                "print_content": "일괄",
+                "trans_type": "WITHDRAW",
+                "trans_method": "CARD",
+                "trans_date": self.today - timedelta(days=i % 3),
+                "trans_time": "12:00:00",
+            }
+            for i in range(6)
+        ]
+
+        TransactionBulkImporter(self.user).import_rows(rows)
+        Transaction.objects.transfer(
+            self.user, self.account.id, saving.id, 3000, self.today, datetime_utils.today.time()
+        )
+
+        self.assertRollupMatchesTransactions()
+
+    def test_deleting_account_deletes_its_rollups(self):
+        self.create_transaction(10000)
+        other = Account.objects.create(user=self.user, account_num="3333-54-0000002", balance=100000)
+        Transaction.objects.create(
+            account=other,
+            trans_amount=4000,
+            print_content="다른 계좌",
+            trans_type="WITHDRAW",
+            trans_method="CARD",
+            trans_date=self.today,
+            trans_time=datetime_utils.today.time(),
+        )
+
+        other.delete()
+
+        self.assertEqual(self.get_rollups(), {(self.today, "WITHDRAW", "CARD", 10000, 1)})
+        self.assertRollupMatchesTransactions()
+
+    def test_backfill_command_rebuilds_rollups(self):
+        for i in range(5):
+            self.create_transaction(1000 * (i + 1), trans_date=self.today - timedelta(days=i % 2))
+        DailySpendingRollup.objects.all().delete()
+        DailySpendingRollup.objects.create(
+            user=self.user,
+            account=self.account,
+            date=self.today,
+            hour=0,
+            trans_type="WITHDRAW",
+            trans_method="ATM",
+            total_amount=1,
+            transaction_count=1,
+        )
+
+        call_command("backfill_spending_rollups", "--chunk-size", "1", stdout=io.StringIO())
+
+        self.assertRollupMatchesTransactions()
+
+    def test_comparison_reads_rollups_instead_of_transactions(self):
+        for i in range(30):
+            self.create_transaction(1000, trans_date=datetime_utils.get_this_year_start().date() + timedelta(days=i))
+        analyzer = SpendingAnalyzer(user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            (row,) = analyzer.compare_spending("this_year", "last_year")
+
+        self.assertEqual(row, {"this_total": 30000, "last_total": 0})
+        self.assertEqual(len(queries), 1)
+        self.assertIn(DailySpendingRollup._meta.db_table, queries[0]["sql"])
+        self.assertNotIn(Transaction._meta.db_table, queries[0]["sql"])
+
+
+class SpendingChartTestCase(TestCase):
+    renders = 30
+
+    def test_chart_template_is_reused_without_pyplot_figures(self):
+        chart = get_spending_chart("weekly")
+        output = io.BytesIO()
+
+        chart.render(30000, 10000, output)
+
+        self.assertIs(get_spending_chart("weekly"), chart)
+        self.assertIsNot(get_spending_chart("monthly"), chart)
+        self.assertEqual(output.getvalue()[:8], b"\x89PNG\r\n\x1a\n")
+        self.assertGreaterEqual(chart.ax.get_ylim()[1], 30000)
+        self.assertEqual(plt.get_fignums(), [])
+
+    def test_rendering_many_charts_keeps_memory_flat(self):
+        chart = get_spending_chart("monthly")
+        for i in range(20):
+            chart.render(1000 * (i + 1), 500 * (i + 1), io.BytesIO())
+
+        # 처음 몇 장을 그린 뒤 새로 할당되어 남아 있는 메모리만 셉니다.
+        # 매번 Figure를 새로 만들어 남기면 한 장에 수백 KB씩 늘어납니다.
+        # 수만 장을 그리는 RSS 측정은 benchmark_spending_charts 명령으로 합니다.
+        tracemalloc.start()
+        try:
+            for i in range(self.renders):
+                chart.render(1000 * (i + 21), 500 * (i + 21), io.BytesIO())
+            retained, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(retained, 1024 * 1024)
+
 
 class AnalysisAPIViewTestCase(APITestCase):
     def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
         self.user = get_user_model().objects.create_user(
             email="test@example.com",
             password="testpassword1234",
@@ -100,14 +715,38 @@ class AnalysisAPIViewTestCase(APITestCase):
         )
         self.client.force_authenticate(user=self.user)
 
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def create_weekly_spending(self, this_total, last_total):
+        account = self.user.accounts.first() or Account.objects.create(
+            user=self.user, account_num="3333-54-0000001", balance=10**7
+        )
+        for trans_date, amount in (
+            (datetime_utils.get_this_week_start(), this_total),
+            (datetime_utils.get_last_week_start(), last_total),
+        ):
+            Transaction.objects.create(
+                account=account,
+                trans_amount=amount,
+                print_content="출금",
+                trans_type="WITHDRAW",
+                trans_method="CARD",
+                trans_date=trans_date.date(),
+                trans_time=datetime_utils.today.time(),
+            )
+        SpendingAnalyzer(user=self.user).make_matplot_weekly_spending()
+        return Analysis.objects.get(user=self.user, type="WEEKLY")
+
     def test_get_analysis(self):
         for i in range(10):
             Analysis.objects.create(
                 user=self.user,
                 about="TOTAL_SPENDING",
                 type="WEEKLY",
-                period_start=datetime.today(),
-                period_end=datetime.today() + timedelta(days=8),
+                period_start=datetime.today() + timedelta(weeks=i),
+                period_end=datetime.today() + timedelta(weeks=i, days=8),
                 description=f"test Analysis {i + 1}",
                 created_at=datetime.today(),
                 updated_at=datetime.today(),
@@ -118,3 +757,102 @@ class AnalysisAPIViewTestCase(APITestCase):
         self.assertEqual(len(response.data), 10)
         self.assertEqual(response.data[0]["description"], "test Analysis 1")
         self.assertEqual(response.data[9]["description"], "test Analysis 10")
+
+    def test_list_returns_chart_data_of_own_analyses_only(self):
+        analysis = self.create_weekly_spending(30000, 10000)
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword1234",
+            nickname="otheruser",
+            name="김철수",
+            phone="010-3333-4444",
+        )
+        Analysis.objects.create(
+            user=other_user,
+            about="TOTAL_SPENDING",
+            type="WEEKLY",
+            period_start=analysis.period_start,
+            period_end=analysis.period_end,
+        )
+
+        response = self.client.get(reverse("analysis"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(
+            response.data[0]["chart_data"], {"labels": ["총 지출"], "this_period": [30000], "last_period": [10000]}
+        )
+        self.assertTrue(response.data[0]["image"].endswith(reverse("analysis-image", kwargs={"pk": analysis.pk})))
+        self.assertNotIn("fingerprint", response.data[0])
+
+    def test_image_is_rendered_on_first_request_and_then_served_from_storage(self):
+        analysis = self.create_weekly_spending(30000, 10000)
+        # 분석 작업은 그래프를 그리지 않습니다.
+        self.assertFalse(analysis.result_image)
+        url = reverse("analysis-image", kwargs={"pk": analysis.pk})
+
+        first = self.client.get(url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["Content-Type"], "image/png")
+        self.assertFalse(first.streaming)
+        analysis.refresh_from_db()
+        self.assertTrue(analysis.result_image)
+        self.assertEqual(Notification.objects.filter(message__contains="수정된").count(), 0)
+
+        second = self.client.get(url)
+
+        self.assertTrue(second.streaming)
+        self.assertEqual(b"".join(second.streaming_content), first.content)
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": second["ETag"]}).status_code, 304)
+
+    def test_changed_analysis_drops_cached_image(self):
+        analysis = self.create_weekly_spending(30000, 10000)
+        url = reverse("analysis-image", kwargs={"pk": analysis.pk})
+        etag = self.client.get(url)["ETag"]
+        analysis.refresh_from_db()
+        image_path = analysis.result_image.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_weekly_spending(5000, 5000)
+
+        analysis.refresh_from_db()
+        self.assertFalse(analysis.result_image)
+        self.assertFalse(os.path.exists(image_path))
+        self.assertEqual(analysis.chart_data["this_period"], [35000])
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_image_of_other_users_analysis(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword1234",
+            nickname="otheruser",
+            name="김철수",
+            phone="010-3333-4444",
+        )
+        analysis = Analysis.objects.create(
+            user=other_user,
+            about="TOTAL_SPENDING",
+            type="WEEKLY",
+            period_start=datetime.today(),
+            period_end=datetime.today() + timedelta(days=13),
+            chart_data={"labels": ["총 지출"], "this_period": [1000], "last_period": [2000]},
+        )
+
+        response = self.client.get(reverse("analysis-image", kwargs={"pk": analysis.pk}))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_breakdown_images_are_rendered(self):
+        self.create_weekly_spending(30000, 10000)
+        SpendingAnalyzer(user=self.user).make_breakdown_analyses("WEEKLY")
+
+        for analysis in Analysis.objects.filter(user=self.user, about__in=SPENDING_BREAKDOWN_ABOUT):
+            with self.subTest(about=analysis.about):
+                response = self.client.get(reverse("analysis-image", kwargs={"pk": analysis.pk}))
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["Content-Type"], "image/png")
+                self.assertTrue(response.content.startswith(b"\x89PNG"))
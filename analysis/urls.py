@@ -4,4 +4,5 @@ from . import views as analysis_views
 
 urlpatterns = [
     path("", analysis_views.AnalysisView.as_view(), name="analysis"),
+    path("<int:pk>/image/", analysis_views.AnalysisImageView.as_view(), name="analysis-image"),
 ]
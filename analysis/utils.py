@@ -33,3 +33,21 @@ class DateUtils:
 
     def get_last_month_end(self):
         return self.get_this_month_start() - relativedelta(days=1)
+
+    def get_this_year_start(self):
+        return datetime(self.today.year, 1, 1)
+
+    def get_this_year_end(self):
+        return datetime(self.today.year, 12, 31)
+
+    def get_last_year_start(self):
+        return self.get_this_year_start() - relativedelta(years=1)
+
+    def get_last_year_end(self):
+        return self.get_this_year_start() - relativedelta(days=1)
+
+    def get_period(self, name):
+        """
+        this_week, last_week, this_month, last_month, this_year, last_year 중 하나의 (시작, 끝)을 반환합니다.
+        """
+        return getattr(self, f"get_{name}_start")(), getattr(self, f"get_{name}_end")()
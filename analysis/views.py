@@ -1,5 +1,14 @@
+import io
+
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import NotFound
 from rest_framework.generics import ListAPIView
+from rest_framework.views import APIView
 
+from analysis.charts import render_chart_data
 from analysis.models import Analysis
 from analysis.serializers import AnalysisSerializer
 
@@ -9,6 +18,51 @@ class AnalysisView(ListAPIView):
     serializer_class = AnalysisSerializer
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        queryset.filter(user=self.request.user)
-        return queryset
+        return super().get_queryset().filter(user=self.request.user).order_by("id")
+
+
+class AnalysisImageView(APIView):
+    """
+    분석 결과 그래프 이미지 API입니다.
+    분석 작업은 그래프 데이터만 저장하고, 이미지는 처음 요청될 때 그려 저장해 둔 뒤 다음 요청부터는 저장된 파일을 보냅니다.
+    분석 결과가 바뀌지 않으면 같은 이미지이므로 지문(fingerprint)을 ETag로 사용합니다.
+    """
+
+    def get(self, request, *args, **kwargs):
+        analysis = get_object_or_404(Analysis, pk=kwargs["pk"], user=request.user)
+        etag = f'"{analysis.fingerprint}"'
+        if analysis.fingerprint and request.headers.get("If-None-Match") == etag:
+            response = HttpResponse(status=304)
+        elif analysis.result_image:
+            response = FileResponse(analysis.result_image.open("rb"), content_type="image/png")
+        else:
+            response = HttpResponse(self.render_image(analysis), content_type="image/png")
+
+        if analysis.fingerprint:
+            response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    @staticmethod
+    def render_image(analysis):
+        if not analysis.chart_data:
+            raise NotFound("그래프 데이터가 없는 분석 결과입니다.")
+
+        output = io.BytesIO()
+        render_chart_data(analysis.about, analysis.type.lower(), analysis.chart_data, output)
+        image = output.getvalue()
+
+        storage = Analysis.result_image.field.storage
+        name = storage.save(
+            Analysis.result_image.field.generate_filename(analysis, f"{analysis.id}.png"), ContentFile(image)
+        )
+        # 수정 알림이 가지 않도록 update()로 저장합니다.
+        # 그 사이에 분석 결과가 바뀌었거나 다른 요청이 먼저 이미지를 저장했다면 이 이미지는 버립니다.
+        stored = (
+            Analysis.objects.filter(pk=analysis.pk, fingerprint=analysis.fingerprint)
+            .filter(Q(result_image="") | Q(result_image__isnull=True))
+            .update(result_image=name)
+        )
+        if not stored:
+            storage.delete(name)
+        return image
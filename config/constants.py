@@ -127,7 +127,29 @@ ANALYSIS_TYPES = [
     ("YEARLY", "연간"),
 ]
 
+# 순자산 계산 시 부채로 보는 계좌 종류
+LIABILITY_ACCOUNT_TYPES = ("LOAN",)
+
+# 월간 거래내역서 파일 형식
+STATEMENT_FILE_TYPES = [
+    ("csv", "CSV"),
+    ("pdf", "PDF"),
+]
+
 ANALYSIS_ABOUT = [
     ("TOTAL_SPENDING", "총 지출"),
     ("TOTAL_INCOME", "총 수입"),
+    ("SPENDING_BY_METHOD", "거래 방법별 지출"),
+    ("SPENDING_BY_ACCOUNT", "계좌별 지출"),
+    ("SPENDING_HEATMAP", "요일/시간대별 지출"),
+    ("TOP_MERCHANTS", "주요 사용처"),
 ]
+
+# 지출 내역을 기준별로 나눠 분석하는 종류 (analysis.breakdowns.SpendingBreakdown)
+SPENDING_BREAKDOWN_ABOUT = ("SPENDING_BY_METHOD", "SPENDING_BY_ACCOUNT", "SPENDING_HEATMAP", "TOP_MERCHANTS")
+
+# 코드 -> 표시 이름 조회용 딕셔너리 (행마다 get_*_display를 호출하지 않기 위해 사용합니다.)
+TRANSACTION_TYPE_LABELS = dict(TRANSACTION_TYPE)
+TRANSACTION_METHOD_LABELS = dict(TRANSACTION_METHOD)
+BANK_CODE_LABELS = dict(BANK_CODES)
+ACCOUNT_TYPE_LABELS = dict(ACCOUNT_TYPE)
@@ -105,6 +105,18 @@ USE_TZ = True
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Cache
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "TIMEOUT": 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 10000},  # 최대 개수를 넘으면 오래된 항목부터 삭제됩니다.
+    }
+}
+
+# Idempotency-Key로 처리한 요청의 응답을 보관하는 시간(초)
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24  # 1 day
+
 # Auth
 AUTH_USER_MODEL = "users.User"
 
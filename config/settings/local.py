@@ -40,4 +40,20 @@ CELERY_BEAT_SCHEDULE = {
         "task": "analysis.tasks.monthly_analyze_and_notify_user",
         "schedule": crontab(),
     },
+    "weekly-analyze-spending-breakdown": {
+        "task": "analysis.tasks.weekly_analyze_spending_breakdown",
+        "schedule": crontab(),
+    },
+    "monthly-analyze-spending-breakdown": {
+        "task": "analysis.tasks.monthly_analyze_spending_breakdown",
+        "schedule": crontab(),
+    },
+    "purge-expired-idempotency-keys": {
+        "task": "transactions.tasks.purge_expired_idempotency_keys",
+        "schedule": crontab(),
+    },
+    "generate-monthly-statements": {
+        "task": "accounts.tasks.generate_monthly_statements",
+        "schedule": crontab(),
+    },
 }
@@ -21,6 +21,15 @@ DATABASES = {
     }
 }
 
+# 여러 워커 프로세스가 같은 캐시(멱등성 키, 계좌 목록)를 보도록 Redis를 사용합니다.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/1",
+        "TIMEOUT": 60 * 60,
+    }
+}
+
 CELERY_BEAT_SCHEDULE = {
     # 작업 스케줄
     "weekly-analyze-and-notify": {
@@ -31,4 +40,20 @@ CELERY_BEAT_SCHEDULE = {
         "task": "analysis.tasks.monthly_analyze_and_notify_user",
         "schedule": crontab(day_of_month="1"),
     },
+    "weekly-analyze-spending-breakdown": {
+        "task": "analysis.tasks.weekly_analyze_spending_breakdown",
+        "schedule": crontab(day_of_week=""),
+    },
+    "monthly-analyze-spending-breakdown": {
+        "task": "analysis.tasks.monthly_analyze_spending_breakdown",
+        "schedule": crontab(day_of_month="1"),
+    },
+    "purge-expired-idempotency-keys": {
+        "task": "transactions.tasks.purge_expired_idempotency_keys",
+        "schedule": crontab(minute="0"),
+    },
+    "generate-monthly-statements": {
+        "task": "accounts.tasks.generate_monthly_statements",
+        "schedule": crontab(minute="0", hour="1", day_of_month="1"),
+    },
 }
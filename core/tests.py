@@ -1,9 +1,25 @@
+import time as time_module
+from datetime import date, time, timedelta
+from unittest import skipUnless
 from unittest.mock import patch
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from psycopg2 import OperationalError as Psycopg2OpError
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from analysis.analyzers import SpendingAnalyzer
+from analysis.management.commands.backfill_spending_rollups import backfill_users
+from analysis.models import Analysis, DailySpendingRollup
+from core.utils import run_in_chunks
+from notifications.models import Notification
+from transactions.models import Transaction
 
 
 @patch("django.db.utils.ConnectionHandler.__getitem__")
@@ -32,3 +48,159 @@ class CommandTests(SimpleTestCase):
         call_command("wait_for_db")
 
         self.assertEqual(patched_getitem.call_count, 10)
+
+
+def sum_slowly_if_first(chunk):
+    # 첫 번째 chunk만 늦게 끝나도록 합니다.
+    if chunk[0] == 0:
+        time_module.sleep(0.5)
+    return sum(chunk)
+
+
+class RunInChunksTestCase(SimpleTestCase):
+    def test_results_are_returned_in_chunk_order(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                results = list(run_in_chunks(sum_slowly_if_first, range(6), chunk_size=2, workers=workers))
+
+                self.assertEqual(results, [1, 5, 9])
+
+
+@skipUnless(connection.vendor == "postgresql", "실행 계획 검증은 PostgreSQL에서만 수행합니다.")
+class QueryPlanTestCase(TestCase):
+    """
+    자주 실행되는 조회 쿼리가 인덱스를 사용하는지 EXPLAIN으로 검증합니다.
+    테스트 데이터가 적으면 플래너가 순차 탐색을 고르므로 enable_seqscan을 끄고,
+    그래도 순차 탐색이 나온다면 사용할 수 있는 인덱스가 없다는 뜻입니다.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        self.account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=1000000, type="CHECKING"
+        )
+        # 다른 계좌들의 거래도 섞여 있어야 실제 운영 환경과 비슷한 실행 계획이 나옵니다.
+        accounts = [self.account] + [
+            Account.objects.create(user_id=self.user.id, account_num=f"3333-54-000000{i}", balance=1000000)
+            for i in range(4)
+        ]
+        today = date.today()
+        Transaction.objects.bulk_create(
+            Transaction(
+                account=accounts[i % len(accounts)],
+                trans_amount=1000,
+                after_balance=1000000,
+                print_content=f"{i}. 출금 Test",
+                trans_type="WITHDRAW" if i % 2 else "DEPOSIT",
+                trans_method="CARD",
+                trans_date=today - timedelta(days=i % 365),
+                trans_time=time(i % 24, 0),
+            )
+            for i in range(5000)
+        )
+        # 대부분의 알림은 이미 읽은 상태입니다.
+        Notification.objects.bulk_create(
+            Notification(user=self.user, message=f"test notification {i}", is_read=i % 20 != 0) for i in range(1000)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            # 테스트 트랜잭션이 끝나면 원래 설정으로 돌아갑니다.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertIndexScan(self, queryset, index_name):
+        self.assertPlanUsesIndex(queryset.explain(), index_name)
+
+    def assertPlanUsesIndex(self, plan, index_name):
+        self.assertNotIn("Seq Scan", plan, f"순차 탐색으로 실행됩니다.\n{plan}")
+        self.assertIn(index_name, plan, f"{index_name} 인덱스를 사용하지 않습니다.\n{plan}")
+
+    def explain_captured(self, run, table):
+        """
+        run()이 실제로 실행한 쿼리 중 table을 읽는 쿼리들의 실행 계획을 반환합니다.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            run()
+        plans = []
+        for query in queries:
+            if table not in query["sql"]:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN {query['sql']}")
+                plans.append("\n".join(row[0] for row in cursor.fetchall()))
+        return plans
+
+    def get_client(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        return client
+
+    def test_spending_comparison_query_uses_index(self):
+        # 분석 작업이 사용자 묶음마다 실행하는 PeriodComparison.compare 쿼리입니다.
+        backfill_users([self.user.id])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        for analysis_type in ("WEEKLY", "MONTHLY"):
+            plans = self.explain_captured(
+                lambda: SpendingAnalyzer.aggregate_total_spending(
+                    *SpendingAnalyzer.get_periods(analysis_type), user_ids=[self.user.id]
+                ),
+                DailySpendingRollup._meta.db_table,
+            )
+            self.assertEqual(len(plans), 1)
+            self.assertPlanUsesIndex(plans[0], "unique_account_daily_spending_rollup")
+
+    def test_transaction_list_pages_use_index_without_sorting(self):
+        client = self.get_client()
+        url = reverse("transaction-list")
+
+        def read_pages():
+            # 목록 API가 실제로 실행하는 첫 페이지와 51번째 페이지 쿼리의 실행 계획을 확인합니다.
+            next_url = client.get(url).data["next"]
+            for _ in range(50):
+                next_url = client.get(next_url).data["next"]
+
+        plans = self.explain_captured(read_pages, Transaction._meta.db_table)
+        self.assertEqual(len(plans), 51)
+
+        for plan in (plans[0], plans[-1]):
+            self.assertPlanUsesIndex(plan, "transaction_user_ledger_idx")
+            # 인덱스 순서대로 읽으면 사용자의 전체 거래를 정렬하지 않고 한 페이지만 읽고 멈춥니다.
+            self.assertNotIn("Sort", plan, f"전체 거래를 정렬합니다.\n{plan}")
+
+    def test_transaction_range_filter_uses_index(self):
+        client = self.get_client()
+        params = {
+            "trans_type": "WITHDRAW",
+            "date_from": (date.today() - timedelta(days=90)).isoformat(),
+            "date_to": date.today().isoformat(),
+            "amount_min": 50000,
+        }
+
+        # 검색 조건을 붙인 목록 API의 쿼리 (TransactionFilterBackend)
+        plans = self.explain_captured(
+            lambda: client.get(reverse("transaction-list"), params), Transaction._meta.db_table
+        )
+
+        self.assertEqual(len(plans), 1)
+        self.assertPlanUsesIndex(plans[0], "transaction_user_ledger_idx")
+
+    def test_unread_notification_list_uses_index(self):
+        queryset = Notification.objects.filter(user=self.user, is_read=False).order_by("-created_at")
+
+        self.assertIndexScan(queryset, "notification_unread_idx")
+
+    def test_analysis_period_lookup_uses_index(self):
+        queryset = Analysis.objects.filter(
+            user=self.user, type="WEEKLY", period_start__gte=date.today() - timedelta(days=30)
+        )
+
+        self.assertIndexScan(queryset, "unique_user_analysis_period")
@@ -0,0 +1,29 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import connections
+
+
+def split_chunks(items, chunk_size):
+    items = list(items)
+    return [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def run_in_chunks(func, items, chunk_size=1000, workers=1):
+    """
+    items를 chunk_size 개씩 나눠 func(chunk)를 실행하고, 결과를 chunk 순서대로 돌려주는 제너레이터입니다.
+    workers가 2 이상이면 프로세스 풀에서 병렬로 실행하며, 뒤의 chunk가 먼저 끝나도 앞의 chunk 결과를 기다렸다가 순서대로 돌려줍니다.
+    자식 프로세스는 fork로 만들어 Django 설정을 그대로 물려받고, DB 연결은 각자 새로 맺습니다.
+    func는 프로세스 간에 전달할 수 있도록 모듈 최상위 함수여야 합니다.
+    """
+    chunks = split_chunks(items, chunk_size)
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield func(chunk)
+        return
+
+    # 부모 프로세스의 DB 연결을 자식 프로세스가 함께 쓰지 않도록 fork 전에 닫아줍니다.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+        yield from executor.map(func, chunks)
@@ -6,3 +6,11 @@ class Notification(models.Model):
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # 읽지 않은 알림 목록 조회용 부분 인덱스 (읽은 알림은 인덱스에 포함하지 않습니다.)
+            models.Index(
+                fields=["user", "-created_at"], condition=models.Q(is_read=False), name="notification_unread_idx"
+            ),
+        ]
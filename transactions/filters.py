@@ -0,0 +1,30 @@
+from rest_framework.filters import BaseFilterBackend
+
+from transactions.serializers import TransactionFilterSerializer
+
+
+class TransactionFilterBackend(BaseFilterBackend):
+    """
+    검증된 검색 조건을 인덱스를 탈 수 있는 단순 비교 조건(=, >=, <=)으로 바꿔 쿼리셋에 적용합니다.
+    컬럼에 함수를 씌우는 조건은 만들지 않으므로 거래내역 복합 인덱스를 그대로 사용할 수 있습니다.
+    """
+
+    lookups = {
+        "date": "trans_date",
+        "date_from": "trans_date__gte",
+        "date_to": "trans_date__lte",
+        "time_from": "trans_time__gte",
+        "time_to": "trans_time__lte",
+        "amount_min": "trans_amount__gte",
+        "amount_max": "trans_amount__lte",
+        "trans_type": "trans_type",
+        "trans_method": "trans_method",
+        "account": "account_id",
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        serializer = TransactionFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        filters = {self.lookups[name]: value for name, value in serializer.validated_data.items()}
+        return queryset.filter(**filters)
@@ -0,0 +1,118 @@
+import time
+from collections import defaultdict
+from functools import partial
+from itertools import groupby
+from operator import attrgetter
+
+from django.db import transaction
+
+from accounts.caches import account_list_cache
+from accounts.models import Account, DailyBalanceSnapshot
+from transactions.models import Transaction
+from transactions.serializers import TransactionBulkRowSerializer
+
+
+class TransactionBulkImporter:
+    """
+    여러 건의 거래내역을 한 번에 등록하는 클래스입니다.
+    행 단위 검증 → 계좌별 날짜/시간 순 정렬 → 거래 후 잔액 일괄 계산 → bulk_create 순서로 처리하며,
+    계좌 잔액은 마지막에 계좌마다 한 번만 갱신합니다.
+    잘못된 행은 errors에 모아두고 나머지 행은 그대로 등록합니다.
+    """
+
+    def __init__(self, user, batch_size=500, chunk_size=1000):
+        self.user = user
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.errors = []
+
+    def import_rows(self, rows):
+        started = time.perf_counter()
+        account_ids = set(Account.objects.filter(user=self.user).values_list("id", flat=True))
+
+        transactions = []
+        row_count = 0
+        batch = []
+        for row_count, row in enumerate(rows, start=1):
+            batch.append((row_count, row))
+            if len(batch) >= self.batch_size:
+                transactions += self.validate_batch(batch, account_ids)
+                batch = []
+        transactions += self.validate_batch(batch, account_ids)
+
+        created = self.post_transactions(transactions)
+        elapsed = time.perf_counter() - started
+
+        return {
+            "total": row_count,
+            "created": len(created),
+            "failed": len(self.errors),
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "elapsed": round(elapsed, 3),
+            "rows_per_sec": round(row_count / elapsed, 1) if elapsed else 0,
+        }
+
+    def validate_batch(self, batch, account_ids):
+        transactions = []
+        for row_num, row in batch:
+            serializer = TransactionBulkRowSerializer(data=row)
+            if not serializer.is_valid():
+                self.add_error(row_num, serializer.errors)
+                continue
+
+            data = serializer.validated_data
+            if data["account"] not in account_ids:
+                self.add_error(row_num, {"account": ["존재하지 않는 계좌입니다."]})
+                continue
+
+            trans = Transaction(account_id=data.pop("account"), user_id=self.user.id, **data)
+            try:
+                trans.validate_trans_amount()
+            except ValueError as e:
+                self.add_error(row_num, {"trans_amount": [str(e)]})
+                continue
+
+            trans.row_num = row_num
+            transactions.append(trans)
+        return transactions
+
+    def post_transactions(self, transactions):
+        transactions.sort(key=attrgetter("account_id", "trans_date", "trans_time", "row_num"))
+
+        with transaction.atomic():
+            # 데드락을 피하기 위해 항상 id 순서로 계좌 행을 잠급니다.
+            accounts = {
+                account.id: account
+                for account in Account.objects.select_for_update()
+                .filter(id__in={trans.account_id for trans in transactions})
+                .order_by("id")
+            }
+
+            created = []
+            daily_deltas = defaultdict(lambda: defaultdict(int))
+            for account_id, account_transactions in groupby(transactions, key=attrgetter("account_id")):
+                account = accounts[account_id]
+                for trans in account_transactions:
+                    balance = account.balance + trans.get_balance_delta()
+                    if balance < 0:
+                        self.add_error(trans.row_num, {"trans_amount": ["계좌 잔액보다 큰 금액은 출금할 수 없습니다."]})
+                        continue
+                    trans.after_balance = account.balance = balance
+                    created.append(trans)
+                    daily_deltas[account_id][trans.trans_date] += trans.get_balance_delta()
+
+            Transaction.objects.bulk_create(created, batch_size=self.chunk_size)
+            Account.objects.bulk_update(accounts.values(), ["balance"])
+            # 일자별 잔액 스냅샷은 거래마다가 아니라 계좌마다 한 번에 갱신합니다.
+            for account_id, deltas in daily_deltas.items():
+                DailyBalanceSnapshot.objects.record_many(account_id, deltas, accounts[account_id].balance)
+            # 일자별/사용처별 거래 합계도 같은 키끼리 합쳐 계좌마다 한 번에 반영합니다.
+            for account_id, account_transactions in groupby(created, key=attrgetter("account_id")):
+                Transaction.record_rollups(account_id, [(trans, 1) for trans in account_transactions])
+            # bulk_update는 시그널을 보내지 않으므로 계좌 목록 캐시를 직접 무효화합니다.
+            transaction.on_commit(partial(account_list_cache.invalidate, self.user.id))
+
+        return created
+
+    def add_error(self, row_num, errors):
+        self.errors.append({"row": row_num, "errors": errors})
@@ -0,0 +1,144 @@
+import time
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from config.constants import (
+    TRANSACTION_METHOD,
+    TRANSACTION_METHOD_LABELS,
+    TRANSACTION_TYPE_LABELS,
+)
+from transactions.models import Transaction
+from transactions.paginations import TransactionCursorPagination
+
+User = get_user_model()
+
+# 자주 쓰는 검색 조건 (이름, query params)
+FILTER_SCENARIOS = (
+    ("one month", {"date_from": "2024-03-01", "date_to": "2024-03-31"}),
+    ("card withdrawals", {"trans_type": "WITHDRAW", "trans_method": "CARD"}),
+    ("large amounts", {"amount_min": 45000}),
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Django command to compare response size/latency of server-side filtering (transactions.filters) "
+        "and fetching every page to filter on the client"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--transactions", type=int, nargs="+", default=[1000, 10000], help="사용자 한 명의 거래 수")
+
+    def handle(self, *args, **options):
+        for count in options["transactions"]:
+            # 벤치마크용 데이터는 측정이 끝나면 트랜잭션을 롤백해 남기지 않습니다.
+            try:
+                with transaction.atomic():
+                    self.run(count)
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def run(self, count):
+        user = User.objects.create_user(
+            email=f"benchmark-{time.time_ns()}@example.com",
+            password=None,
+            nickname="benchmark",
+            name="benchmark",
+            phone="000-0000-0000",
+        )
+        account = Account.objects.create(user=user, account_num=f"0000-00-{time.time_ns() % 10**7:07d}")
+        # 잔액 계산은 측정 대상이 아니므로 save()를 거치지 않고 2024년 한 해에 고르게 나눠 넣습니다.
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    account=account,
+                    trans_amount=1000 * (i % 50 + 1),
+                    after_balance=0,
+                    print_content=f"benchmark {i}",
+                    trans_type="WITHDRAW" if i % 3 else "DEPOSIT",
+                    trans_method=TRANSACTION_METHOD[i % len(TRANSACTION_METHOD)][0],
+                    trans_date=date(2024, 1, 1) + timedelta(days=i % 366),
+                    trans_time=datetime(2024, 1, 1, i % 24, i % 60).time(),
+                )
+                for i in range(count)
+            ),
+            batch_size=5000,
+        )
+
+        client = APIClient(HTTP_HOST="localhost")
+        client.force_authenticate(user=user)
+        for name, params in FILTER_SCENARIOS:
+            server_elapsed, server_requests, server_bytes, server_rows = self.measure(
+                lambda: self.fetch_all(client, params)
+            )
+            client_elapsed, client_requests, client_bytes, client_rows = self.measure(
+                lambda: self.fetch_all(client, {}, self.make_predicate(params))
+            )
+
+            self.stdout.write(
+                f"transactions x {count}, {name} ({len(server_rows)} rows): "
+                f"server {server_elapsed * 1000:.0f}ms / {server_requests} requests / {server_bytes / 1024:,.0f}KB, "
+                f"client {client_elapsed * 1000:.0f}ms / {client_requests} requests / {client_bytes / 1024:,.0f}KB "
+                f"({client_elapsed / server_elapsed:.1f}x slower, {client_bytes / max(server_bytes, 1):.1f}x larger)"
+            )
+            if server_rows != client_rows:
+                self.stdout.write(
+                    self.style.ERROR(f"Rows differ: server {len(server_rows)}, client {len(client_rows)}")
+                )
+
+    @staticmethod
+    def fetch_all(client, params, predicate=None):
+        """
+        가장 큰 페이지 크기로 마지막 페이지까지 받아 (요청 수, 응답 크기, 거래 행)을 반환합니다.
+        predicate가 있으면 클라이언트가 하듯이 받은 행을 직접 거릅니다.
+        """
+        url = reverse("transaction-list")
+        params = {**params, "page_size": TransactionCursorPagination.max_page_size}
+        requests, size, rows = 0, 0, []
+        while url:
+            response = client.get(url, params)
+            requests += 1
+            size += len(response.content)
+            data = response.json()
+            rows.extend(row for row in data["results"] if predicate is None or predicate(row))
+            # 다음 페이지 링크에 검색 조건과 커서가 모두 들어 있습니다.
+            url, params = data["next"], None
+        return requests, size, rows
+
+    @staticmethod
+    def make_predicate(params):
+        # 응답은 라벨로 내려오므로 클라이언트도 라벨로 비교합니다.
+        labels = {
+            "trans_type": TRANSACTION_TYPE_LABELS.get(params.get("trans_type"), params.get("trans_type")),
+            "trans_method": TRANSACTION_METHOD_LABELS.get(params.get("trans_method"), params.get("trans_method")),
+        }
+
+        def predicate(row):
+            trans_date, trans_amount = row["trans_date"], row["trans_amount"]
+            return (
+                params.get("date_from", trans_date) <= trans_date <= params.get("date_to", trans_date)
+                and params.get("amount_min", trans_amount) <= trans_amount <= params.get("amount_max", trans_amount)
+                and all(params.get(field) is None or row[field] == label for field, label in labels.items())
+            )
+
+        return predicate
+
+    @staticmethod
+    def measure(fetch):
+        """
+        (전체 시간, 요청 수, 응답 크기, 거래 행)을 반환합니다.
+        """
+        started = time.perf_counter()
+        requests, size, rows = fetch()
+        return time.perf_counter() - started, requests, size, rows
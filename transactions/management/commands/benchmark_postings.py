@@ -0,0 +1,130 @@
+import threading
+import time
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+
+from accounts.models import Account
+from transactions.models import Transaction
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Django command to measure ledger posting (or transfer) throughput under contention"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--accounts", type=int, default=1, help="거래를 반영할 계좌 수")
+        parser.add_argument("--threads", type=int, default=8, help="계좌마다 동시에 거래를 반영할 스레드 수")
+        parser.add_argument("--postings", type=int, default=200, help="스레드마다 반영할 거래 수")
+        parser.add_argument(
+            "--transfers",
+            action="store_true",
+            help="계좌 두 개씩 짝을 지어 스레드마다 서로 반대 방향으로 이체하며 초당 이체 건수를 측정합니다.",
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(
+            email=f"benchmark-{time.time_ns()}@example.com",
+            password=None,
+            nickname="benchmark",
+            name="benchmark",
+            phone="000-0000-0000",
+        )
+        try:
+            accounts = [
+                Account.objects.create(user=user, account_num=f"0000-00-{i:07d}", balance=10**9)
+                for i in range(options["accounts"] * (2 if options["transfers"] else 1))
+            ]
+            if options["transfers"]:
+                elapsed = self.run_transfers(user, accounts, options["threads"], options["postings"])
+                self.report_transfers(accounts, options["threads"] * options["postings"], elapsed)
+                return
+            elapsed = self.run(accounts, options["threads"], options["postings"])
+            # 짝수 번째는 출금, 홀수 번째는 입금이므로 스레드마다 잔액 변동분이 정해져 있습니다.
+            deposits = options["postings"] // 2
+            expected_balance = 10**9 + (deposits - (options["postings"] - deposits)) * 1000 * options["threads"]
+            self.report(accounts, options["threads"] * options["postings"], elapsed, expected_balance)
+        finally:
+            # 벤치마크용 사용자를 지우면 계좌와 거래내역도 함께 삭제됩니다.
+            user.delete()
+
+    def run(self, accounts, thread_count, postings):
+        def post(account):
+            try:
+                for i in range(postings):
+                    Transaction.objects.create(
+                        account=account,
+                        trans_amount=1000,
+                        print_content="benchmark",
+                        trans_type="DEPOSIT" if i % 2 else "WITHDRAW",
+                        trans_method="CARD",
+                        trans_date=datetime.now().date(),
+                        trans_time=datetime.now().time(),
+                    )
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post, args=(account,)) for account in accounts for _ in range(thread_count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    def run_transfers(self, user, accounts, thread_count, transfers):
+        def transfer(from_account, to_account):
+            try:
+                for _ in range(transfers):
+                    now = datetime.now()
+                    Transaction.objects.transfer(
+                        user, from_account.id, to_account.id, 1000, now.date(), now.time(), "benchmark"
+                    )
+            finally:
+                connection.close()
+
+        # 짝수 번째 스레드는 A→B, 홀수 번째 스레드는 B→A로 이체해 같은 계좌 행을 두고 서로 경합하게 합니다.
+        pairs = list(zip(accounts[::2], accounts[1::2]))
+        threads = [
+            threading.Thread(target=transfer, args=(a, b) if i % 2 else (b, a))
+            for a, b in pairs
+            for i in range(thread_count)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    def report_transfers(self, accounts, transfers_per_pair, elapsed):
+        pair_count = len(accounts) // 2
+        total = Account.objects.filter(id__in=[account.id for account in accounts]).aggregate(total=Sum("balance"))
+
+        self.stdout.write(f"account pairs: {pair_count}, transfers per pair: {transfers_per_pair}")
+        self.stdout.write(f"elapsed: {elapsed:.3f}s")
+        self.stdout.write(f"throughput: {transfers_per_pair * pair_count / elapsed:.1f} transfers/sec")
+        # 이체는 돈을 옮기기만 하므로 전체 잔액 합계는 그대로여야 합니다.
+        drift = abs(total["total"] - 10**9 * len(accounts))
+        if drift:
+            self.stdout.write(self.style.ERROR(f"Balance drift detected: {drift}원"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No balance drift"))
+
+    def report(self, accounts, postings_per_account, elapsed, expected_balance):
+        drift = 0
+        for account in accounts:
+            account.refresh_from_db()
+            drift += abs(account.balance - expected_balance)
+
+        self.stdout.write(f"accounts: {len(accounts)}, postings per account: {postings_per_account}")
+        self.stdout.write(f"elapsed: {elapsed:.3f}s")
+        self.stdout.write(f"throughput: {postings_per_account / elapsed:.1f} postings/sec per account")
+        if drift:
+            self.stdout.write(self.style.ERROR(f"Balance drift detected: {drift}원"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No balance drift"))
@@ -0,0 +1,87 @@
+import time
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import Account
+from accounts.serializers import AccountSerializer, AccountValuesSerializer
+from transactions.models import Transaction
+from transactions.serializers import (
+    TransactionSerializer,
+    TransactionValuesSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = "Django command to compare rows/sec of the model serializers and the values() fast-path serializers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000], help="직렬화할 행 수")
+
+    def handle(self, *args, **options):
+        # DB 조회 시간은 빼고 직렬화 비용만 비교하기 위해 메모리에서 만든 객체/행을 사용합니다.
+        for rows in options["rows"]:
+            transactions = [self.make_transaction(i) for i in range(rows)]
+            transaction_rows = [
+                {field: getattr(transaction, field) for field in TransactionValuesSerializer.value_fields}
+                for transaction in transactions
+            ]
+            self.compare(
+                "transactions",
+                rows,
+                lambda: TransactionSerializer(transactions, many=True).data,
+                lambda: TransactionValuesSerializer(transaction_rows, many=True).data,
+            )
+
+            accounts = [self.make_account(i) for i in range(rows)]
+            account_rows = [
+                {field: getattr(account, field) for field in AccountValuesSerializer.value_fields}
+                for account in accounts
+            ]
+            self.compare(
+                "accounts",
+                rows,
+                lambda: AccountSerializer(accounts, many=True).data,
+                lambda: AccountValuesSerializer(account_rows, many=True).data,
+            )
+
+    def compare(self, name, rows, model_serialize, values_serialize):
+        model_elapsed = self.measure(model_serialize)
+        values_elapsed = self.measure(values_serialize)
+        self.stdout.write(
+            f"{name} x {rows}: "
+            f"model serializer {rows / model_elapsed:,.0f} rows/sec, "
+            f"values serializer {rows / values_elapsed:,.0f} rows/sec "
+            f"({model_elapsed / values_elapsed:.1f}x)"
+        )
+
+    @staticmethod
+    def measure(serialize):
+        started = time.perf_counter()
+        serialize()
+        return time.perf_counter() - started
+
+    @staticmethod
+    def make_transaction(i):
+        return Transaction(
+            id=i + 1,
+            account_id=i % 10 + 1,
+            trans_amount=1000 * (i % 50 + 1),
+            after_balance=1000000,
+            print_content=f"benchmark {i}",
+            trans_type="WITHDRAW" if i % 2 else "DEPOSIT",
+            trans_method="CARD",
+            trans_date=date(2024, 1, 1) + timedelta(days=i % 365),
+            trans_time=datetime(2024, 1, 1, i % 24, i % 60).time(),
+        )
+
+    @staticmethod
+    def make_account(i):
+        return Account(
+            id=i + 1,
+            user_id=i % 10 + 1,
+            account_num=f"3333-54-{i:07d}",
+            bank_code="090",
+            type="CHECKING",
+            balance=1000000,
+        )
@@ -0,0 +1,144 @@
+import json
+import time
+from functools import partial
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.caches import account_list_cache
+from accounts.management.commands.backfill_balance_snapshots import backfill_accounts
+from accounts.models import Account
+from core.utils import run_in_chunks
+from transactions.models import SIGNED_AMOUNT, Transaction
+
+# 리포트에 남길 끊긴 지점(거래 id)의 최대 개수
+MAX_REPORTED_BREAKS = 10
+
+
+def reconcile_accounts(account_ids, repair=False):
+    """
+    계좌 묶음의 잔액을 거래내역과 대조합니다.
+
+    거래 후 잔액은 반영 순서(id 순서)대로 이어져야 하므로, 같은 계좌 안에서
+    after_balance[i] - after_balance[i - 1] == 부호를 붙인 거래 금액[i] 이어야 하고,
+    계좌 잔액은 마지막 거래의 after_balance와 같아야 합니다.
+    묶음 전체를 NumPy 배열로 읽어 계좌마다 반복하지 않고 한 번에 비교합니다.
+
+    repair=True이면 첫 거래의 반영 전 잔액을 기준으로 거래 금액을 누적해 거래 후 잔액과 계좌 잔액을 다시 맞추고,
+    일자별 잔액 스냅샷도 다시 만듭니다.
+    """
+    with transaction.atomic():
+        # 계좌 행을 잠가 두면 그동안 새 거래가 반영되지 않으므로 잔액과 거래내역을 같은 시점으로 비교할 수 있습니다.
+        balances = dict(
+            Account.objects.select_for_update().filter(id__in=account_ids).order_by("id").values_list("id", "balance")
+        )
+        rows = list(
+            Transaction.objects.filter(account_id__in=account_ids)
+            .order_by("account_id", "id")
+            .values_list("account_id", "id", "after_balance", SIGNED_AMOUNT)
+        )
+        if not rows:
+            return len(balances), 0, []
+
+        account, pk, after_balance, signed_amount = np.array(rows, dtype=np.int64).T
+
+        starts = np.flatnonzero(np.r_[True, account[1:] != account[:-1]])
+        ends = np.r_[starts[1:], len(account)] - 1
+        segment = np.cumsum(np.r_[True, account[1:] != account[:-1]]) - 1
+
+        # 같은 계좌 안에서 직전 거래와 잔액이 이어지지 않는 지점
+        breaks = np.flatnonzero((account[1:] == account[:-1]) & (np.diff(after_balance) != signed_amount[1:])) + 1
+
+        # 첫 거래의 반영 전 잔액에서 거래 금액을 누적한 올바른 거래 후 잔액
+        cumulative = np.cumsum(signed_amount)
+        expected = (after_balance[starts] - cumulative[starts])[segment] + cumulative
+        off = expected != after_balance
+
+        issues = []
+        fixed_transactions = []
+        for i, start in enumerate(starts):
+            account_id = int(account[start])
+            expected_balance = int(expected[ends[i]])
+            rows_off = int(off[start : ends[i] + 1].sum())
+            if not rows_off and balances[account_id] == expected_balance:
+                continue
+
+            account_breaks = breaks[(breaks >= start) & (breaks <= ends[i])]
+            issues.append(
+                {
+                    "account": account_id,
+                    "balance": balances[account_id],
+                    "expected_balance": expected_balance,
+                    "rows_off": rows_off,
+                    "chain_breaks": [int(pk[index]) for index in account_breaks[:MAX_REPORTED_BREAKS]],
+                    "repaired": repair,
+                }
+            )
+            if repair:
+                fixed_transactions += [
+                    Transaction(id=int(pk[index]), after_balance=int(expected[index]))
+                    for index in np.flatnonzero(off[start : ends[i] + 1]) + start
+                ]
+                Account.objects.filter(id=account_id).update(balance=expected_balance)
+
+        if repair and issues:
+            Transaction.objects.bulk_update(fixed_transactions, ["after_balance"], batch_size=1000)
+            backfill_accounts([issue["account"] for issue in issues])
+            user_ids = Account.objects.filter(id__in=[issue["account"] for issue in issues]).values_list("user_id")
+            for user_id in {user_id for (user_id,) in user_ids}:
+                transaction.on_commit(partial(account_list_cache.invalidate, user_id))
+
+    return len(balances), len(rows), issues
+
+
+def reconcile_and_repair_accounts(account_ids):
+    return reconcile_accounts(account_ids, repair=True)
+
+
+class Command(BaseCommand):
+    help = "Django command to verify account balances against the after_balance chain of their transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="한 번에 처리할 계좌 수")
+        parser.add_argument("--workers", type=int, default=1, help="동시에 실행할 프로세스 수")
+        parser.add_argument("--repair", action="store_true", help="어긋난 거래 후 잔액과 계좌 잔액을 바로잡습니다.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        account_ids = Account.objects.order_by("id").values_list("id", flat=True)
+        func = reconcile_and_repair_accounts if options["repair"] else reconcile_accounts
+
+        # 다른 도구에서 읽을 수 있도록 한 줄에 JSON 하나씩 출력합니다.
+        total_accounts = total_transactions = total_issues = 0
+        for accounts, transactions, issues in run_in_chunks(
+            func, account_ids, options["chunk_size"], options["workers"]
+        ):
+            for issue in issues:
+                self.write_event("drift", **issue)
+            total_accounts += accounts
+            total_transactions += transactions
+            total_issues += len(issues)
+            elapsed = time.perf_counter() - started
+            self.write_event(
+                "progress",
+                accounts=total_accounts,
+                transactions=total_transactions,
+                issues=total_issues,
+                elapsed=round(elapsed, 3),
+                transactions_per_sec=round(total_transactions / elapsed, 1),
+            )
+
+        elapsed = time.perf_counter() - started
+        self.write_event(
+            "summary",
+            accounts=total_accounts,
+            transactions=total_transactions,
+            issues=total_issues,
+            repaired=options["repair"],
+            elapsed=round(elapsed, 3),
+            transactions_per_sec=round(total_transactions / elapsed, 1) if elapsed else 0,
+        )
+
+    def write_event(self, event, **data):
+        self.stdout.write(json.dumps({"event": event, **data}))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_rename_account_type_account_type"),
+        ("transactions", "0003_alter_transaction_trans_date_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["account", "trans_date", "trans_time", "id"], name="transaction_ledger_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_rename_account_type_account_type"),
+        ("transactions", "0004_transaction_transaction_ledger_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["account", "trans_type", "trans_date"], name="transaction_spending_idx"),
+        ),
+    ]
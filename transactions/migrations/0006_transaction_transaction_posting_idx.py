@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_dailybalancesnapshot"),
+        ("transactions", "0005_transaction_transaction_spending_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["account", "id"], name="transaction_posting_idx"),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.15 on 2026-10-18 11:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_account_users(apps, schema_editor):
+    Account = apps.get_model("accounts", "Account")
+    Transaction = apps.get_model("transactions", "Transaction")
+    Transaction.objects.filter(user__isnull=True).update(
+        user=Subquery(Account.objects.filter(id=OuterRef("account_id")).values("user_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_rename_account_type_account_type"),
+        ("transactions", "0007_idempotencykey"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="transactions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(copy_account_users, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="transaction",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="transactions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["user", "trans_date", "trans_time", "id"], name="transaction_user_ledger_idx"),
+        ),
+    ]
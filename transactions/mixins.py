@@ -0,0 +1,86 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from transactions.models import IdempotencyKey
+
+
+class IdempotencyMixin:
+    """
+    Idempotency-Key 헤더가 있는 등록 요청을 한 번만 처리하는 믹스인입니다.
+    처리 결과는 (user, key) 기준으로 캐시와 DB에 저장되며, 같은 키로 다시 요청하면
+    거래를 다시 반영하지 않고 처음 응답을 그대로 돌려줍니다.
+    """
+
+    idempotency_header = "Idempotency-Key"
+    idempotency_key_max_length = 255
+
+    def idempotent(self, request, handler):
+        key = request.headers.get(self.idempotency_header)
+        if key is None:
+            return handler()
+        if not key or len(key) > self.idempotency_key_max_length:
+            return Response(
+                {"detail": f"{self.idempotency_header} 헤더는 1~{self.idempotency_key_max_length}자여야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        request_hash = self.get_request_hash(request)
+        cache_key = f"idempotency:{request.user.pk}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+        # 캐시에 남아 있는 재요청은 DB를 거치지 않고 바로 응답합니다.
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return self.replay(request_hash, *cached)
+
+        with transaction.atomic():
+            try:
+                # 먼저 키를 선점합니다. 같은 키로 처리 중인 요청이 있으면 그 요청이 끝날 때까지 기다렸다가
+                # 유니크 제약 위반으로 실패하므로, 조회 후 저장하는 방식과 달리 중복 처리가 생기지 않습니다.
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(user=request.user, key=key, request_hash=request_hash)
+            except IntegrityError:
+                record = IdempotencyKey.objects.get(user=request.user, key=key)
+                cached = (record.request_hash, record.status_code, record.response_body)
+                cache.set(cache_key, cached, settings.IDEMPOTENCY_KEY_TTL)
+                return self.replay(request_hash, *cached)
+
+            response = handler()
+            if not status.is_success(response.status_code):
+                # 실패한 요청은 같은 키로 다시 시도할 수 있도록 키를 반납합니다.
+                record.delete()
+                return response
+
+            record.status_code = response.status_code
+            record.response_body = json.loads(json.dumps(response.data, cls=DjangoJSONEncoder))
+            record.save(update_fields=["status_code", "response_body"])
+
+        cache.set(cache_key, (request_hash, record.status_code, record.response_body), settings.IDEMPOTENCY_KEY_TTL)
+        return response
+
+    def replay(self, request_hash, saved_request_hash, status_code, response_body):
+        if request_hash != saved_request_hash:
+            return Response(
+                {"detail": f"같은 {self.idempotency_header}로 다른 요청을 보낼 수 없습니다."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        response = Response(response_body, status=status_code)
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    @staticmethod
+    def get_request_hash(request):
+        """
+        같은 키로 다른 내용의 요청이 들어왔는지 확인하기 위한 요청 본문 해시입니다.
+        업로드 파일은 내용을 다시 읽지 않도록 파일 이름과 크기만 사용합니다.
+        """
+        files = {name: [file.name, file.size] for name, file in request.FILES.items()}
+        data = request.data if not files else {key: value for key, value in request.data.items() if key not in files}
+        payload = json.dumps([request.path, data, files], cls=DjangoJSONEncoder, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
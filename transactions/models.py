@@ -1,10 +1,74 @@
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Case, F, When
 
+from accounts.models import Account, DailyBalanceSnapshot
+from analysis.models import DailyMerchantRollup, DailySpendingRollup
 from config.constants import TRANSACTION_METHOD, TRANSACTION_TYPE
 
+# 입금은 +, 출금은 - 부호를 붙인 거래 금액 (DB에서 잔액 변동분을 집계할 때 사용합니다.)
+SIGNED_AMOUNT = Case(When(trans_type="WITHDRAW", then=-F("trans_amount")), default=F("trans_amount"))
+
+
+class TransactionManager(models.Manager):
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        bulk_create는 save()를 거치지 않으므로, 사용자가 비어 있는 거래는 계좌의 사용자로 한 번에 채워 저장합니다.
+        """
+        objs = list(objs)
+        account_ids = {obj.account_id for obj in objs if obj.user_id is None}
+        if account_ids:
+            owners = dict(Account.objects.filter(id__in=account_ids).values_list("id", "user_id"))
+            for obj in objs:
+                if obj.user_id is None:
+                    obj.user_id = owners.get(obj.account_id)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def transfer(self, user, from_account_id, to_account_id, amount, trans_date, trans_time, print_content=""):
+        """
+        사용자의 두 계좌 사이에서 돈을 옮기고, 출금/입금 거래내역을 (출금, 입금) 순서로 반환합니다.
+        두 거래는 하나의 DB 트랜잭션으로 처리되므로 한쪽만 반영되는 일이 없습니다.
+        계좌 행은 항상 id 순서로 잠그기 때문에 A→B, B→A 이체가 동시에 들어와도 교착 상태가 생기지 않습니다.
+        """
+        if from_account_id == to_account_id:
+            raise ValueError("같은 계좌로는 이체할 수 없습니다.")
+
+        with transaction.atomic():
+            accounts = {
+                account.id: account
+                for account in Account.objects.select_for_update()
+                .filter(user=user, id__in=[from_account_id, to_account_id])
+                .order_by("id")
+            }
+            if len(accounts) != 2:
+                raise Account.DoesNotExist("존재하지 않는 계좌입니다.")
+
+            from_account, to_account = accounts[from_account_id], accounts[to_account_id]
+            legs = [
+                (from_account, "WITHDRAW", print_content or f"{to_account.masking_account_num()} 이체"),
+                (to_account, "DEPOSIT", print_content or f"{from_account.masking_account_num()} 입금"),
+            ]
+            return tuple(
+                self.create(
+                    account=account,
+                    trans_amount=amount,
+                    print_content=content,
+                    trans_type=trans_type,
+                    trans_method="TRANSFER",
+                    trans_date=trans_date,
+                    trans_time=trans_time,
+                )
+                for account, trans_type, content in legs
+            )
+
 
 class Transaction(models.Model):
     account = models.ForeignKey("accounts.Account", on_delete=models.CASCADE, related_name="transactions")
+    # 계좌의 사용자를 복사해 둔 값입니다. 사용자의 모든 계좌 거래를 (날짜, 시간, id) 순으로 바로 읽기 위해 사용합니다.
+    # (user로 시작하는 transaction_user_ledger_idx가 있으므로 따로 인덱스를 만들지 않습니다.)
+    user = models.ForeignKey(
+        "users.User", on_delete=models.CASCADE, related_name="transactions", editable=False, db_index=False
+    )
     trans_amount = models.IntegerField()
     after_balance = models.IntegerField()
     print_content = models.CharField(max_length=100)
@@ -13,41 +77,194 @@ class Transaction(models.Model):
     trans_date = models.DateField()
     trans_time = models.TimeField()
 
+    objects = TransactionManager()
+
+    class Meta:
+        indexes = [
+            # 사용자의 거래내역 목록을 (날짜, 시간, id) 순으로 읽는 키셋 페이지네이션용 인덱스
+            models.Index(fields=["user", "trans_date", "trans_time", "id"], name="transaction_user_ledger_idx"),
+            # 계좌 하나로 거른 거래내역 목록과 거래내역서용 인덱스
+            models.Index(fields=["account", "trans_date", "trans_time", "id"], name="transaction_ledger_idx"),
+            # 사용자의 기간별 입금/출금 내역을 조회하는 소비 분석용 인덱스
+            models.Index(fields=["account", "trans_type", "trans_date"], name="transaction_spending_idx"),
+            # 수정/삭제 시 이후에 반영된 거래(id가 더 큰 거래)의 잔액만 다시 계산하기 위한 인덱스
+            models.Index(fields=["account", "id"], name="transaction_posting_idx"),
+        ]
+
     def __str__(self):
         return f"{self.print_content} - {self.trans_amount}원"
 
     def validate_trans_amount(self):
         """
         거래 금액의 유효성을 검증하는 메서드입니다.
+        잔액 초과 출금 여부는 잔액을 반영하는 UPDATE 문에서 함께 검증합니다. (Account.objects.apply_balance_delta)
         """
         if self.trans_amount < 10:
             raise ValueError("거래금액은 원화 최소 단위인 10원보다 커야합니다.")
 
-        if self.get_trans_type_display() == "출금" and self.trans_amount > self.account.balance:
-            raise ValueError("계좌 잔액보다 큰 금액은 출금할 수 없습니다.")
+    def get_balance_delta(self):
+        """
+        거래 유형에 따른 계좌 잔액 변동분을 반환합니다. (입금: +, 출금: -)
+        """
+        if self.trans_type == "WITHDRAW":
+            return -self.trans_amount
+        return self.trans_amount
+
+    def get_trans_date(self):
+        """
+        거래일을 date로 반환합니다. 합계는 raw SQL로 반영하므로 ORM처럼 문자열("2024-09-01")을 변환해 주지 않습니다.
+        """
+        return Transaction._meta.get_field("trans_date").to_python(self.trans_date)
+
+    def get_rollup_delta(self, sign=1):
+        """
+        이 거래가 일자별 거래 합계(DailySpendingRollup)에 더하는 변동분을 반환합니다. 되돌릴 때는 sign=-1을 넘깁니다.
+        """
+        hour = Transaction._meta.get_field("trans_time").to_python(self.trans_time).hour
+        return self.get_trans_date(), hour, self.trans_type, self.trans_method, sign * self.trans_amount, sign
+
+    def get_merchant_rollup_delta(self, sign=1):
+        """
+        이 거래가 사용처별 거래 합계(DailyMerchantRollup)에 더하는 변동분을 반환합니다.
+        """
+        return self.get_trans_date(), self.trans_type, self.print_content, sign * self.trans_amount, sign
+
+    @staticmethod
+    def record_rollups(account_id, changes):
+        """
+        한 계좌의 (거래, 부호) 목록을 일자별 거래 합계와 사용처별 거래 합계에 한 번씩 반영합니다.
+        """
+        DailySpendingRollup.objects.record(account_id, [trans.get_rollup_delta(sign) for trans, sign in changes])
+        DailyMerchantRollup.objects.record(
+            account_id, [trans.get_merchant_rollup_delta(sign) for trans, sign in changes]
+        )
 
     def set_after_balance(self):
         """
-        거래 후 잔액을 설정하는 메서드입니다.
-        이 메서드는 validate_trans_amount 메서드 후에 호출되어야 합니다.
+        거래 금액을 계좌 잔액에 원자적으로 반영하고, 그 결과로 거래 후 잔액을 설정하는 메서드입니다.
+        메모리에 올라와 있는 계좌 객체의 잔액은 오래된 값일 수 있으므로 사용하지 않습니다.
+        """
+        self.validate_trans_amount()
+
+        self.after_balance = Account.objects.apply_balance_delta(self.account_id, self.get_balance_delta())
+
+        # 이미 불러온 계좌 객체가 있다면 최신 잔액으로 맞춰줍니다.
+        if Transaction.account.is_cached(self):
+            self.account.balance = self.after_balance
+
+    def lock_account(self):
+        """
+        거래를 수정/삭제하기 전에 계좌 행부터 잠급니다.
+        잔액 반영과 이후 거래 갱신은 모두 계좌 잠금 아래에서 일어나므로, 계좌 → 거래 순서로만 잠그면
+        같은 계좌의 거래를 동시에 수정/삭제해도 서로의 잠금을 기다리는 교착 상태가 생기지 않습니다.
+        """
+        return Account.objects.select_for_update().get(pk=self.account_id)
+
+    def shift_later_balances(self, account, delta):
+        """
+        계좌 잔액과, 이 거래 이후에 반영된 거래들(id가 더 큰 거래)의 거래 후 잔액을 delta 만큼 옮기고 계좌 잔액을 반환합니다.
+        거래 후 잔액은 반영 순서대로 이어지므로 앞선 거래들은 다시 계산할 필요가 없고,
+        뒤따르는 거래들은 모두 같은 만큼 바뀌므로 UPDATE 한 번으로 처리됩니다. (비용은 이후 거래 수에만 비례합니다.)
+        account는 lock_account로 잠근 계좌이며, delta가 0이면 아무것도 고치지 않고 그 잔액을 반환합니다.
+        """
+        if not delta:
+            return account.balance
+
+        balance = Account.objects.apply_balance_delta(self.account_id, delta)
+
+        later_transactions = Transaction.objects.filter(account_id=self.account_id, id__gt=self.pk)
+        if delta < 0 and later_transactions.filter(after_balance__lt=-delta).exists():
+            raise ValueError("이후 거래의 잔액이 부족하여 변경할 수 없습니다.")
+        later_transactions.update(after_balance=F("after_balance") + delta)
+
+        return balance
+
+    def rebalance(self):
+        """
+        이미 반영된 거래가 수정되었을 때, 금액/유형 변경분만 계좌 잔액과 이후 거래들에 반영하는 메서드입니다.
+        거래일이 바뀐 경우 일자별 잔액 스냅샷도 기존 일자에서 새 일자로 옮겨줍니다.
         """
         self.validate_trans_amount()
 
-        trans_type = self.get_trans_type_display()
+        account = self.lock_account()
+        old = Transaction.objects.select_for_update().get(pk=self.pk)
+        if old.account_id != self.account_id:
+            raise ValueError("거래내역의 계좌는 변경할 수 없습니다.")
 
-        if trans_type == "입금":
-            self.after_balance = self.account.balance + self.trans_amount
-        elif trans_type == "출금":
-            self.after_balance = self.account.balance - self.trans_amount
-        self.account.balance = self.after_balance
-        self.account.save()
+        # 일자별/사용처별 거래 합계는 거래 방법이나 내용만 바뀌어도 달라지므로 잔액 변동과 상관없이 먼저 옮겨줍니다.
+        self.record_rollups(self.account_id, [(old, -1), (self, 1)])
+
+        old_delta = old.get_balance_delta()
+        new_delta = self.get_balance_delta()
+        self.after_balance = old.after_balance + new_delta - old_delta
+        if old_delta == new_delta and old.trans_date == self.trans_date:
+            return
+        if self.after_balance < 0:
+            raise ValueError("계좌 잔액보다 큰 금액은 출금할 수 없습니다.")
+
+        balance = self.shift_later_balances(account, new_delta - old_delta)
+
+        if old.trans_date == self.trans_date:
+            DailyBalanceSnapshot.objects.record(self.account_id, self.trans_date, new_delta - old_delta, balance)
+        else:
+            DailyBalanceSnapshot.objects.record(self.account_id, old.trans_date, -old_delta, balance - new_delta)
+            DailyBalanceSnapshot.objects.record(self.account_id, self.trans_date, new_delta, balance)
 
     def save(self, *args, **kwargs):
         """
-        만약 객체를 저장하기 전에 after_balance가 지정되어있지 않다면 자동으로 계산하여 설정합니다.
+        잔액 반영과 거래내역 저장을 하나의 DB 트랜잭션으로 묶어 처리합니다.
+        저장에 실패하면 잔액 변경도 함께 롤백됩니다.
+        """
+        with transaction.atomic():
+            if self._state.adding:
+                if self.user_id is None:
+                    self.user_id = self.account.user_id
+                # 거래 후 잔액을 설정하는 메서드 호출
+                self.set_after_balance()
+                DailyBalanceSnapshot.objects.record(
+                    self.account_id, self.trans_date, self.get_balance_delta(), self.after_balance
+                )
+                self.record_rollups(self.account_id, [(self, 1)])
+            else:
+                # 이미 반영된 거래를 수정하는 경우 변경분만 다시 반영합니다.
+                self.rebalance()
+
+            # 부모 클래스의 save 메서드를 호출하여 데이터베이스에 저장
+            return super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        거래내역을 삭제하면서 이 거래가 계좌 잔액과 이후 거래들에 반영했던 금액을 되돌립니다.
         """
-        # 거래 후 잔액을 설정하는 메서드 호출
-        self.set_after_balance()
+        with transaction.atomic():
+            account = self.lock_account()
+            old = Transaction.objects.select_for_update().get(pk=self.pk)
+            delta = -old.get_balance_delta()
+            balance = self.shift_later_balances(account, delta)
+            DailyBalanceSnapshot.objects.record(self.account_id, old.trans_date, delta, balance)
+            self.record_rollups(self.account_id, [(old, -1)])
+
+            return super().delete(*args, **kwargs)
+
+
+class IdempotencyKey(models.Model):
+    """
+    Idempotency-Key 헤더로 들어온 거래 등록 요청의 처리 결과입니다.
+    (user, key) 유니크 제약으로 같은 요청이 동시에 들어와도 한 번만 처리됩니다.
+    """
 
-        # 부모 클래스의 save 메서드를 호출하여 데이터베이스에 저장
-        return super().save(*args, **kwargs)
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    # 보관 기간이 지난 키를 주기적으로 삭제할 때 사용합니다. (transactions.tasks.purge_expired_idempotency_keys)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="unique_user_idempotency_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.key}"
@@ -0,0 +1,100 @@
+import base64
+from datetime import date, time
+
+from django.db import models
+from django.db.models import F, Func, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class Row(Func):
+    """
+    여러 컬럼을 (a, b, c) < (x, y, z) 형태의 행 값으로 비교하기 위한 표현식입니다.
+    PostgreSQL은 행 값 비교를 복합 인덱스 범위 탐색으로 처리할 수 있습니다.
+    """
+
+    function = "ROW"
+    output_field = models.Field()
+
+
+class TransactionCursorPagination(BasePagination):
+    """
+    (trans_date, trans_time, id) 기준의 키셋(커서) 페이지네이션입니다.
+    OFFSET 없이 마지막으로 본 거래 다음부터 읽기 때문에 페이지가 뒤로 갈수록 느려지지 않고,
+    중간에 거래가 추가되어도 같은 거래가 두 번 나오거나 빠지지 않습니다.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering = ("-trans_date", "-trans_time", "-id")
+    invalid_cursor_message = "잘못된 커서입니다."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.alias(ledger_key=Row(F("trans_date"), F("trans_time"), F("id"))).filter(
+                ledger_key__lt=Row(*(Value(value) for value in position))
+            )
+
+        # 다음 페이지가 있는지 확인하기 위해 한 건 더 가져옵니다.
+        results = list(queryset[: page_size + 1])
+        self.has_next = len(results) > page_size
+        results = results[:page_size]
+        self.next_position = self.get_position(results[-1]) if self.has_next else None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    @staticmethod
+    def get_position(row):
+        if isinstance(row, dict):
+            return row["trans_date"], row["trans_time"], row["id"]
+        return row.trans_date, row.trans_time, row.id
+
+    @staticmethod
+    def encode_cursor(position):
+        trans_date, trans_time, pk = position
+        raw = f"{trans_date.isoformat()}|{trans_time.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            trans_date, trans_time, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split("|")
+            return date.fromisoformat(trans_date), time.fromisoformat(trans_time), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
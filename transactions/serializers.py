@@ -1,12 +1,19 @@
+from django.utils import timezone
 from rest_framework import serializers
 
+from config.constants import (
+    TRANSACTION_METHOD,
+    TRANSACTION_METHOD_LABELS,
+    TRANSACTION_TYPE,
+    TRANSACTION_TYPE_LABELS,
+)
 from transactions.models import Transaction
 
 
 class TransactionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaction
-        fields = "__all__"
+        exclude = ["user"]
         read_only_fields = [
             "after_balance",
         ]
@@ -18,10 +25,43 @@ class TransactionSerializer(serializers.ModelSerializer):
         return data
 
 
+class TransactionValuesSerializer(serializers.BaseSerializer):
+    """
+    거래내역 목록 조회용 읽기 전용 시리얼라이저입니다.
+    모델 객체 대신 .values(*value_fields)로 읽은 dict를 받아 TransactionSerializer와 같은 형태로 바로 변환하므로,
+    행마다 필드 객체를 거치거나 get_*_display를 호출하지 않습니다. (없는 코드는 get_*_display처럼 값을 그대로 보여줍니다.)
+    """
+
+    value_fields = (
+        "id",
+        "account_id",
+        "trans_amount",
+        "after_balance",
+        "print_content",
+        "trans_type",
+        "trans_method",
+        "trans_date",
+        "trans_time",
+    )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "account": row["account_id"],
+            "trans_amount": row["trans_amount"],
+            "after_balance": row["after_balance"],
+            "print_content": row["print_content"],
+            "trans_type": TRANSACTION_TYPE_LABELS.get(row["trans_type"], row["trans_type"]),
+            "trans_method": TRANSACTION_METHOD_LABELS.get(row["trans_method"], row["trans_method"]),
+            "trans_date": row["trans_date"].isoformat(),
+            "trans_time": row["trans_time"].isoformat(),
+        }
+
+
 class TransactionDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaction
-        fields = "__all__"
+        exclude = ["user"]
         depth = 1
 
     def to_representation(self, instance):
@@ -30,3 +70,60 @@ class TransactionDetailSerializer(serializers.ModelSerializer):
         data["trans_method"] = instance.get_trans_method_display()
         data["account"]["account_num"] = instance.account.masking_account_num()
         return data
+
+
+class TransactionBulkRowSerializer(serializers.ModelSerializer):
+    """
+    일괄 등록 시 한 행을 검증하는 시리얼라이저입니다.
+    계좌는 행마다 조회하지 않도록 id만 검증하고, 소유 여부는 TransactionBulkImporter에서 한 번에 확인합니다.
+    """
+
+    account = serializers.IntegerField()
+
+    class Meta:
+        model = Transaction
+        fields = ("account", "trans_amount", "print_content", "trans_type", "trans_method", "trans_date", "trans_time")
+
+
+class TransferSerializer(serializers.Serializer):
+    """
+    계좌 간 이체 요청을 검증하는 시리얼라이저입니다.
+    """
+
+    from_account = serializers.IntegerField()
+    to_account = serializers.IntegerField()
+    amount = serializers.IntegerField(min_value=10)
+    print_content = serializers.CharField(max_length=100, required=False, default="")
+    trans_date = serializers.DateField(required=False)
+    trans_time = serializers.TimeField(required=False)
+
+    def validate(self, attrs):
+        if attrs["from_account"] == attrs["to_account"]:
+            raise serializers.ValidationError("같은 계좌로는 이체할 수 없습니다.")
+        now = timezone.localtime()
+        attrs.setdefault("trans_date", now.date())
+        attrs.setdefault("trans_time", now.time())
+        return attrs
+
+
+class TransactionFilterSerializer(serializers.Serializer):
+    """
+    거래내역 목록/내보내기의 검색 조건(query params)을 검증하는 시리얼라이저입니다.
+    """
+
+    date = serializers.DateField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    time_from = serializers.TimeField(required=False)
+    time_to = serializers.TimeField(required=False)
+    amount_min = serializers.IntegerField(required=False, min_value=0)
+    amount_max = serializers.IntegerField(required=False, min_value=0)
+    trans_type = serializers.ChoiceField(choices=TRANSACTION_TYPE, required=False)
+    trans_method = serializers.ChoiceField(choices=TRANSACTION_METHOD, required=False)
+    account = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        for start, end in (("date_from", "date_to"), ("time_from", "time_to"), ("amount_min", "amount_max")):
+            if start in attrs and end in attrs and attrs[start] > attrs[end]:
+                raise serializers.ValidationError({end: f"{end}는 {start}보다 크거나 같아야 합니다."})
+        return attrs
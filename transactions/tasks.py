@@ -0,0 +1,14 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from transactions.models import IdempotencyKey
+
+
+@shared_task
+def purge_expired_idempotency_keys():
+    expired_at = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expired_at).delete()
+    return deleted
@@ -1,15 +1,28 @@
+import json
 import random
+import threading
 from datetime import datetime, timedelta
+from io import StringIO
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models import F
 from django.test import TestCase
+from django.test import TransactionTestCase as DjangoTransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from accounts.models import Account
-from transactions.models import Transaction
+from accounts.models import Account, DailyBalanceSnapshot
+from transactions.models import IdempotencyKey, Transaction
+from transactions.serializers import TransactionSerializer, TransactionValuesSerializer
+from transactions.tasks import purge_expired_idempotency_keys
 
 
 class TransactionTestCase(TestCase):
@@ -81,6 +94,158 @@ class TransactionTestCase(TestCase):
         self.assertFalse(Account.objects.filter(user_id=self.user.id).exists())
         self.assertFalse(Transaction.objects.filter(account__user_id=self.user.id).exists())
 
+    def test_transaction_values_serializer_matches_transaction_serializer(self):
+        Transaction.objects.create(**self.transaction_data)
+        Transaction.objects.create(**{**self.transaction_data, "trans_type": "DEPOSIT", "trans_method": "CARD"})
+
+        queryset = Transaction.objects.order_by("id")
+        values = TransactionValuesSerializer(queryset.values(*TransactionValuesSerializer.value_fields), many=True).data
+
+        self.assertEqual(values, TransactionSerializer(queryset, many=True).data)
+
+
+class TransactionConcurrencyTestCase(DjangoTransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+        )
+        self.account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=100000, type="CHECKING"
+        )
+
+    def run_in_threads(self, target, count):
+        errors = []
+
+        def wrapper(i):
+            try:
+                target(i)
+            except ValueError as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=wrapper, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def post(self, trans_type, trans_amount):
+        return Transaction.objects.create(
+            account_id=self.account.id,
+            trans_amount=trans_amount,
+            print_content=f"동시성 {trans_type} Test",
+            trans_type=trans_type,
+            trans_method="CARD",
+            trans_date=datetime.now().date(),
+            trans_time=datetime.now().time(),
+        )
+
+    def test_concurrent_postings_have_no_balance_drift(self):
+        def target(i):
+            for _ in range(10):
+                self.post("DEPOSIT" if i % 2 else "WITHDRAW", 1000)
+
+        errors = self.run_in_threads(target, 8)
+
+        self.assertEqual(errors, [])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 100000)
+        # 거래 후 잔액이 직전 거래의 잔액에 이어지는지 확인
+        balance = 100000
+        for transaction in Transaction.objects.filter(account=self.account).order_by("id"):
+            balance += transaction.get_balance_delta()
+            self.assertEqual(transaction.after_balance, balance)
+
+    def test_concurrent_withdrawals_never_overdraw(self):
+        errors = self.run_in_threads(lambda i: self.post("WITHDRAW", 30000), 8)
+
+        self.account.refresh_from_db()
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(Transaction.objects.filter(account=self.account).count(), 3)
+        self.assertEqual(self.account.balance, 10000)
+
+    def test_concurrent_edits_and_deletes_on_one_account_do_not_deadlock(self):
+        transactions = [self.post("DEPOSIT", 1000) for _ in range(8)]
+        database_errors = []
+
+        def target(i):
+            # 짝수 스레드는 앞쪽 거래를 고치고(이후 거래 갱신), 홀수 스레드는 뒤쪽 거래를 지웁니다.
+            try:
+                transaction = Transaction.objects.get(pk=transactions[i].pk)
+                if i % 2:
+                    transaction.delete()
+                else:
+                    transaction.trans_amount += 1000
+                    transaction.save()
+            except DatabaseError as e:
+                database_errors.append(e)
+
+        errors = self.run_in_threads(target, len(transactions))
+
+        self.assertEqual((errors, database_errors), ([], []))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 100000 + 4 * 2000)
+        balance = 100000
+        for transaction in Transaction.objects.filter(account=self.account).order_by("id"):
+            balance += transaction.get_balance_delta()
+            self.assertEqual(transaction.after_balance, balance)
+
+    def test_concurrent_opposing_transfers_do_not_deadlock(self):
+        other = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-7777777", bank_code="090", balance=100000, type="CHECKING"
+        )
+
+        def target(i):
+            from_account, to_account = (self.account, other) if i % 2 else (other, self.account)
+            for _ in range(10):
+                Transaction.objects.transfer(
+                    self.user, from_account.id, to_account.id, 1000, datetime.now().date(), datetime.now().time()
+                )
+
+        errors = self.run_in_threads(target, 8)
+
+        self.assertEqual(errors, [])
+        self.account.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.account.balance, other.balance), (100000, 100000))
+        self.assertEqual(Transaction.objects.filter(trans_type="WITHDRAW").count(), 80)
+        self.assertEqual(Transaction.objects.filter(trans_type="DEPOSIT").count(), 80)
+
+    def test_concurrent_requests_with_same_idempotency_key(self):
+        cache.clear()
+        data = {
+            "account": self.account.id,
+            "trans_amount": 1000,
+            "print_content": "동시 재시도 Test",
+            "trans_type": "WITHDRAW",
+            "trans_method": "CARD",
+            "trans_date": "2024-09-01",
+            "trans_time": "12:00:00",
+        }
+        responses = []
+
+        def target(i):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            response = client.post(
+                reverse("transaction-list"), data, format="json", headers={"Idempotency-Key": "concurrent-key"}
+            )
+            responses.append(response.status_code)
+
+        errors = self.run_in_threads(target, 8)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(responses, [status.HTTP_201_CREATED] * 8)
+        self.assertEqual(Transaction.objects.filter(account=self.account).count(), 1)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 99000)
+
 
 class TransactionViewTestCase(APITestCase):
     def setUp(self):
@@ -179,11 +344,75 @@ class TransactionViewTestCase(APITestCase):
                 trans_time=datetime.now().time(),
             )
 
-        response = self.client.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
+        response = self.client.get(url, {"page_size": 100}, headers={"Authorization": f"Bearer {self.access_token}"})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Transaction.objects.count(), 60)
-        self.assertEqual(len(response.data), 60)
+        self.assertEqual(len(response.data["results"]), 60)
+        self.assertIsNone(response.data["next"])
+
+    def test_transaction_list_view_cursor_pagination(self):
+        url = reverse("transaction-list")
+        for i in range(25):
+            Transaction.objects.create(
+                account_id=self.account.id,
+                trans_amount=1000,
+                print_content=f"{i + 1}. 입금 Test",
+                trans_type="DEPOSIT",
+                trans_method="TRANSFER",
+                trans_date=datetime(2024, 9, 1).date() + timedelta(days=i // 5),
+                trans_time=datetime(2024, 9, 1, 12, 0).time(),
+            )
+
+        ids = []
+        next_url = f"{url}?page_size=10"
+        while next_url:
+            # 페이지 위치와 상관없이 인증 1 + 목록 조회 1 쿼리만 사용해야 합니다.
+            with self.assertNumQueries(2):
+                response = self.client.get(next_url, headers={"Authorization": f"Bearer {self.access_token}"})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [transaction["id"] for transaction in response.data["results"]]
+            next_url = response.data["next"]
+
+        expected_ids = Transaction.objects.order_by("-trans_date", "-trans_time", "-id").values_list("id", flat=True)
+        self.assertEqual(ids, list(expected_ids))
+
+    def test_transaction_list_view_invalid_cursor(self):
+        url = reverse("transaction-list")
+
+        response = self.client.get(url, {"cursor": "invalid"}, headers={"Authorization": f"Bearer {self.access_token}"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_transaction_list_view_only_returns_own_transactions(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword1234",
+            nickname="otheruser",
+            name="김철수",
+            phone="010-3333-4444",
+            is_active=True,
+        )
+        other_account = Account.objects.create(
+            user_id=other_user.id, account_num="3333-54-9999999", bank_code="090", balance=1000000, type="CHECKING"
+        )
+        for account in (self.account, other_account):
+            Transaction.objects.create(
+                account_id=account.id,
+                trans_amount=18000,
+                print_content="유튜브 구독 정기결제",
+                trans_type="WITHDRAW",
+                trans_method="AUTOMATIC_TRANSFER",
+                trans_date=datetime.now().date(),
+                trans_time=datetime.now().time(),
+            )
+
+        response = self.client.get(
+            reverse("transaction-list"), headers={"Authorization": f"Bearer {self.access_token}"}
+        )
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["account"], self.account.id)
 
     def test_transaction_detail_view(self):
         transaction = Transaction.objects.create(
@@ -247,3 +476,615 @@ class TransactionViewTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(response.data["detail"], "거래내역이 성공적으로 삭제되었습니다.")
         self.assertFalse(Transaction.objects.filter(id=transaction.id).exists())
+
+
+class TransactionBulkCreateViewTestCase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        self.account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=10000, type="CHECKING"
+        )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.url = reverse("transaction-bulk")
+
+    def make_row(self, trans_type, trans_amount, trans_date, trans_time="12:00:00"):
+        return {
+            "account": self.account.id,
+            "trans_amount": trans_amount,
+            "print_content": f"일괄 {trans_type}",
+            "trans_type": trans_type,
+            "trans_method": "CARD",
+            "trans_date": trans_date,
+            "trans_time": trans_time,
+        }
+
+    def test_bulk_create_with_json(self):
+        rows = [
+            self.make_row("WITHDRAW", 5000, "2024-09-03"),
+            self.make_row("DEPOSIT", 20000, "2024-09-01"),
+            self.make_row("WITHDRAW", 3000, "2024-09-02", "09:00:00"),
+        ]
+
+        response = self.client.post(
+            self.url, rows, format="json", headers={"Authorization": f"Bearer {self.access_token}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(response.data["failed"], 0)
+        self.assertIn("rows_per_sec", response.data)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 22000)
+        after_balances = Transaction.objects.order_by("trans_date").values_list("after_balance", flat=True)
+        self.assertEqual(list(after_balances), [30000, 27000, 22000])
+        snapshots = DailyBalanceSnapshot.objects.order_by("date").values_list("opening_balance", "closing_balance")
+        self.assertEqual(list(snapshots), [(10000, 30000), (30000, 27000), (27000, 22000)])
+
+    def test_bulk_create_reports_row_errors_without_aborting(self):
+        rows = [
+            self.make_row("DEPOSIT", 1000, "2024-09-01"),
+            self.make_row("WITHDRAW", 5, "2024-09-02"),
+            self.make_row("WITHDRAW", 50000, "2024-09-03"),
+            {**self.make_row("DEPOSIT", 1000, "2024-09-04"), "account": self.account.id + 100},
+            {**self.make_row("DEPOSIT", 1000, "2024-09-05"), "trans_type": "UNKNOWN"},
+        ]
+
+        response = self.client.post(
+            self.url, rows, format="json", headers={"Authorization": f"Bearer {self.access_token}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3, 4, 5])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 11000)
+
+    def test_bulk_create_with_csv(self):
+        lines = ["account,trans_amount,print_content,trans_type,trans_method,trans_date,trans_time"]
+        for day in range(1, 11):
+            lines.append(f"{self.account.id},1000,CSV 입금,DEPOSIT,TRANSFER,2024-09-{day:02d},10:00:00")
+        file = SimpleUploadedFile("transactions.csv", "\n".join(lines).encode(), content_type="text/csv")
+
+        response = self.client.post(
+            self.url, {"file": file}, format="multipart", headers={"Authorization": f"Bearer {self.access_token}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 10)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 20000)
+
+    def test_bulk_create_query_count_does_not_grow_with_rows(self):
+        rows = [self.make_row("DEPOSIT", 1000, f"2024-09-{day:02d}") for day in range(1, 31)]
+
+        # 인증(사용자 조회) 1 + 계좌 id 조회 1 + 트랜잭션 시작/종료(savepoint) 2 + 계좌 잠금 1 + bulk_create 1 + 잔액 갱신 1
+        # + 계좌별 잔액 스냅샷 조회 2, 생성 1 + 계좌별 일자별 거래 합계 갱신 1 + 사용처별 합계 갱신 1
+        with self.assertNumQueries(12):
+            response = self.client.post(
+                self.url, rows, format="json", headers={"Authorization": f"Bearer {self.access_token}"}
+            )
+
+        self.assertEqual(response.data["created"], 30)
+
+
+class TransferViewTestCase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        self.from_account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=50000, type="CHECKING"
+        )
+        self.to_account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-7777777", bank_code="090", balance=0, type="SAVING"
+        )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.url = reverse("transaction-transfer")
+
+    def transfer(self, **data):
+        data = {"from_account": self.from_account.id, "to_account": self.to_account.id, "amount": 30000, **data}
+        return self.client.post(self.url, data, format="json", headers={"Authorization": f"Bearer {self.access_token}"})
+
+    def test_transfer(self):
+        response = self.transfer(trans_date="2024-09-01", trans_time="12:00:00")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["withdraw"]["after_balance"], 20000)
+        self.assertEqual(response.data["deposit"]["after_balance"], 30000)
+        self.assertEqual(response.data["withdraw"]["trans_method"], "계좌이체")
+        self.from_account.refresh_from_db()
+        self.to_account.refresh_from_db()
+        self.assertEqual((self.from_account.balance, self.to_account.balance), (20000, 30000))
+        snapshots = DailyBalanceSnapshot.objects.order_by("account_id").values_list("closing_balance", flat=True)
+        self.assertEqual(list(snapshots), [20000, 30000])
+
+    def test_transfer_failed_by_insufficient_balance_posts_nothing(self):
+        response = self.transfer(amount=60000)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Transaction.objects.exists())
+        self.from_account.refresh_from_db()
+        self.to_account.refresh_from_db()
+        self.assertEqual((self.from_account.balance, self.to_account.balance), (50000, 0))
+
+    def test_transfer_failed_by_same_account(self):
+        response = self.transfer(to_account=self.from_account.id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_transfer_to_other_users_account(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword1234",
+            nickname="other",
+            name="김철수",
+            phone="010-3333-4444",
+        )
+        other_account = Account.objects.create(user_id=other_user.id, account_num="1111-11-1111111", balance=0)
+
+        response = self.transfer(to_account=other_account.id)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Transaction.objects.exists())
+
+
+class TransactionFilterTestCase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        self.account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=10000000, type="CHECKING"
+        )
+        self.other_account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-7777777", bank_code="090", balance=0, type="SAVING"
+        )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.url = reverse("transaction-list")
+
+        for i in range(10):
+            Transaction.objects.create(
+                account_id=self.account.id,
+                trans_amount=10000 * (i + 1),
+                print_content=f"{i + 1}. 카드결제",
+                trans_type="WITHDRAW",
+                trans_method="CARD" if i % 2 else "TRANSFER",
+                trans_date=datetime(2024, 9, 1).date() + timedelta(days=i),
+                trans_time=datetime(2024, 9, 1, 8 + i).time(),
+            )
+        Transaction.objects.create(
+            account_id=self.other_account.id,
+            trans_amount=50000,
+            print_content="적금 입금",
+            trans_type="DEPOSIT",
+            trans_method="AUTOMATIC_TRANSFER",
+            trans_date=datetime(2024, 9, 5).date(),
+            trans_time=datetime(2024, 9, 5, 12).time(),
+        )
+
+    def get(self, params):
+        return self.client.get(self.url, params, headers={"Authorization": f"Bearer {self.access_token}"})
+
+    def test_filter_by_date_range(self):
+        response = self.get({"date_from": "2024-09-03", "date_to": "2024-09-05"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertTrue(all("2024-09-03" <= row["trans_date"] <= "2024-09-05" for row in response.data["results"]))
+
+    def test_filter_by_time_range(self):
+        response = self.get({"time_from": "10:00", "time_to": "12:00"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 4)
+
+    def test_filter_by_amount_range_and_method(self):
+        response = self.get({"amount_min": 50000, "trans_method": "CARD", "trans_type": "WITHDRAW"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["trans_amount"] for row in response.data["results"]], [100000, 80000, 60000])
+
+    def test_filter_by_account(self):
+        response = self.get({"account": self.other_account.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["account"], self.other_account.id)
+
+    def test_filter_with_invalid_params(self):
+        self.assertEqual(self.get({"date_from": "2024-13-01"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get({"trans_method": "CASH"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.get({"amount_min": 5000, "amount_max": 1000})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("amount_max", response.data)
+
+
+class TransactionExportViewTestCase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        self.account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=1000000, type="CHECKING"
+        )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        for i in range(5):
+            Transaction.objects.create(
+                account_id=self.account.id,
+                trans_amount=1000 * (i + 1),
+                print_content=f"{i + 1}. 카드결제",
+                trans_type="WITHDRAW",
+                trans_method="CARD",
+                trans_date=datetime(2024, 9, 1).date() + timedelta(days=i),
+                trans_time=datetime(2024, 9, 1, 12).time(),
+            )
+
+    def export(self, file_type, params=None):
+        url = reverse("transaction-export", kwargs={"file_type": file_type})
+        response = self.client.get(url, params, headers={"Authorization": f"Bearer {self.access_token}"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode("utf-8-sig")
+
+    def test_export_csv(self):
+        content = self.export("csv")
+
+        lines = content.splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[0].startswith("id,account,trans_date"))
+        self.assertIn("2024-09-01,12:00:00,출금,카드결제,1000,999000,1. 카드결제", lines[1])
+
+    def test_export_ndjson_with_filters(self):
+        content = self.export("ndjson", {"date_from": "2024-09-04"})
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["trans_type"], "출금")
+        self.assertEqual(rows[0]["trans_method"], "카드결제")
+        self.assertEqual(rows[1]["trans_date"], "2024-09-05")
+
+    def test_export_unknown_codes_as_is(self):
+        Transaction.objects.filter(trans_date="2024-09-05").update(trans_type="LEGACY", trans_method="POINT")
+
+        content = self.export("ndjson", {"date_from": "2024-09-05"})
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["trans_type"], "LEGACY")
+        self.assertEqual(rows[0]["trans_method"], "POINT")
+
+    def test_api_schema_documents_export_without_errors(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        # 스키마를 만들다 뷰에서 예외가 나면 drf_yasg가 경고 로그를 남기고 그 API를 잘못 문서화합니다.
+        with self.assertNoLogs("drf_yasg", level="WARNING"):
+            response = self.client.get(
+                "/swagger/?format=openapi", headers={"Authorization": f"Bearer {self.access_token}"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        export = json.loads(response.content)["paths"]["/transactions/export/{file_type}/"]["get"]
+        self.assertIn("date_from", [parameter["name"] for parameter in export["parameters"]])
+        self.assertEqual(export["responses"]["200"]["schema"]["type"], "file")
+
+    def test_export_unsupported_file_type(self):
+        url = reverse("transaction-export", kwargs={"file_type": "xlsx"})
+
+        response = self.client.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TransactionRebalanceTestCase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        self.account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=100000, type="CHECKING"
+        )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.transactions = [
+            Transaction.objects.create(
+                account_id=self.account.id,
+                trans_amount=10000,
+                print_content=f"{i + 1}. 출금 Test",
+                trans_type="WITHDRAW",
+                trans_method="CARD",
+                trans_date=datetime(2024, 9, 1).date() + timedelta(days=i),
+                trans_time=datetime(2024, 9, 1, 12).time(),
+            )
+            for i in range(5)
+        ]
+
+    def get_after_balances(self):
+        return list(
+            Transaction.objects.filter(account=self.account).order_by("id").values_list("after_balance", flat=True)
+        )
+
+    def test_update_amount_rebalances_later_transactions(self):
+        url = reverse("transaction-detail", kwargs={"pk": self.transactions[1].id})
+
+        response = self.client.patch(
+            url, {"trans_amount": 30000}, headers={"Authorization": f"Bearer {self.access_token}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["after_balance"], 60000)
+        self.assertEqual(self.get_after_balances(), [90000, 60000, 50000, 40000, 30000])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 30000)
+        snapshot = DailyBalanceSnapshot.objects.get(account=self.account, date=datetime(2024, 9, 5).date())
+        self.assertEqual(snapshot.closing_balance, 30000)
+
+    def test_update_without_amount_change_keeps_balances(self):
+        transaction = self.transactions[2]
+        transaction.trans_method = "TRANSFER"
+
+        transaction.save()
+
+        self.assertEqual(self.get_after_balances(), [90000, 80000, 70000, 60000, 50000])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 50000)
+
+    def test_date_only_edit_does_not_touch_later_transactions(self):
+        transaction = self.transactions[1]
+        transaction.trans_date = datetime(2024, 9, 10).date()
+
+        with CaptureQueriesContext(connection) as queries:
+            transaction.save()
+
+        # 잔액 변동이 없으므로 계좌 잔액과 이후 거래들은 고치지 않고, 이 거래만 저장합니다.
+        updates = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+        self.assertFalse([sql for sql in updates if '"accounts_account"' in sql])
+        self.assertEqual(len([sql for sql in updates if sql.startswith('UPDATE "transactions_transaction"')]), 1)
+        self.assertEqual(self.get_after_balances(), [90000, 80000, 70000, 60000, 50000])
+        snapshot = DailyBalanceSnapshot.objects.get(account=self.account, date=datetime(2024, 9, 10).date())
+        self.assertEqual(snapshot.closing_balance, 50000)
+
+    def test_update_trans_type_rebalances(self):
+        transaction = self.transactions[3]
+        transaction.trans_type = "DEPOSIT"
+
+        transaction.save()
+
+        self.assertEqual(self.get_after_balances(), [90000, 80000, 70000, 80000, 70000])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 70000)
+
+    def test_update_cost_does_not_depend_on_history_length(self):
+        url = reverse("transaction-detail", kwargs={"pk": self.transactions[-1].id})
+
+        # 인증 1 + 조회 2(거래, 계좌) + savepoint 2 + 계좌 잠금 1 + 기존 거래 잠금 1 + 잔액 반영 2 + 이후 거래 갱신 1
+        # + 스냅샷 갱신 2 + 일자별 거래 합계 갱신 1 + 사용처별 합계 갱신 1 + 저장 1
+        with self.assertNumQueries(15):
+            response = self.client.patch(
+                url, {"trans_amount": 5000}, headers={"Authorization": f"Bearer {self.access_token}"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_after_balances(), [90000, 80000, 70000, 60000, 55000])
+
+    def test_update_failed_when_later_balance_goes_negative(self):
+        url = reverse("transaction-detail", kwargs={"pk": self.transactions[0].id})
+
+        response = self.client.patch(
+            url, {"trans_amount": 70000}, headers={"Authorization": f"Bearer {self.access_token}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get_after_balances(), [90000, 80000, 70000, 60000, 50000])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 50000)
+
+    def test_delete_rebalances_later_transactions(self):
+        url = reverse("transaction-detail", kwargs={"pk": self.transactions[0].id})
+
+        response = self.client.delete(url, headers={"Authorization": f"Bearer {self.access_token}"})
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.get_after_balances(), [90000, 80000, 70000, 60000])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 60000)
+        snapshot = DailyBalanceSnapshot.objects.get(account=self.account, date=datetime(2024, 9, 1).date())
+        self.assertEqual(snapshot.closing_balance, snapshot.opening_balance)
+
+
+class TransactionIdempotencyTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+            is_active=True,
+        )
+        self.account = Account.objects.create(
+            user_id=self.user.id, account_num="3333-54-1231231", bank_code="090", balance=100000, type="CHECKING"
+        )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.data = {
+            "account": self.account.id,
+            "trans_amount": 18000,
+            "print_content": "유튜브 구독 정기결제",
+            "trans_type": "WITHDRAW",
+            "trans_method": "AUTOMATIC_TRANSFER",
+            "trans_date": "2024-09-01",
+            "trans_time": "12:00:00",
+        }
+
+    def post(self, data, key, url=None):
+        return self.client.post(
+            url or reverse("transaction-list"),
+            data,
+            format="json",
+            headers={"Authorization": f"Bearer {self.access_token}", "Idempotency-Key": key},
+        )
+
+    def test_retry_returns_original_response_without_posting_twice(self):
+        first = self.post(self.data, "retry-key")
+        second = self.post(self.data, "retry-key")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 82000)
+
+    def test_cached_replay_does_not_touch_ledger(self):
+        self.post(self.data, "cached-key")
+
+        # 사용자 인증 조회 외에는 쿼리가 실행되지 않아야 합니다.
+        with self.assertNumQueries(1):
+            response = self.post(self.data, "cached-key")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_replay_from_database_when_cache_is_evicted(self):
+        first = self.post(self.data, "evicted-key")
+        cache.clear()
+
+        second = self.post(self.data, "evicted-key")
+
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_same_key_with_different_payload(self):
+        self.post(self.data, "reused-key")
+
+        response = self.post({**self.data, "trans_amount": 20000}, "reused-key")
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_failed_request_releases_key(self):
+        response = self.post({**self.data, "trans_amount": 200000}, "failed-key")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        response = self.post({**self.data, "trans_amount": 200000, "trans_type": "DEPOSIT"}, "failed-key")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_bulk_create_with_idempotency_key(self):
+        rows = [{**self.data, "trans_amount": 1000}, {**self.data, "trans_amount": 2000}]
+
+        self.post(rows, "bulk-key", reverse("transaction-bulk"))
+        response = self.post(rows, "bulk-key", reverse("transaction-bulk"))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_purge_expired_idempotency_keys(self):
+        self.post(self.data, "old-key")
+        self.post({**self.data, "trans_amount": 1000}, "new-key")
+        IdempotencyKey.objects.filter(key="old-key").update(created_at=timezone.now() - timedelta(days=2))
+
+        deleted = purge_expired_idempotency_keys()
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["new-key"])
+
+
+class ReconcileLedgersTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword1234",
+            nickname="testuser",
+            name="홍길동",
+            phone="010-1111-2222",
+        )
+        self.accounts = [
+            Account.objects.create(user_id=self.user.id, account_num=f"3333-54-000000{i}", balance=100000)
+            for i in range(3)
+        ]
+        for account in self.accounts:
+            for i in range(5):
+                Transaction.objects.create(
+                    account=account,
+                    trans_amount=1000 * (i + 1),
+                    print_content=f"{i}. 대사 Test",
+                    trans_type="WITHDRAW" if i % 2 else "DEPOSIT",
+                    trans_method="CARD",
+                    trans_date=datetime(2024, 9, i + 1).date(),
+                    trans_time=datetime(2024, 9, 1, 12).time(),
+                )
+
+    def reconcile(self, *args):
+        out = StringIO()
+        call_command("reconcile_ledgers", "--chunk-size", "2", *args, stdout=out)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_consistent_ledgers_report_no_drift(self):
+        events = self.reconcile()
+
+        self.assertEqual([event["event"] for event in events], ["progress", "progress", "summary"])
+        self.assertEqual(events[-1]["accounts"], 3)
+        self.assertEqual(events[-1]["transactions"], 15)
+        self.assertEqual(events[-1]["issues"], 0)
+
+    def test_drift_detected_and_repaired(self):
+        account = self.accounts[1]
+        broken = account.transactions.order_by("id")[2]
+        # 중간 거래의 잔액 반영이 누락되어 이후 거래들의 잔액과 계좌 잔액이 모두 어긋난 상황
+        account.transactions.filter(id__gte=broken.id).update(after_balance=F("after_balance") + 3000)
+        Account.objects.filter(id=account.id).update(balance=F("balance") + 3000)
+        expected = list(account.transactions.order_by("id").values_list("after_balance", flat=True))
+
+        events = self.reconcile()
+
+        drifts = [event for event in events if event["event"] == "drift"]
+        self.assertEqual(len(drifts), 1)
+        self.assertEqual(drifts[0]["account"], account.id)
+        self.assertEqual(drifts[0]["balance"], 106000)
+        self.assertEqual(drifts[0]["expected_balance"], 103000)
+        self.assertEqual(drifts[0]["rows_off"], 3)
+        self.assertEqual(drifts[0]["chain_breaks"], [broken.id])
+        self.assertFalse(drifts[0]["repaired"])
+
+        self.reconcile("--repair")
+
+        account.refresh_from_db()
+        self.assertEqual(account.balance, 103000)
+        self.assertEqual(
+            list(account.transactions.order_by("id").values_list("after_balance", flat=True)),
+            expected[:2] + [balance - 3000 for balance in expected[2:]],
+        )
+        self.assertEqual(account.balance_snapshots.order_by("-date").first().closing_balance, 103000)
+        self.assertEqual(self.reconcile()[-1]["issues"], 0)
@@ -4,5 +4,8 @@ from transactions import views as trans_views
 
 urlpatterns = [
     path("", trans_views.TransactionListCreateView.as_view(), name="transaction-list"),
+    path("bulk/", trans_views.TransactionBulkCreateView.as_view(), name="transaction-bulk"),
+    path("transfer/", trans_views.TransferView.as_view(), name="transaction-transfer"),
+    path("export/<str:file_type>/", trans_views.TransactionExportView.as_view(), name="transaction-export"),
     path("<int:pk>/", trans_views.TransactionDetailView.as_view(), name="transaction-detail"),
 ]
@@ -1,26 +1,58 @@
+import csv
+import io
+
+from django.http import StreamingHttpResponse
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import (
+    GenericAPIView,
+    ListCreateAPIView,
+    RetrieveUpdateDestroyAPIView,
+)
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from accounts.models import Account
+from transactions.exporters import TransactionExporter
+from transactions.filters import TransactionFilterBackend
+from transactions.importers import TransactionBulkImporter
+from transactions.mixins import IdempotencyMixin
 from transactions.models import Transaction
-from transactions.serializers import TransactionDetailSerializer, TransactionSerializer
+from transactions.paginations import TransactionCursorPagination
+from transactions.serializers import (
+    TransactionDetailSerializer,
+    TransactionFilterSerializer,
+    TransactionSerializer,
+    TransactionValuesSerializer,
+    TransferSerializer,
+)
 
 
-class TransactionListCreateView(ListCreateAPIView):
+class TransactionListCreateView(IdempotencyMixin, ListCreateAPIView):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
+    pagination_class = TransactionCursorPagination
+    filter_backends = [TransactionFilterBackend]
+
+    def get_serializer_class(self):
+        # 목록 조회는 모델 객체를 만들지 않는 읽기 전용 시리얼라이저를 사용합니다.
+        if self.request.method == "GET":
+            return TransactionValuesSerializer
+        return super().get_serializer_class()
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        date = self.request.query_params.get("date", "")
-        if date:
-            queryset = queryset.filter(trans_date=date)
-        trans_type = self.request.query_params.get("trans_type", "")
-        if trans_type:
-            queryset = queryset.filter(trans_type=trans_type)
+        queryset = super().get_queryset().filter(user=self.request.user)
+        if self.request.method == "GET":
+            return queryset.values(*TransactionValuesSerializer.value_fields)
         return queryset
 
     def create(self, request, *args, **kwargs):
+        return self.idempotent(request, lambda: self.perform_idempotent_create(request, *args, **kwargs))
+
+    def perform_idempotent_create(self, request, *args, **kwargs):
         try:
             response = super().create(request, *args, **kwargs)
             return response
@@ -32,7 +64,119 @@ class TransactionDetailView(RetrieveUpdateDestroyAPIView):
     queryset = Transaction.objects.all()
     serializer_class = TransactionDetailSerializer
 
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     def delete(self, request, *args, **kwargs):
-        response = super().delete(request, *args, **kwargs)
+        try:
+            response = super().delete(request, *args, **kwargs)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         response.data = {"detail": "거래내역이 성공적으로 삭제되었습니다."}
         return response
+
+
+class TransactionBulkCreateView(IdempotencyMixin, APIView):
+    """
+    거래내역 일괄 등록 API입니다.
+    JSON 배열 또는 multipart로 업로드한 CSV 파일(file)을 받아 한 번에 등록합니다.
+    """
+
+    parser_classes = [JSONParser, MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        return self.idempotent(request, lambda: self.import_rows(request))
+
+    def import_rows(self, request):
+        if isinstance(request.data, list):
+            rows = request.data
+        elif "file" in request.FILES:
+            # 업로드된 파일을 한 줄씩 읽어 메모리에 한 번에 올리지 않습니다.
+            rows = csv.DictReader(io.TextIOWrapper(request.FILES["file"], encoding="utf-8-sig"))
+        else:
+            return Response(
+                {"detail": "거래내역 JSON 배열 또는 CSV 파일(file)을 전달해주세요."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = TransactionBulkImporter(request.user).import_rows(rows)
+
+        if result["total"] and not result["created"]:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+class TransferView(IdempotencyMixin, APIView):
+    """
+    내 계좌 간 이체 API입니다.
+    출금/입금 거래내역을 하나의 DB 트랜잭션으로 함께 등록합니다.
+    """
+
+    def post(self, request, *args, **kwargs):
+        return self.idempotent(request, lambda: self.transfer(request))
+
+    def transfer(self, request):
+        serializer = TransferSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            withdraw, deposit = Transaction.objects.transfer(
+                request.user,
+                data["from_account"],
+                data["to_account"],
+                data["amount"],
+                data["trans_date"],
+                data["trans_time"],
+                data["print_content"],
+            )
+        except Account.DoesNotExist as e:
+            raise NotFound(str(e))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {"withdraw": TransactionSerializer(withdraw).data, "deposit": TransactionSerializer(deposit).data},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class TransactionExportView(GenericAPIView):
+    """
+    거래내역 내보내기 API입니다. (/transactions/export/csv/, /transactions/export/ndjson/)
+    목록 API와 같은 검색 조건을 사용할 수 있으며, 결과는 스트리밍으로 내려갑니다.
+    """
+
+    queryset = Transaction.objects.all()
+    filter_backends = [TransactionFilterBackend]
+
+    def get_queryset(self):
+        # API 문서를 만들 때는 요청한 사용자가 없으므로 빈 쿼리셋을 반환합니다.
+        if getattr(self, "swagger_fake_view", False):
+            return Transaction.objects.none()
+        return super().get_queryset().filter(user=self.request.user)
+
+    @swagger_auto_schema(
+        query_serializer=TransactionFilterSerializer,
+        responses={
+            200: openapi.Response(
+                "검색 조건에 맞는 거래내역 파일 (CSV 또는 한 줄에 거래 하나인 NDJSON)",
+                schema=openapi.Schema(type=openapi.TYPE_FILE),
+            ),
+            404: "지원하지 않는 파일 형식",
+        },
+        produces=list(TransactionExporter.content_types.values()),
+    )
+    def get(self, request, file_type, *args, **kwargs):
+        if file_type not in TransactionExporter.content_types:
+            raise NotFound("지원하지 않는 파일 형식입니다.")
+
+        exporter = TransactionExporter(self.filter_queryset(self.get_queryset()), file_type)
+        response = StreamingHttpResponse(exporter.stream(), content_type=exporter.content_type)
+        response["Content-Disposition"] = f'attachment; filename="transactions.{file_type}"'
+        return response